@@ -0,0 +1,84 @@
+"""Benchmarks of loading datasets from the cache."""
+import itertools
+import os
+import shutil
+import tempfile
+
+import openml
+
+from .fixtures import make_dataset_arff, remove_if_exists
+
+
+def _make_dataset(data_file, features, data_format='arff'):
+    return openml.OpenMLDataset(
+        'synthetic', 'Synthetic dataset', data_format=data_format,
+        dataset_id=1, default_target_attribute='class',
+        data_file=data_file, features=features,
+    )
+
+
+class DatasetInit(object):
+    """Decoding the ARFF file and building the pickle when a dataset is
+    loaded for the first time."""
+
+    params = ([1000, 10000], [10, 100], ['arff', 'sparse_arff'])
+    param_names = ['n_rows', 'n_features', 'data_format']
+    number = 1
+    repeat = 3
+    timeout = 300
+
+    def setup_cache(self):
+        # asv runs this once in a directory which persists for all
+        # benchmarks of this class
+        directory = os.path.abspath('datasets')
+        os.makedirs(directory)
+        for n_rows, n_features, data_format in itertools.product(
+                *self.params):
+            make_dataset_arff(
+                os.path.join(directory, _dataset_filename(n_rows, n_features,
+                                                          data_format)),
+                n_rows, n_features, n_classes=2, n_nominal=n_features // 10,
+                sparse=data_format == 'sparse_arff',
+            )
+        return directory
+
+    def setup(self, directory, n_rows, n_features, data_format):
+        self.data_file = os.path.join(
+            directory, _dataset_filename(n_rows, n_features, data_format)
+        )
+        remove_if_exists(self.data_file.replace('.arff', '.pkl.py3'))
+        remove_if_exists(self.data_file.replace('.arff', '.pkl.py2'))
+
+    def time_init(self, directory, n_rows, n_features, data_format):
+        _make_dataset(self.data_file, None, data_format)
+
+
+class GetData(object):
+    """Loading the data of a dataset from its pickle and selecting the
+    target."""
+
+    params = ([1000, 100000], [10, 100])
+    param_names = ['n_rows', 'n_features']
+
+    def setup(self, n_rows, n_features):
+        self.directory = tempfile.mkdtemp(prefix='openml_benchmark_')
+        data_file = os.path.join(self.directory, 'dataset.arff')
+        features = make_dataset_arff(data_file, n_rows, n_features,
+                                     n_nominal=n_features // 10)
+        self.dataset = _make_dataset(data_file, features)
+
+    def teardown(self, n_rows, n_features):
+        shutil.rmtree(self.directory)
+
+    def time_get_data(self, n_rows, n_features):
+        self.dataset.get_data()
+
+    def time_get_data_target(self, n_rows, n_features):
+        self.dataset.get_data(target='class',
+                              return_categorical_indicator=True,
+                              return_attribute_names=True)
+
+
+def _dataset_filename(n_rows, n_features, data_format):
+    return '%s_%d_%d.arff' % (data_format, n_rows, n_features)
+
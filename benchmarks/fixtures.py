@@ -0,0 +1,227 @@
+"""Synthetic inputs of controllable size for the benchmarks.
+
+All functions are deterministic, so that timings of different commits are
+comparable.
+"""
+import io
+import os
+
+import arff
+import numpy as np
+
+
+def make_dataset_arff(path, n_rows, n_features, n_classes=2,
+                      n_nominal=0, sparse=False):
+    """Write a classification dataset to an ARFF file.
+
+    Parameters
+    ----------
+    path : str
+
+    n_rows : int
+
+    n_features : int
+        Number of features, not counting the target.
+
+    n_classes : int
+        Number of values of the nominal target attribute ``class``.
+
+    n_nominal : int
+        Number of nominal features among the features.
+
+    sparse : bool
+        Whether to write a sparse ARFF file with 90% zeros.
+
+    Returns
+    -------
+    features : dict
+        Feature description in the format of the features XML parsed by
+        ``xmltodict``, to be passed to ``OpenMLDataset``.
+    """
+    rng = np.random.RandomState(1)
+    attributes = []
+    for i in range(n_features):
+        if i < n_nominal:
+            attributes.append(('nominal_%d' % i, ['a', 'b', 'c']))
+        else:
+            attributes.append(('numeric_%d' % i, 'NUMERIC'))
+    classes = ['class_%d' % i for i in range(n_classes)]
+    attributes.append(('class', classes))
+
+    X = rng.rand(n_rows, n_features).round(4)
+    if sparse:
+        X[rng.rand(n_rows, n_features) < 0.9] = 0
+    y = rng.randint(n_classes, size=n_rows)
+    data = []
+    for row, label in zip(X, y):
+        values = ['abc'[min(int(value * 3), 2)] if i < n_nominal else value
+                  for i, value in enumerate(row)]
+        data.append(values + [classes[label]])
+    if sparse:
+        data = [{i: value for i, value in enumerate(row) if value != 0}
+                for row in data]
+
+    with io.open(path, 'w', encoding='utf8') as fh:
+        arff.dump({'relation': 'synthetic', 'attributes': attributes,
+                   'data': data}, fh)
+
+    return {'oml:feature': [
+        {'oml:index': str(i), 'oml:name': name,
+         'oml:data_type': 'nominal' if isinstance(type_, list) else 'numeric'}
+        for i, (name, type_) in enumerate(attributes)
+    ]}
+
+
+def make_split_arff(path, n_rows, n_repeats, n_folds):
+    """Write a cross-validation split of a dataset to an ARFF file in the
+    format of the OpenML data splits.
+
+    Parameters
+    ----------
+    path : str
+
+    n_rows : int
+
+    n_repeats : int
+
+    n_folds : int
+    """
+    rng = np.random.RandomState(1)
+    lines = ['@relation synthetic_splits', '',
+             '@attribute type {TRAIN,TEST}', '@attribute rowid numeric',
+             '@attribute repeat numeric', '@attribute fold numeric', '',
+             '@data']
+    for repeat in range(n_repeats):
+        folds = rng.permutation(n_rows) % n_folds
+        for fold in range(n_folds):
+            for row_id, row_fold in enumerate(folds):
+                type_ = 'TEST' if row_fold == fold else 'TRAIN'
+                lines.append('%s,%d,%d,%d' % (type_, row_id, repeat, fold))
+    with io.open(path, 'w', encoding='utf8') as fh:
+        fh.write(u'\n'.join(lines) + u'\n')
+
+
+def make_predictions(n_rows, n_classes, n_folds):
+    """Predictions of a classifier as passed to ``_prediction_to_row``.
+
+    Returns
+    -------
+    list of tuples
+        ``(fold, row_id, correct_label, predicted_label, probabilities)``.
+
+    list
+        Class labels.
+    """
+    rng = np.random.RandomState(1)
+    class_labels = ['class_%d' % i for i in range(n_classes)]
+    probabilities = rng.dirichlet(np.ones(n_classes), size=n_rows)
+    predictions = []
+    for row_id in range(n_rows):
+        predictions.append((
+            row_id % n_folds,
+            row_id,
+            class_labels[rng.randint(n_classes)],
+            int(np.argmax(probabilities[row_id])),
+            probabilities[row_id],
+        ))
+    return predictions, class_labels
+
+
+def make_list_xml(entity, n_entities, first_id=1):
+    """XML answer of the server to a listing call.
+
+    Parameters
+    ----------
+    entity : str
+        Either ``datasets``, ``runs`` or ``evaluations``.
+
+    n_entities : int
+
+    first_id : int
+        ID of the first entity, the following ones are numbered
+        consecutively.
+
+    Returns
+    -------
+    str
+    """
+    if entity == 'datasets':
+        template = (
+            '<oml:dataset><oml:did>%(id)d</oml:did>'
+            '<oml:name>dataset_%(id)d</oml:name><oml:version>1</oml:version>'
+            '<oml:status>active</oml:status><oml:format>ARFF</oml:format>'
+            '<oml:quality name="NumberOfInstances">%(id)d.0</oml:quality>'
+            '<oml:quality name="NumberOfFeatures">10.0</oml:quality>'
+            '</oml:dataset>'
+        )
+        root = 'data'
+    elif entity == 'runs':
+        template = (
+            '<oml:run><oml:run_id>%(id)d</oml:run_id>'
+            '<oml:task_id>1</oml:task_id><oml:setup_id>2</oml:setup_id>'
+            '<oml:flow_id>3</oml:flow_id><oml:uploader>4</oml:uploader>'
+            '<oml:upload_time>2018-01-01 00:00:00</oml:upload_time>'
+            '<oml:error_message></oml:error_message></oml:run>'
+        )
+        root = 'runs'
+    elif entity == 'evaluations':
+        template = (
+            '<oml:evaluation><oml:run_id>%(id)d</oml:run_id>'
+            '<oml:task_id>1</oml:task_id><oml:setup_id>2</oml:setup_id>'
+            '<oml:flow_id>3</oml:flow_id><oml:flow_name>flow</oml:flow_name>'
+            '<oml:data_id>4</oml:data_id><oml:data_name>data</oml:data_name>'
+            '<oml:function>predictive_accuracy</oml:function>'
+            '<oml:upload_time>2018-01-01 00:00:00</oml:upload_time>'
+            '<oml:value>0.5</oml:value></oml:evaluation>'
+        )
+        root = 'evaluations'
+    else:
+        raise ValueError(entity)
+    return '<oml:%s xmlns:oml="http://openml.org/openml">%s</oml:%s>' % (
+        root, ''.join(template % {'id': first_id + i} for i in range(n_entities)),
+        root,
+    )
+
+
+def make_trace_arff(path, n_repeats, n_folds, n_iterations, n_parameters):
+    """Write an optimization trace to an ARFF file.
+
+    Parameters
+    ----------
+    path : str
+
+    n_repeats : int
+
+    n_folds : int
+
+    n_iterations : int
+        Number of evaluated hyperparameter settings per fold.
+
+    n_parameters : int
+        Number of hyperparameters.
+    """
+    rng = np.random.RandomState(1)
+    attributes = [('repeat', 'NUMERIC'), ('fold', 'NUMERIC'),
+                  ('iteration', 'NUMERIC'), ('evaluation', 'NUMERIC'),
+                  ('selected', ['true', 'false'])]
+    attributes += [('parameter_param_%d' % i, 'STRING')
+                   for i in range(n_parameters)]
+    data = []
+    for repeat in range(n_repeats):
+        for fold in range(n_folds):
+            evaluations = rng.rand(n_iterations)
+            best = int(np.argmax(evaluations))
+            for iteration in range(n_iterations):
+                data.append(
+                    [repeat, fold, iteration, evaluations[iteration],
+                     'true' if iteration == best else 'false'] +
+                    ['%d' % rng.randint(100) for _ in range(n_parameters)]
+                )
+    with io.open(path, 'w', encoding='utf8') as fh:
+        arff.dump({'relation': 'Trace', 'attributes': attributes,
+                   'data': data}, fh)
+
+
+def remove_if_exists(path):
+    if os.path.exists(path):
+        os.remove(path)
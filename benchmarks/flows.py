@@ -0,0 +1,61 @@
+"""Benchmarks of converting between scikit-learn models and flows."""
+import sklearn.ensemble
+import sklearn.model_selection
+import sklearn.pipeline
+import sklearn.preprocessing
+import sklearn.svm
+
+from openml.flows import flow_to_sklearn, sklearn_to_flow
+
+
+def _pipeline():
+    return sklearn.pipeline.Pipeline(steps=[
+        ('imputer', sklearn.preprocessing.Imputer()),
+        ('scaler', sklearn.preprocessing.StandardScaler()),
+        ('classifier', sklearn.svm.SVC()),
+    ])
+
+
+def _grid_search():
+    return sklearn.model_selection.GridSearchCV(
+        sklearn.ensemble.RandomForestClassifier(),
+        param_grid={'n_estimators': [10, 100], 'max_depth': [3, 5, None]},
+    )
+
+
+def _nested():
+    return sklearn.model_selection.RandomizedSearchCV(
+        sklearn.pipeline.Pipeline(steps=[
+            ('scaler', sklearn.preprocessing.MinMaxScaler()),
+            ('ensemble', sklearn.ensemble.VotingClassifier(estimators=[
+                ('forest', sklearn.ensemble.RandomForestClassifier()),
+                ('boosting', sklearn.ensemble.GradientBoostingClassifier()),
+                ('svc', _pipeline()),
+            ])),
+        ]),
+        param_distributions={'ensemble__forest__n_estimators': [10, 100]},
+    )
+
+
+_MODELS = {
+    'pipeline': _pipeline,
+    'grid_search': _grid_search,
+    'nested': _nested,
+}
+
+
+class SklearnFlowConversion(object):
+    """Converting models of increasing complexity to flows and back."""
+
+    params = (['pipeline', 'grid_search', 'nested'], )
+    param_names = ['model']
+
+    def setup(self, model):
+        self.model = _MODELS[model]()
+        self.flow = sklearn_to_flow(self.model)
+
+    def time_sklearn_to_flow(self, model):
+        sklearn_to_flow(self.model)
+
+    def time_flow_to_sklearn(self, model):
+        flow_to_sklearn(self.flow)
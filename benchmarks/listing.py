@@ -0,0 +1,72 @@
+"""Benchmarks of paging through and parsing listing calls.
+
+The server is replaced by a function which returns pre-generated XML, so
+only the client side is measured.
+"""
+from openml.datasets.functions import _parse_datasets_list
+from openml.evaluations.functions import _parse_evaluations_list, \
+    _parse_evaluations_fold_values, _fold_values_to_array
+from openml.runs.functions import _parse_runs_list
+from openml.utils import _list_all
+
+from .fixtures import make_list_xml
+
+
+_PARSERS = {
+    'datasets': _parse_datasets_list,
+    'runs': _parse_runs_list,
+    'evaluations': _parse_evaluations_list,
+}
+
+
+class ListAll(object):
+    """Listing entities in pages of ``batch_size`` results."""
+
+    params = (['datasets', 'runs', 'evaluations'], [1000, 100000])
+    param_names = ['entity', 'n_entities']
+    batch_size = 10000
+    timeout = 300
+
+    def setup(self, entity, n_entities):
+        parser = _PARSERS[entity]
+        pages = {
+            offset: make_list_xml(entity,
+                                  min(self.batch_size, n_entities - offset),
+                                  first_id=offset + 1)
+            for offset in range(0, n_entities, self.batch_size)
+        }
+
+        def listing_call(limit, offset, **kwargs):
+            return parser(pages[offset])
+
+        self.listing_call = listing_call
+
+    def time_list_all(self, entity, n_entities):
+        _list_all(self.listing_call, size=n_entities,
+                  batch_size=self.batch_size)
+
+
+class ParseFoldValues(object):
+    """Parsing a page of evaluations with values per fold, into
+    ``OpenMLEvaluation`` objects or into an array."""
+
+    params = [10000]
+    param_names = ['n_evaluations']
+
+    def setup(self, n_evaluations):
+        values = '[%s]' % ','.join(
+            '[%s]' % ','.join('0.%d' % (repeat * 10 + fold)
+                              for fold in range(10))
+            for repeat in range(10)
+        )
+        self.xml_string = make_list_xml('evaluations', n_evaluations).replace(
+            '<oml:value>0.5</oml:value>',
+            '<oml:values>%s</oml:values>' % values,
+        )
+
+    def time_parse_evaluations(self, n_evaluations):
+        _parse_evaluations_list(self.xml_string)
+
+    def time_parse_fold_values_array(self, n_evaluations):
+        _fold_values_to_array(
+            *_parse_evaluations_fold_values(self.xml_string))
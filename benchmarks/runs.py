@@ -0,0 +1,77 @@
+"""Benchmarks of assembling run results and of parsing traces."""
+import os
+import shutil
+import tempfile
+
+import arff
+import numpy as np
+
+from openml.runs.functions import _prediction_to_row
+from openml.runs.trace import OpenMLRunTrace
+
+from .fixtures import make_predictions, make_trace_arff
+
+
+class PredictionsArff(object):
+    """Turning predictions into ARFF rows and serializing them."""
+
+    params = ([1000, 100000], [2, 20])
+    param_names = ['n_rows', 'n_classes']
+    n_folds = 10
+
+    def setup(self, n_rows, n_classes):
+        self.predictions, self.class_labels = make_predictions(
+            n_rows, n_classes, self.n_folds,
+        )
+        self.model_classes = np.arange(n_classes)
+        self.rows = self._rows()
+        self.arff_dict = {
+            'attributes': [('repeat', 'NUMERIC'), ('fold', 'NUMERIC'),
+                           ('sample', 'NUMERIC'), ('row_id', 'NUMERIC')] +
+                          [('confidence.' + label, 'NUMERIC')
+                           for label in self.class_labels] +
+                          [('prediction', self.class_labels),
+                           ('correct', self.class_labels)],
+            'data': self.rows,
+            'description': 'Benchmark',
+            'relation': 'openml_task_1_predictions',
+        }
+
+    def _rows(self):
+        return [
+            _prediction_to_row(0, fold, 0, row_id, correct_label,
+                               predicted_label, probabilities,
+                               self.class_labels, self.model_classes)
+            for fold, row_id, correct_label, predicted_label, probabilities
+            in self.predictions
+        ]
+
+    def time_prediction_to_row(self, n_rows, n_classes):
+        self._rows()
+
+    def time_arff_dumps(self, n_rows, n_classes):
+        arff.dumps(self.arff_dict)
+
+
+class TraceFromFilesystem(object):
+    """Reading the optimization trace of a run."""
+
+    params = ([(1, 10), (10, 10)], [10, 100], [5])
+    param_names = ['repeats_folds', 'n_iterations', 'n_parameters']
+
+    def setup(self, repeats_folds, n_iterations, n_parameters):
+        self.directory = tempfile.mkdtemp(prefix='openml_benchmark_')
+        self.trace_file = os.path.join(self.directory, 'trace.arff')
+        make_trace_arff(self.trace_file, repeats_folds[0], repeats_folds[1],
+                        n_iterations, n_parameters)
+        self.trace = OpenMLRunTrace._from_filesystem(self.trace_file)
+
+    def teardown(self, repeats_folds, n_iterations, n_parameters):
+        shutil.rmtree(self.directory)
+
+    def time_from_filesystem(self, repeats_folds, n_iterations,
+                             n_parameters):
+        OpenMLRunTrace._from_filesystem(self.trace_file)
+
+    def time_trace_to_arff(self, repeats_folds, n_iterations, n_parameters):
+        arff.dumps(self.trace.trace_to_arff())
@@ -0,0 +1,37 @@
+"""Benchmarks of loading the data splits of tasks."""
+import os
+import shutil
+import tempfile
+
+from openml.tasks.split import OpenMLSplit
+
+from .fixtures import make_split_arff, remove_if_exists
+
+
+class SplitFromArff(object):
+    """Parsing the ARFF file of a data split and building its pickle, and
+    loading the split from the pickle."""
+
+    params = ([1000, 100000], [(1, 10), (10, 10)])
+    param_names = ['n_rows', 'repeats_folds']
+    number = 1
+    repeat = 3
+    timeout = 300
+
+    def setup(self, n_rows, repeats_folds):
+        self.directory = tempfile.mkdtemp(prefix='openml_benchmark_')
+        self.split_file = os.path.join(self.directory, 'datasplits.arff')
+        make_split_arff(self.split_file, n_rows, *repeats_folds)
+
+    def teardown(self, n_rows, repeats_folds):
+        shutil.rmtree(self.directory)
+
+    def time_from_arff_file(self, n_rows, repeats_folds):
+        remove_if_exists(self.split_file.replace('.arff', '.pkl.py3'))
+        remove_if_exists(self.split_file.replace('.arff', '.pkl.py2'))
+        OpenMLSplit._from_arff_file(self.split_file)
+
+    def time_from_pickle(self, n_rows, repeats_folds):
+        # The first call of a repeat builds the pickle
+        OpenMLSplit._from_arff_file(self.split_file)
+        OpenMLSplit._from_arff_file(self.split_file)
@@ -24,6 +24,7 @@ from . import flows
 from . import setups
 from . import study
 from . import evaluations
+from . import metrics
 from . import utils
 from .runs import OpenMLRun
 from .tasks import OpenMLTask, OpenMLSplit
@@ -34,10 +35,15 @@ from .__version__ import __version__
 
 
 def populate_cache(task_ids=None, dataset_ids=None, flow_ids=None,
-                   run_ids=None):
+                   run_ids=None, setup_ids=None, n_jobs=4):
     """
     Populate a cache for offline and parallel usage of the OpenML connector.
 
+    Entities are downloaded in parallel together with the entities they
+    depend on: the task, flow and setup of each run and the dataset and data
+    split of each task. Every entity is downloaded only once. Progress is
+    logged at level INFO.
+
     Parameters
     ----------
     task_ids : iterable
@@ -48,25 +54,31 @@ def populate_cache(task_ids=None, dataset_ids=None, flow_ids=None,
 
     run_ids : iterable
 
+    setup_ids : iterable
+
+    n_jobs : int
+        Number of parallel downloads.
+
     Returns
     -------
-    None
+    dict
+        Summary with the number of downloaded ``datasets``, ``tasks``,
+        ``flows``, ``runs`` and ``setups``, the number of bytes received from
+        the server (``bytes_received``), the time in seconds (``duration``)
+        and the ``(kind, id)`` of the entities which could not be downloaded
+        (``errors``).
+
+    Raises
+    ------
+    Exception
+        The first error if any download failed, raised after all other
+        downloads have finished. Its attribute ``summary`` is the summary
+        described above, with the failed downloads in ``errors``.
     """
-    if task_ids is not None:
-        for task_id in task_ids:
-            tasks.functions.get_task(task_id)
-
-    if dataset_ids is not None:
-        for dataset_id in dataset_ids:
-            datasets.functions.get_dataset(dataset_id)
-
-    if flow_ids is not None:
-        for flow_id in flow_ids:
-            flows.functions.get_flow(flow_id)
-
-    if run_ids is not None:
-        for run_id in run_ids:
-            runs.functions.get_run(run_id)
+    from ._populate_cache import populate_cache as _populate_cache
+    return _populate_cache(task_ids=task_ids, dataset_ids=dataset_ids,
+                           flow_ids=flow_ids, run_ids=run_ids,
+                           setup_ids=setup_ids, n_jobs=n_jobs)
 
 
 __all__ = ['OpenMLDataset', 'OpenMLDataFeature', 'OpenMLRun',
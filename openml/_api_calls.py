@@ -1,3 +1,6 @@
+from email.utils import mktime_tz, parsedate_tz
+import random
+import threading
 import time
 import requests
 import warnings
@@ -5,8 +8,22 @@ import warnings
 import xmltodict
 
 from . import config
-from .exceptions import (OpenMLServerError, OpenMLServerException,
-                         OpenMLServerNoResult)
+from . import metrics
+from .exceptions import (OpenMLCacheMissError, OpenMLServerError,
+                         OpenMLServerException, OpenMLServerNoResult)
+
+
+# HTTP status codes of responses which indicate that the server is temporarily
+# unable to handle a request
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# API calls which are sent as post requests but do not change anything on the
+# server, so that they can be retried like get requests
+READ_ONLY_POST_ENDPOINTS = ('flow/exists', 'setup/exists')
+
+# Transport adapters which are mounted on every session for both http and
+# https, used by openml.replay to record and replay responses
+_transport_adapters = []
 
 
 def _perform_api_call(call, data=None, file_elements=None):
@@ -110,32 +127,234 @@ def send_request(
     data,
     files=None,
 ):
-    n_retries = config.connection_n_retries
+    """Send a request to the server and retry if it fails temporarily.
+
+    Requests are retried up to ``config.connection_n_retries`` times if the
+    connection breaks. Get requests and the post requests to
+    ``READ_ONLY_POST_ENDPOINTS`` are also retried if the server answers with
+    one of ``RETRY_STATUS_CODES``. Between retries, the function waits for an
+    exponentially growing time with jitter, or for the time requested by the
+    server in the ``Retry-After`` header, at most
+    ``config.retry_max_backoff`` seconds.
+
+    All requests pass through a rate limiter which allows at most
+    ``config.max_requests_per_second`` requests per second.
+
+    In offline mode (``config.offline``), no request is sent and an
+    :class:`openml.exceptions.OpenMLCacheMissError` is raised.
+
+    Parameters
+    ----------
+    request_method : str
+        Either ``get`` or ``post``.
+
+    url : str
+
+    data : dict
+        Query parameters for get requests, form data for post requests.
+
+    files : dict, optional
+        Files to upload with a post request.
+
+    Returns
+    -------
+    requests.Response
+    """
+    _check_offline(url)
+    n_retries = int(config.connection_n_retries)
+    # Other post requests are not idempotent and therefore only retried if the
+    # request did not reach the server
+    retry_on_status = request_method == 'get' or (
+        metrics._endpoint(url) in READ_ONLY_POST_ENDPOINTS
+    )
     response = None
-    with requests.Session() as session:
-        # Start at one to have a non-zero multiplier for the sleep
-        for i in range(1, n_retries + 1):
-            try:
-                if request_method == 'get':
-                    response = session.get(url, params=data)
-                elif request_method == 'post':
-                    response = session.post(url, data=data, files=files)
-                else:
-                    raise NotImplementedError()
+    start = time.time()
+    n_attempts = 0
+    error = None
+    try:
+        with requests.Session() as session:
+            for adapter in _transport_adapters:
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+            # Start at one to have a non-zero multiplier for the sleep
+            for i in range(1, n_retries + 1):
+                n_attempts = i
+                _rate_limiter.acquire(config.max_requests_per_second)
+                try:
+                    if request_method == 'get':
+                        response = session.get(url, params=data)
+                    elif request_method == 'post':
+                        response = session.post(url, data=data, files=files)
+                    else:
+                        raise NotImplementedError()
+                except (
+                        requests.exceptions.ConnectionError,
+                        requests.exceptions.SSLError,
+                ) as e:
+                    if i == n_retries:
+                        raise e
+                    else:
+                        time.sleep(_retry_delay(i))
+                    continue
+                if (
+                    retry_on_status
+                    and response.status_code in RETRY_STATUS_CODES
+                    and i < n_retries
+                ):
+                    config.logger.debug(
+                        'Server returned status code %d for %s, retrying'
+                        % (response.status_code, url)
+                    )
+                    time.sleep(_retry_delay(i, response))
+                    continue
                 break
-            except (
-                    requests.exceptions.ConnectionError,
-                    requests.exceptions.SSLError,
-            ) as e:
-                if i == n_retries:
-                    raise e
-                else:
-                    time.sleep(0.1 * i)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if metrics._has_listeners():
+            status_code = bytes_sent = bytes_received = None
+            if error is None and response is not None:
+                status_code = response.status_code
+                body = response.request.body
+                bytes_sent = len(body) if body else 0
+                bytes_received = len(response.content)
+            _emit_api_call(request_method, url, start, n_attempts,
+                           status_code, bytes_sent, bytes_received, error)
     if response is None:
         raise ValueError('This should never happen!')
     return response
 
 
+def _check_offline(url):
+    """Raise an OpenMLCacheMissError if requests to ``url`` are not allowed
+    because the client is in offline mode."""
+    if config.offline:
+        raise OpenMLCacheMissError(
+            'Offline mode: %s is not cached. Set openml.config.offline to '
+            'False to download it.' % url
+        )
+
+
+def _emit_api_call(request_method, url, start, n_attempts, status_code,
+                   bytes_sent, bytes_received, error):
+    """Emit the ``api_call`` event of :mod:`openml.metrics` for a request
+    which was started at time ``start``."""
+    metrics._emit(
+        'api_call',
+        method=request_method,
+        url=url,
+        endpoint=metrics._endpoint(url),
+        status_code=status_code,
+        duration=time.time() - start,
+        retries=max(0, n_attempts - 1),
+        bytes_sent=bytes_sent or 0,
+        bytes_received=bytes_received or 0,
+        error=None if error is None else type(error).__name__,
+    )
+
+
+def _retry_delay(n_failed, response=None):
+    """Time to wait in seconds before retrying a failed request.
+
+    Parameters
+    ----------
+    n_failed : int
+        Number of failed attempts so far.
+
+    response : requests.Response, optional
+        Response of the server to the last attempt. If it has a
+        ``Retry-After`` header, its value is used, capped at
+        ``config.retry_max_backoff``.
+
+    Returns
+    -------
+    float
+    """
+    if response is not None and 'Retry-After' in response.headers:
+        retry_after = _parse_retry_after(response.headers['Retry-After'])
+        if retry_after is not None:
+            return min(retry_after, config.retry_max_backoff)
+    delay = min(config.retry_max_backoff,
+                config.retry_backoff * 2 ** (n_failed - 1))
+    # Random jitter prevents parallel clients from retrying all at once
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _parse_retry_after(value):
+    """Parse the value of a ``Retry-After`` header, which is either a number
+    of seconds or an HTTP date. Returns None if it cannot be parsed."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    date = parsedate_tz(value)
+    if date is None:
+        return None
+    return max(0.0, mktime_tz(date) - time.time())
+
+
+class _TokenBucket(object):
+    """Rate limiter shared by all threads of the process.
+
+    The bucket holds up to one second worth of tokens, so short bursts of
+    requests are allowed as long as the average rate stays below the limit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = None
+        self._last_update = None
+
+    def acquire(self, rate):
+        """Take a token from the bucket, waiting until one is available.
+
+        Parameters
+        ----------
+        rate : float or None
+            Number of tokens added to the bucket per second. None disables
+            rate limiting.
+        """
+        wait = self.reserve(rate)
+        if wait > 0:
+            time.sleep(wait)
+
+    def reserve(self, rate):
+        """Take a token from the bucket without waiting for it.
+
+        Parameters
+        ----------
+        rate : float or None
+            Number of tokens added to the bucket per second. None disables
+            rate limiting.
+
+        Returns
+        -------
+        float
+            Time in seconds the caller has to wait before using the token.
+        """
+        if rate is None:
+            return 0
+        capacity = max(1.0, rate)
+        with self._lock:
+            now = time.time()
+            if self._tokens is None:
+                self._tokens = capacity
+            else:
+                self._tokens = min(
+                    capacity,
+                    self._tokens + (now - self._last_update) * rate,
+                )
+            self._last_update = now
+            # Reserve the token, possibly leaving the bucket in debt. Later
+            # callers then wait until the debt is paid off.
+            self._tokens -= 1
+            return -self._tokens / rate if self._tokens < 0 else 0
+
+
+_rate_limiter = _TokenBucket()
+
+
 def _parse_server_exception(response, url=None):
     # OpenML has a sopisticated error system
     # where information about failures is provided. try to parse this
@@ -0,0 +1,163 @@
+"""Asynchronous counterparts of the functions in :mod:`openml._api_calls`.
+
+Requires Python 3.5 or newer and `aiohttp <https://aiohttp.readthedocs.io>`_.
+This module is therefore not imported by ``openml`` itself.
+"""
+import asyncio
+import time
+from urllib.parse import urlencode
+import warnings
+
+import aiohttp
+
+from . import config
+from ._api_calls import (
+    RETRY_STATUS_CODES,
+    _check_offline,
+    _emit_api_call,
+    _parse_server_exception,
+    _rate_limiter,
+    _retry_delay,
+)
+
+
+class _Response(object):
+    """Status code, headers and text of a response, with the same attribute
+    names as ``requests.Response``."""
+
+    def __init__(self, status_code, headers, text):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+
+async def _perform_api_call_async(call, data=None):
+    """
+    Perform an API call at the OpenML server without blocking the event loop.
+
+    Parameters
+    ----------
+    call : str
+        The API call. For example data/list
+    data : dict
+        Dictionary with post-request payload.
+
+    Returns
+    -------
+    return_value : str
+        Return value of the OpenML server
+    """
+    url = config.server
+    if not url.endswith("/"):
+        url += "/"
+    url += call
+
+    url = url.replace('=', '%3d')
+
+    return await _read_url_async(url, data)
+
+
+async def _read_url_async(url, data=None):
+
+    data = {} if data is None else data
+    if config.apikey is not None:
+        data['api_key'] = config.apikey
+
+    if len(data) == 0 or (len(data) == 1 and 'api_key' in data):
+        response = await send_request_async(
+            request_method='get', url=url, data=data,
+        )
+
+    else:
+        response = await send_request_async(
+            request_method='post', url=url, data=data,
+        )
+
+    if response.status_code != 200:
+        raise _parse_server_exception(response, url=url)
+    if 'Content-Encoding' not in response.headers or \
+            response.headers['Content-Encoding'] != 'gzip':
+        warnings.warn('Received uncompressed content from OpenML for %s.' % url)
+    return response.text
+
+
+async def send_request_async(request_method, url, data):
+    """Send a request to the server and retry if it fails temporarily.
+
+    Follows the same retry policy and rate limit as
+    :func:`openml._api_calls.send_request`, but waits with
+    ``asyncio.sleep``.
+
+    Parameters
+    ----------
+    request_method : str
+        Either ``get`` or ``post``.
+
+    url : str
+
+    data : dict
+        Query parameters for get requests, form data for post requests.
+
+    Returns
+    -------
+    _Response
+    """
+    _check_offline(url)
+    n_retries = int(config.connection_n_retries)
+    response = None
+    start = time.time()
+    n_attempts = 0
+    bytes_sent = bytes_received = 0
+    error = None
+    try:
+        async with aiohttp.ClientSession() as session:
+            # Start at one to have a non-zero multiplier for the sleep
+            for i in range(1, n_retries + 1):
+                n_attempts = i
+                await asyncio.sleep(
+                    _rate_limiter.reserve(config.max_requests_per_second)
+                )
+                try:
+                    if request_method == 'get':
+                        request = session.get(url, params=data)
+                    elif request_method == 'post':
+                        request = session.post(url, data=data)
+                    else:
+                        raise NotImplementedError()
+                    async with request as http_response:
+                        content = await http_response.read()
+                        response = _Response(
+                            status_code=http_response.status,
+                            headers=http_response.headers,
+                            text=await http_response.text(),
+                        )
+                except aiohttp.ClientConnectionError as e:
+                    if i == n_retries:
+                        raise e
+                    else:
+                        await asyncio.sleep(_retry_delay(i))
+                    continue
+                if response.status_code in RETRY_STATUS_CODES and i < n_retries:
+                    config.logger.debug(
+                        'Server returned status code %d for %s, retrying'
+                        % (response.status_code, url)
+                    )
+                    await asyncio.sleep(_retry_delay(i, response))
+                    continue
+                break
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        status_code = None
+        if error is None and response is not None:
+            status_code = response.status_code
+            bytes_received = len(content)
+            if request_method == 'post':
+                # aiohttp sends dictionaries form encoded
+                bytes_sent = len(urlencode(data))
+        _emit_api_call(request_method, url, start, n_attempts, status_code,
+                       bytes_sent, bytes_received, error)
+    if response is None:
+        raise ValueError('This should never happen!')
+    return response
@@ -0,0 +1,203 @@
+"""Parallel population of the cache, see :func:`openml.populate_cache`.
+
+Entities are downloaded by a pool of threads. Each entity is downloaded
+once, and downloading an entity schedules the entities it depends on: a run
+its task, flow and setup, and a task its dataset. The data split of a task is
+downloaded after its dataset, so that tasks on the same dataset do not wait
+for each other's dataset download.
+"""
+from collections import Counter, defaultdict
+import threading
+import time
+
+import six
+
+import openml
+import openml.utils
+from . import config, metrics
+
+
+class _CachePopulator(object):
+    """Downloads entities and their dependencies into the cache.
+
+    Parameters
+    ----------
+    n_jobs : int
+        Number of threads which download in parallel.
+    """
+
+    def __init__(self, n_jobs):
+        if n_jobs < 1:
+            raise ValueError('n_jobs must be at least 1, got %d' % n_jobs)
+        self.n_jobs = n_jobs
+        self._queue = six.moves.queue.Queue()
+        self._lock = threading.Lock()
+        self._all_done = threading.Condition(self._lock)
+        # Items which were submitted, items which were downloaded and items
+        # waiting for another item to be downloaded
+        self._submitted = set()
+        self._done = set()
+        self._waiting = defaultdict(list)
+        self._n_pending = 0
+        self._worker_threads = set()
+        self.counts = Counter()
+        self.bytes_received = 0
+        self.errors = []
+
+    def submit(self, kind, id_, after=None):
+        """Schedule the download of an entity.
+
+        Parameters
+        ----------
+        kind : str
+            One of ``dataset``, ``task``, ``task_split``, ``flow``, ``run``
+            and ``setup``.
+
+        id_ : int
+
+        after : tuple, optional
+            ``(kind, id_)`` of an entity which has to be downloaded first.
+            If its download fails, this entity is not downloaded.
+        """
+        item = (kind, int(id_))
+        with self._lock:
+            if item in self._submitted:
+                return
+            self._submitted.add(item)
+            if after is not None and after not in self._done:
+                self._waiting[after].append(item)
+                return
+            self._n_pending += 1
+        self._queue.put(item)
+
+    def run(self):
+        """Download all submitted entities and their dependencies.
+
+        Returns once all downloads have finished.
+        """
+        metrics.add_listener(self._count_bytes)
+        threads = [threading.Thread(target=self._work)
+                   for _ in range(self.n_jobs)]
+        try:
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+            with self._all_done:
+                while self._n_pending > 0:
+                    self._all_done.wait()
+        finally:
+            for _ in threads:
+                self._queue.put(None)
+            for thread in threads:
+                thread.join()
+            metrics.remove_listener(self._count_bytes)
+
+    def _count_bytes(self, event):
+        if event['type'] == 'api_call' and \
+                threading.current_thread() in self._worker_threads:
+            with self._lock:
+                self.bytes_received += event['bytes_received']
+
+    def _work(self):
+        with self._lock:
+            self._worker_threads.add(threading.current_thread())
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            kind, id_ = item
+            error = None
+            try:
+                getattr(self, '_get_%s' % kind)(id_)
+            except Exception as e:
+                config.logger.warning('Could not download %s %d: %s' %
+                                      (kind, id_, e))
+                error = e
+            with self._lock:
+                if error is None:
+                    self._done.add(item)
+                    self.counts[kind] += 1
+                    released = self._waiting.pop(item, [])
+                    self._n_pending += len(released)
+                    for released_item in released:
+                        self._queue.put(released_item)
+                else:
+                    self.errors.append((kind, id_, error))
+                    # Entities depending on a failed download are skipped
+                    self._waiting.pop(item, None)
+                self._n_pending -= 1
+                n_finished = len(self._done) + len(self.errors)
+                n_total = len(self._submitted)
+                if self._n_pending == 0:
+                    self._all_done.notify_all()
+            config.logger.info('Populating the cache: %d/%d downloads '
+                               'finished' % (n_finished, n_total))
+
+    def _get_run(self, run_id):
+        run = openml.runs.functions.get_run(run_id)
+        self.submit('task', run.task_id)
+        self.submit('flow', run.flow_id)
+        if run.setup_id is not None:
+            self.submit('setup', run.setup_id)
+
+    def _get_task(self, task_id):
+        # Only the description, the task is completed by _get_task_split
+        # once its dataset is in the cache
+        with openml.utils._cache_entity_lock(
+                openml.tasks.functions.TASKS_CACHE_DIR_NAME, task_id):
+            openml.utils._create_cache_directory_for_id(
+                openml.tasks.functions.TASKS_CACHE_DIR_NAME, task_id,
+            )
+            task = openml.tasks.functions._get_task_description(task_id)
+        self.submit('dataset', task.dataset_id)
+        self.submit('task_split', task_id, after=('dataset', task.dataset_id))
+
+    def _get_task_split(self, task_id):
+        openml.tasks.functions.get_task(task_id)
+
+    def _get_dataset(self, dataset_id):
+        openml.datasets.functions.get_dataset(dataset_id)
+
+    def _get_flow(self, flow_id):
+        openml.flows.functions.get_flow(flow_id)
+
+    def _get_setup(self, setup_id):
+        openml.setups.functions.get_setup(setup_id)
+
+
+def populate_cache(task_ids=None, dataset_ids=None, flow_ids=None,
+                   run_ids=None, setup_ids=None, n_jobs=4):
+    """See :func:`openml.populate_cache`."""
+    start = time.time()
+    populator = _CachePopulator(n_jobs)
+    for kind, ids in (('run', run_ids), ('task', task_ids),
+                      ('dataset', dataset_ids), ('flow', flow_ids),
+                      ('setup', setup_ids)):
+        for id_ in ids or []:
+            populator.submit(kind, id_)
+    populator.run()
+
+    counts = populator.counts
+    summary = {
+        'datasets': counts['dataset'],
+        'tasks': counts['task_split'],
+        'flows': counts['flow'],
+        'runs': counts['run'],
+        'setups': counts['setup'],
+        'bytes_received': populator.bytes_received,
+        'duration': time.time() - start,
+        # The description and the split of a task are both reported as task
+        'errors': [(kind.split('_')[0], id_)
+                   for kind, id_, _ in populator.errors],
+    }
+    config.logger.info(
+        'Populated the cache with %(datasets)d datasets, %(tasks)d tasks, '
+        '%(flows)d flows, %(runs)d runs and %(setups)d setups, received '
+        '%(bytes_received)d bytes in %(duration).1f seconds' % summary
+    )
+    if populator.errors:
+        # The summary of the other downloads is not lost
+        error = populator.errors[0][2]
+        error.summary = summary
+        raise error
+    return summary
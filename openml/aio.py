@@ -0,0 +1,421 @@
+"""Asynchronous variants of the getters and listing functions.
+
+The functions in this module are coroutines which can be run concurrently
+in an :mod:`asyncio` event loop, for example with :func:`asyncio.gather`.
+They download with `aiohttp <https://aiohttp.readthedocs.io>`_, which can be
+installed with ``pip install openml[async]``, and require Python 3.5 or
+newer.
+
+Downloads go through the same retries and rate limit as the synchronous
+functions, and downloaded files are stored in the same cache directory.
+Writing the cache, which can wait for another process holding the lock on
+the same entity, and loading the downloaded entities, which parses large
+files such as datasets, run in the default executor of the event loop so
+that they do not block it.
+"""
+import asyncio
+import functools
+import os
+
+import xmltodict
+
+import openml.utils
+from ._api_calls_async import _perform_api_call_async, _read_url_async
+from .datasets.functions import (
+    DATASET_CACHE_FILENAMES,
+    DATASETS_CACHE_DIR_NAME,
+    _check_arff_checksum,
+    _get_dataset_description,
+    _list_datasets_api_call,
+    _parse_datasets_list,
+)
+from .datasets import get_dataset
+from .evaluations.functions import (
+    _list_evaluations_api_call,
+    _parse_evaluations_list,
+)
+from .exceptions import (
+    OpenMLServerException,
+    OpenMLServerNoResult,
+    PrivateDatasetError,
+)
+from .flows.functions import FLOWS_CACHE_DIR_NAME
+from .flows import get_flow
+from .runs.functions import (
+    RUNS_CACHE_DIR_NAME,
+    _list_runs_api_call,
+    _parse_runs_list,
+)
+from .runs import get_run
+from .setups import get_setup
+from .tasks.functions import TASKS_CACHE_DIR_NAME, _create_task_from_dict
+from .tasks import OpenMLSupervisedTask, get_task
+
+
+__all__ = [
+    'get_dataset_async',
+    'get_flow_async',
+    'get_run_async',
+    'get_setup_async',
+    'get_task_async',
+    'list_datasets_async',
+    'list_evaluations_async',
+    'list_runs_async',
+]
+
+
+def _missing_files(cache_dir, filenames):
+    return [filename for filename in filenames
+            if not os.path.exists(os.path.join(cache_dir, filename))]
+
+
+def _run_in_executor(function, *args, **kwargs):
+    """Run a blocking function in the default executor of the event loop.
+
+    Returns
+    -------
+    asyncio.Future
+    """
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(None,
+                                functools.partial(function, *args, **kwargs))
+
+
+def _fill_cache(key, id_, cache_dir, downloads):
+    """Write downloaded files to the cache directory of an entity.
+
+    Files which another process cached in the meantime are left untouched.
+    """
+    with openml.utils._cache_entity_lock(key, id_):
+        # The directory may have been evicted in the meantime
+        openml.utils._create_cache_directory_for_id(key, id_)
+        for filename, content in downloads.items():
+            if not os.path.exists(os.path.join(cache_dir, filename)):
+                openml.utils._write_cache_file(cache_dir, filename, content)
+    openml.utils._evict_cache(keep=cache_dir)
+
+
+def _download_dataset_file(filename, dataset_id, description):
+    if filename == 'dataset.arff':
+        return _read_url_async(description['oml:url'])
+    elif filename == 'features.xml':
+        return _perform_api_call_async("data/features/%d" % dataset_id)
+    elif filename == 'qualities.xml':
+        return _perform_api_call_async("data/qualities/%d" % dataset_id)
+    else:
+        raise ValueError(filename)
+
+
+async def get_dataset_async(dataset_id):
+    """Download a dataset without blocking the event loop.
+
+    Asynchronous variant of :func:`openml.datasets.get_dataset`.
+
+    Parameters
+    ----------
+    dataset_id : int
+        Dataset ID of the dataset to download
+
+    Returns
+    -------
+    dataset : :class:`openml.OpenMLDataset`
+        The downloaded dataset."""
+    try:
+        dataset_id = int(dataset_id)
+    except:
+        raise ValueError("Dataset ID is neither an Integer nor can be "
+                         "cast to an Integer.")
+
+    dataset = openml.utils._memory_cache_get(DATASETS_CACHE_DIR_NAME,
+                                             dataset_id)
+    if dataset is not None:
+        return dataset
+
+    did_cache_dir = openml.utils._create_cache_directory_for_id(
+        DATASETS_CACHE_DIR_NAME, dataset_id,
+    )
+    missing = _missing_files(did_cache_dir, DATASET_CACHE_FILENAMES)
+    if missing:
+        downloads = {}
+        try:
+            if 'description.xml' in missing:
+                downloads['description.xml'] = await _perform_api_call_async(
+                    "data/%d" % dataset_id
+                )
+                description = xmltodict.parse(downloads['description.xml'])[
+                    "oml:data_set_description"]
+            else:
+                description = await _run_in_executor(
+                    _get_dataset_description, did_cache_dir, dataset_id,
+                )
+
+            filenames = [filename for filename in DATASET_CACHE_FILENAMES
+                         if filename in missing
+                         and filename != 'description.xml']
+            contents = await asyncio.gather(*[
+                _download_dataset_file(filename, dataset_id, description)
+                for filename in filenames
+            ])
+        except OpenMLServerException as e:
+            # if there was an exception, check if the user had access to the dataset
+            if e.code == 112:
+                raise PrivateDatasetError(e.message) from None
+            else:
+                raise e
+        downloads.update(zip(filenames, contents))
+        if 'dataset.arff' in downloads:
+            _check_arff_checksum(downloads['dataset.arff'], description)
+
+        await _run_in_executor(_fill_cache, DATASETS_CACHE_DIR_NAME,
+                               dataset_id, did_cache_dir, downloads)
+
+    return await _run_in_executor(get_dataset, dataset_id)
+
+
+async def get_task_async(task_id):
+    """Download the OpenML task for a given task ID without blocking the
+    event loop.
+
+    Asynchronous variant of :func:`openml.tasks.get_task`. The dataset and
+    the data splits of the task are downloaded concurrently.
+
+    Parameters
+    ----------
+    task_id : int
+        The OpenML task id.
+
+    Returns
+    -------
+    task : OpenMLTask
+    """
+    task_id = int(task_id)
+    task = openml.utils._memory_cache_get(TASKS_CACHE_DIR_NAME, task_id)
+    if task is not None:
+        return task
+
+    tid_cache_dir = openml.utils._create_cache_directory_for_id(
+        TASKS_CACHE_DIR_NAME, task_id,
+    )
+    downloads = {}
+    task_file = os.path.join(tid_cache_dir, "task.xml")
+    if os.path.exists(task_file):
+        task_dict = openml.utils._parse_cached_xml(task_file)
+    else:
+        downloads['task.xml'] = await _perform_api_call_async(
+            "task/%d" % task_id
+        )
+        task_dict = xmltodict.parse(downloads['task.xml'])
+    task = _create_task_from_dict(task_dict)
+
+    calls = [get_dataset_async(task.dataset_id)]
+    # Clustering tasks do not have data splits
+    if isinstance(task, OpenMLSupervisedTask) and not os.path.exists(
+            os.path.join(tid_cache_dir, "datasplits.arff")):
+        calls.append(
+            _read_url_async(task.estimation_procedure["data_splits_url"])
+        )
+    results = await asyncio.gather(*calls)
+    if len(results) > 1:
+        downloads['datasplits.arff'] = results[1]
+
+    if downloads:
+        await _run_in_executor(_fill_cache, TASKS_CACHE_DIR_NAME, task_id,
+                               tid_cache_dir, downloads)
+    return await _run_in_executor(get_task, task_id)
+
+
+async def get_flow_async(flow_id, reinstantiate=False):
+    """Download the OpenML flow for a given flow ID without blocking the
+    event loop.
+
+    Asynchronous variant of :func:`openml.flows.get_flow`.
+
+    Parameters
+    ----------
+    flow_id : int
+        The OpenML flow id.
+
+    reinstantiate: bool
+        Whether to reinstantiate the flow to a sklearn model.
+
+    Returns
+    -------
+    flow : OpenMLFlow
+        the flow
+    """
+    flow_id = int(flow_id)
+    flow = openml.utils._memory_cache_get(FLOWS_CACHE_DIR_NAME, flow_id)
+    if flow is None:
+        flow_dir = openml.utils._create_cache_directory_for_id(
+            FLOWS_CACHE_DIR_NAME, flow_id,
+        )
+        if _missing_files(flow_dir, ['flow.xml']):
+            flow_xml = await _perform_api_call_async("flow/%d" % flow_id)
+            await _run_in_executor(_fill_cache, FLOWS_CACHE_DIR_NAME,
+                                   flow_id, flow_dir, {'flow.xml': flow_xml})
+
+    return await _run_in_executor(get_flow, flow_id,
+                                  reinstantiate=reinstantiate)
+
+
+async def get_run_async(run_id):
+    """Gets run corresponding to run_id without blocking the event loop.
+
+    Asynchronous variant of :func:`openml.runs.get_run`.
+
+    Parameters
+    ----------
+    run_id : int
+
+    Returns
+    -------
+    run : OpenMLRun
+        Run corresponding to ID, fetched from the server.
+    """
+    run = openml.utils._memory_cache_get(RUNS_CACHE_DIR_NAME, run_id)
+    if run is not None:
+        return run
+
+    run_dir = openml.utils._create_cache_directory_for_id(RUNS_CACHE_DIR_NAME,
+                                                          run_id)
+    if _missing_files(run_dir, ['description.xml']):
+        run_xml = await _perform_api_call_async("run/%d" % run_id)
+        await _run_in_executor(_fill_cache, RUNS_CACHE_DIR_NAME, run_id,
+                               run_dir, {'description.xml': run_xml})
+
+    return await _run_in_executor(get_run, run_id)
+
+
+async def get_setup_async(setup_id):
+    """Downloads the setup (configuration) description from OpenML without
+    blocking the event loop.
+
+    Asynchronous variant of :func:`openml.setups.get_setup`.
+
+    Parameters
+    ----------
+    setup_id : int
+        The Openml setup_id
+
+    Returns
+    -------
+    OpenMLSetup
+        an initialized openml setup object
+    """
+    setup = openml.utils._memory_cache_get('setups', setup_id)
+    if setup is not None:
+        return setup
+
+    setup_dir = openml.utils._create_cache_directory_for_id('setups',
+                                                            setup_id)
+    if _missing_files(setup_dir, ['description.xml']):
+        setup_xml = await _perform_api_call_async('/setup/%d' % setup_id)
+        await _run_in_executor(_fill_cache, 'setups', setup_id, setup_dir,
+                               {'description.xml': setup_xml})
+
+    return await _run_in_executor(get_setup, setup_id)
+
+
+async def _list_all_async(listing_call, *args, **filters):
+    """Asynchronous variant of :func:`openml.utils._list_all`.
+
+    Parameters
+    ----------
+    listing_call : coroutine function
+        Coroutine function which requests a single page.
+    *args : Variable length argument list
+        Any required arguments for the listing call.
+    **filters : Arbitrary keyword arguments
+        Any filters that can be applied to the listing function.
+
+    Returns
+    -------
+    dict
+    """
+    pager = openml.utils._ListingPager(filters)
+    while not pager.done:
+        try:
+            new_batch = await listing_call(*args, **pager.page_filters())
+        except OpenMLServerNoResult:
+            # we want to return an empty dict in this case
+            break
+        pager.add_page(new_batch)
+    return pager.result
+
+
+async def _list_datasets_async(**kwargs):
+    xml_string = await _perform_api_call_async(
+        _list_datasets_api_call(**kwargs)
+    )
+    return _parse_datasets_list(xml_string)
+
+
+async def list_datasets_async(offset=None, size=None, status=None, tag=None,
+                              **kwargs):
+    """Return a list of all dataset which are on OpenML without blocking the
+    event loop.
+
+    Asynchronous variant of :func:`openml.datasets.list_datasets`, which
+    describes the parameters.
+
+    Returns
+    -------
+    datasets : dict of dicts
+        A mapping from dataset ID to dict.
+    """
+    return await _list_all_async(_list_datasets_async, offset=offset,
+                                 size=size, status=status, tag=tag, **kwargs)
+
+
+async def _list_runs_async(**kwargs):
+    xml_string = await _perform_api_call_async(_list_runs_api_call(**kwargs))
+    return _parse_runs_list(xml_string)
+
+
+async def list_runs_async(offset=None, size=None, id=None, task=None,
+                          setup=None, flow=None, uploader=None, tag=None,
+                          display_errors=False, **kwargs):
+    """List all runs matching all of the given filters without blocking the
+    event loop.
+
+    Asynchronous variant of :func:`openml.runs.list_runs`, which describes
+    the parameters.
+
+    Returns
+    -------
+    dict
+        List of found runs.
+    """
+    return await _list_all_async(_list_runs_async, offset=offset, size=size,
+                                 id=id, task=task, setup=setup, flow=flow,
+                                 uploader=uploader, tag=tag,
+                                 display_errors=display_errors, **kwargs)
+
+
+async def _list_evaluations_async(function, **kwargs):
+    xml_string = await _perform_api_call_async(
+        _list_evaluations_api_call(function, **kwargs)
+    )
+    return _parse_evaluations_list(xml_string)
+
+
+async def list_evaluations_async(function, offset=None, size=None, id=None,
+                                 task=None, setup=None, flow=None,
+                                 uploader=None, tag=None, per_fold=None):
+    """List all run-evaluation pairs matching all of the given filters
+    without blocking the event loop.
+
+    Asynchronous variant of :func:`openml.evaluations.list_evaluations`,
+    which describes the parameters.
+
+    Returns
+    -------
+    dict
+    """
+    if per_fold is not None:
+        per_fold = str(per_fold).lower()
+
+    return await _list_all_async(_list_evaluations_async, function,
+                                 offset=offset, size=size, id=id, task=task,
+                                 setup=setup, flow=flow, uploader=uploader,
+                                 tag=tag, per_fold=per_fold)
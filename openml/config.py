@@ -22,6 +22,14 @@ _defaults = {
     'cachedir': os.path.expanduser(os.path.join('~', '.openml', 'cache')),
     'avoid_duplicate_runs': 'True',
     'connection_n_retries': 2,
+    'retry_backoff': 0.1,
+    'retry_max_backoff': 10,
+    'max_requests_per_second': None,
+    'cache_size_limit': None,
+    'memory_cache_entries': 0,
+    'memory_cache_size_limit': None,
+    'offline': 'False',
+    'evaluation_store': 'False',
 }
 
 config_file = os.path.expanduser(os.path.join('~', '.openml' 'config'))
@@ -33,9 +41,44 @@ apikey = ""
 # The current cache directory (without the server name)
 cache_directory = ""
 
-# Number of retries if the connection breaks
+# Number of retries if the connection breaks or the server is temporarily
+# unavailable
 connection_n_retries = 2
 
+# Retries wait for an exponentially growing time, starting at retry_backoff
+# seconds and capped at retry_max_backoff seconds
+retry_backoff = 0.1
+retry_max_backoff = 10
+
+# Maximum number of requests per second sent to the server by all threads of
+# this process. None means that requests are not limited.
+max_requests_per_second = None
+
+# Maximum size of the cache directory in bytes. If set, the least recently
+# used datasets, tasks, flows, runs and setups are removed from the cache
+# once it grows larger than this. None means that the cache can grow unbounded.
+cache_size_limit = None
+
+# Maximum number of datasets, tasks, flows, runs and setups which are kept in
+# memory, so that repeated calls to get_dataset etc. return the same object.
+# 0 disables the in-memory cache.
+memory_cache_entries = 0
+
+# Maximum estimated size of the objects kept in memory in bytes. None means
+# that only the number of objects is bounded.
+memory_cache_size_limit = None
+
+# In offline mode, no requests are sent to the server. Everything is loaded
+# from the cache, and anything which is not cached raises an
+# OpenMLCacheMissError.
+offline = False
+
+# If enabled, list_evaluations stores the evaluations it lists in the cache
+# directory. Repeating a listing only downloads evaluations which are newer
+# than the stored ones. In offline mode, stored listings are answered from
+# the cache.
+evaluation_store = False
+
 
 def _setup():
     """Setup openml package. Called on first import.
@@ -51,6 +94,14 @@ def _setup():
     global cache_directory
     global avoid_duplicate_runs
     global connection_n_retries
+    global retry_backoff
+    global retry_max_backoff
+    global max_requests_per_second
+    global cache_size_limit
+    global memory_cache_entries
+    global memory_cache_size_limit
+    global offline
+    global evaluation_store
     # read config file, create cache directory
     try:
         os.mkdir(os.path.expanduser(os.path.join('~', '.openml')))
@@ -62,12 +113,32 @@ def _setup():
     server = config.get('FAKE_SECTION', 'server')
     cache_directory = os.path.expanduser(config.get('FAKE_SECTION', 'cachedir'))
     avoid_duplicate_runs = config.getboolean('FAKE_SECTION', 'avoid_duplicate_runs')
-    connection_n_retries = config.get('FAKE_SECTION', 'connection_n_retries')
+    connection_n_retries = int(
+        config.get('FAKE_SECTION', 'connection_n_retries')
+    )
     if connection_n_retries > 20:
         raise ValueError(
             'A higher number of retries than 20 is not allowed to keep the '
             'server load reasonable'
         )
+    retry_backoff = float(config.get('FAKE_SECTION', 'retry_backoff'))
+    retry_max_backoff = float(config.get('FAKE_SECTION', 'retry_max_backoff'))
+    max_requests_per_second = config.get('FAKE_SECTION',
+                                         'max_requests_per_second')
+    if max_requests_per_second is not None:
+        max_requests_per_second = float(max_requests_per_second)
+    cache_size_limit = config.get('FAKE_SECTION', 'cache_size_limit')
+    if cache_size_limit is not None:
+        cache_size_limit = int(cache_size_limit)
+    memory_cache_entries = int(
+        config.get('FAKE_SECTION', 'memory_cache_entries')
+    )
+    memory_cache_size_limit = config.get('FAKE_SECTION',
+                                         'memory_cache_size_limit')
+    if memory_cache_size_limit is not None:
+        memory_cache_size_limit = int(memory_cache_size_limit)
+    offline = config.getboolean('FAKE_SECTION', 'offline')
+    evaluation_store = config.getboolean('FAKE_SECTION', 'evaluation_store')
 
 
 def _parse_config():
@@ -6,13 +6,13 @@ from collections import OrderedDict
 
 import arff
 import numpy as np
-import scipy.sparse
 import xmltodict
 import six
 from six.moves import cPickle as pickle
 from warnings import warn
 
 import openml._api_calls
+import openml.utils
 from .data_feature import OpenMLDataFeature
 from ..exceptions import PyOpenMLError
 
@@ -179,6 +179,7 @@ class OpenMLDataset(object):
                     attribute_names = [name for name, type_ in data['attributes']]
 
                     if self.format.lower() == 'sparse_arff':
+                        import scipy.sparse
                         X = data['data']
                         X_shape = (max(X[1]) + 1, max(X[2]) + 1)
                         X = scipy.sparse.coo_matrix(
@@ -189,8 +190,9 @@ class OpenMLDataset(object):
                     else:
                         raise Exception()
 
-                    with open(self.data_pickle_file, "wb") as fh:
+                    with openml.utils._atomic_write(self.data_pickle_file) as fh:
                         pickle.dump((X, categorical, attribute_names), fh, -1)
+                    openml.utils._register_cache_file(self.data_pickle_file)
                     logger.debug("Saved dataset %d: %s to file %s" %
                                  (int(self.dataset_id or -1), self.name, self.data_pickle_file))
 
@@ -204,6 +206,7 @@ class OpenMLDataset(object):
         """
         data = {'data_id': self.dataset_id, 'tag': tag}
         openml._api_calls._perform_api_call("/data/tag", data=data)
+        openml.utils._memory_cache_invalidate('datasets', self.dataset_id)
 
     def remove_tag(self, tag):
         """Removes a tag from this dataset on the server.
@@ -215,6 +218,7 @@ class OpenMLDataset(object):
         """
         data = {'data_id': self.dataset_id, 'tag': tag}
         openml._api_calls._perform_api_call("/data/untag", data=data)
+        openml.utils._memory_cache_invalidate('datasets', self.dataset_id)
 
     def __eq__(self, other):
 
@@ -389,6 +393,7 @@ class OpenMLDataset(object):
                 sys.stdout.flush()
                 raise e
 
+            import scipy.sparse
             if scipy.sparse.issparse(y):
                 y = np.asarray(y.todense()).astype(target_dtype).flatten()
 
@@ -539,6 +544,7 @@ class OpenMLDataset(object):
             file_elements=file_elements,
         )
         self.dataset_id = int(xmltodict.parse(return_value)['oml:upload_data_set']['oml:id'])
+        openml.utils._memory_cache_invalidate('datasets', self.dataset_id)
         return self.dataset_id
 
 
@@ -1,16 +1,12 @@
 import hashlib
 import io
 import os
-import re
 
 import numpy as np
 import six
 import arff
-import pandas as pd
 
 import xmltodict
-from scipy.sparse import coo_matrix
-from oslo_concurrency import lockutils
 from collections import OrderedDict
 from warnings import warn
 
@@ -19,19 +15,21 @@ import openml._api_calls
 from .dataset import OpenMLDataset
 from ..exceptions import (
     OpenMLCacheException,
+    OpenMLCacheMissError,
     OpenMLHashException,
     OpenMLServerException,
     PrivateDatasetError,
 )
 from ..utils import (
-    _create_cache_directory,
     _remove_cache_dir_for_id,
     _create_cache_directory_for_id,
-    _create_lockfiles_dir,
 )
 
 
 DATASETS_CACHE_DIR_NAME = 'datasets'
+# Files in the cache directory of a dataset which are needed to load it
+DATASET_CACHE_FILENAMES = ('description.xml', 'dataset.arff', 'features.xml',
+                           'qualities.xml')
 
 
 
@@ -47,32 +45,11 @@ def _list_cached_datasets():
     list
         List with IDs of all cached datasets.
     """
-    datasets = []
-
-    dataset_cache_dir = _create_cache_directory(DATASETS_CACHE_DIR_NAME)
-    directory_content = os.listdir(dataset_cache_dir)
-    directory_content.sort()
-
     # Find all dataset ids for which we have downloaded the dataset
     # description
-    for directory_name in directory_content:
-        # First check if the directory name could be an OpenML dataset id
-        if not re.match(r"[0-9]*", directory_name):
-            continue
-
-        dataset_id = int(directory_name)
-
-        directory_name = os.path.join(dataset_cache_dir,
-                                      directory_name)
-        dataset_directory_content = os.listdir(directory_name)
-
-        if ("dataset.arff" in dataset_directory_content and
-                "description.xml" in dataset_directory_content):
-            if dataset_id not in datasets:
-                datasets.append(dataset_id)
-
-    datasets.sort()
-    return datasets
+    return openml.utils._list_cached_ids(
+        DATASETS_CACHE_DIR_NAME, ["dataset.arff", "description.xml"],
+    )
 
 
 def _get_cached_datasets():
@@ -110,9 +87,8 @@ def _get_cached_dataset_description(dataset_id):
     )
     description_file = os.path.join(did_cache_dir, "description.xml")
     try:
-        with io.open(description_file, encoding='utf8') as fh:
-            dataset_xml = fh.read()
-        return xmltodict.parse(dataset_xml)["oml:data_set_description"]
+        return openml.utils._parse_cached_xml(description_file)[
+            "oml:data_set_description"]
     except (IOError, OSError):
         raise OpenMLCacheException(
             "Dataset description for dataset id %d not "
@@ -125,9 +101,8 @@ def _get_cached_dataset_features(dataset_id):
     )
     features_file = os.path.join(did_cache_dir, "features.xml")
     try:
-        with io.open(features_file, encoding='utf8') as fh:
-            features_xml = fh.read()
-            return xmltodict.parse(features_xml)["oml:data_features"]
+        return openml.utils._parse_cached_xml(features_file)[
+            "oml:data_features"]
     except (IOError, OSError):
         raise OpenMLCacheException("Dataset features for dataset id %d not "
                                    "cached" % dataset_id)
@@ -139,9 +114,8 @@ def _get_cached_dataset_qualities(dataset_id):
     )
     qualities_file = os.path.join(did_cache_dir, "qualities.xml")
     try:
-        with io.open(qualities_file, encoding='utf8') as fh:
-            qualities_xml = fh.read()
-            return xmltodict.parse(qualities_xml)["oml:data_qualities"]['oml:quality']
+        return openml.utils._parse_cached_xml(qualities_file)[
+            "oml:data_qualities"]['oml:quality']
     except (IOError, OSError):
         raise OpenMLCacheException("Dataset qualities for dataset id %d not "
                                    "cached" % dataset_id)
@@ -218,18 +192,27 @@ def _list_datasets(**kwargs):
     -------
     datasets : dict of dicts
     """
+    return __list_datasets(_list_datasets_api_call(**kwargs))
+
 
+def _list_datasets_api_call(**kwargs):
+    """Create the api call of _list_datasets."""
     api_call = "data/list"
 
     if kwargs is not None:
         for operator, value in kwargs.items():
             api_call += "/%s/%s" % (operator, value)
-    return __list_datasets(api_call)
+    return api_call
 
 
 def __list_datasets(api_call):
 
     xml_string = openml._api_calls._perform_api_call(api_call)
+    return _parse_datasets_list(xml_string)
+
+
+def _parse_datasets_list(xml_string):
+    """Parse the xml returned by the api call of _list_datasets."""
     datasets_dict = xmltodict.parse(xml_string, force_list=('oml:dataset',))
 
     # Minimalistic check if the XML is useful
@@ -330,10 +313,32 @@ def get_dataset(dataset_id):
         raise ValueError("Dataset ID is neither an Integer nor can be "
                          "cast to an Integer.")
 
-    with lockutils.external_lock(
-        name='datasets.functions.get_dataset:%d' % dataset_id,
-        lock_path=_create_lockfiles_dir(),
-    ):
+    dataset = openml.utils._memory_cache_get(DATASETS_CACHE_DIR_NAME,
+                                             dataset_id)
+    if dataset is not None:
+        return dataset
+
+    # A fully cached dataset is read under a shared lock, so that many
+    # processes can load the same dataset at the same time
+    with openml.utils._cache_entity_lock(DATASETS_CACHE_DIR_NAME, dataset_id,
+                                         shared=True):
+        did_cache_dir = _create_cache_directory_for_id(
+            DATASETS_CACHE_DIR_NAME, dataset_id,
+        )
+        if all(os.path.exists(os.path.join(did_cache_dir, filename))
+               for filename in DATASET_CACHE_FILENAMES):
+            description = _get_dataset_description(did_cache_dir, dataset_id)
+            arff_file = _get_dataset_arff(did_cache_dir, description)
+            features = _get_dataset_features(did_cache_dir, dataset_id)
+            qualities = _get_dataset_qualities(did_cache_dir, dataset_id)
+            dataset = _create_dataset_from_description(
+                description, features, qualities, arff_file
+            )
+            openml.utils._memory_cache_put(DATASETS_CACHE_DIR_NAME,
+                                           dataset_id, dataset)
+            return dataset
+
+    with openml.utils._cache_entity_lock(DATASETS_CACHE_DIR_NAME, dataset_id):
         did_cache_dir = _create_cache_directory_for_id(
             DATASETS_CACHE_DIR_NAME, dataset_id,
         )
@@ -345,6 +350,10 @@ def get_dataset(dataset_id):
             features = _get_dataset_features(did_cache_dir, dataset_id)
             qualities = _get_dataset_qualities(did_cache_dir, dataset_id)
             remove_dataset_cache = False
+        except OpenMLCacheMissError:
+            # Keep what is cached for offline use
+            remove_dataset_cache = False
+            raise
         except OpenMLServerException as e:
             # if there was an exception, check if the user had access to the dataset
             if e.code == 112:
@@ -358,6 +367,8 @@ def get_dataset(dataset_id):
         dataset = _create_dataset_from_description(
             description, features, qualities, arff_file
         )
+    openml.utils._memory_cache_put(DATASETS_CACHE_DIR_NAME, dataset_id,
+                                   dataset)
     return dataset
 
 
@@ -374,6 +385,8 @@ def attributes_arff_from_df(df):
     attributes_arff : str
         The data set attributes as required by the ARFF format.
     """
+    import pandas as pd
+
     PD_DTYPES_TO_ARFF_DTYPE = {
         'integer': 'INTEGER',
         'floating': 'REAL',
@@ -484,6 +497,9 @@ def create_dataset(name, description, creator, contributor,
     -------
     class:`openml.OpenMLDataset`
         Dataset description."""
+    # pandas and scipy are only imported when creating a dataset
+    import pandas as pd
+    from scipy.sparse import coo_matrix
 
     if isinstance(data, (pd.DataFrame, pd.SparseDataFrame)):
         # infer the row id from the index of the dataset
@@ -619,6 +635,7 @@ def status_update(data_id, status):
     data = {'data_id': data_id, 'status': status}
     result_xml = openml._api_calls._perform_api_call("data/status/update",
                                                      data=data)
+    openml.utils._memory_cache_invalidate(DATASETS_CACHE_DIR_NAME, data_id)
     result = xmltodict.parse(result_xml)
     server_data_id = result['oml:data_status_update']['oml:id']
     server_status = result['oml:data_status_update']['oml:status']
@@ -630,7 +647,8 @@ def status_update(data_id, status):
 def _get_dataset_description(did_cache_dir, dataset_id):
     """Get the dataset description as xml dictionary.
 
-    This function is NOT thread/multiprocessing safe.
+    Must be called while holding the exclusive lock on the dataset, unless
+    the file is already cached.
 
     Parameters
     ----------
@@ -654,11 +672,15 @@ def _get_dataset_description(did_cache_dir, dataset_id):
     description_file = os.path.join(did_cache_dir, "description.xml")
 
     try:
-        return _get_cached_dataset_description(dataset_id)
+        description = _get_cached_dataset_description(dataset_id)
+        openml.utils._record_cache_access(DATASETS_CACHE_DIR_NAME, hit=True)
+        return description
     except OpenMLCacheException:
+        openml.utils._record_cache_access(DATASETS_CACHE_DIR_NAME, hit=False)
         dataset_xml = openml._api_calls._perform_api_call("data/%d" % dataset_id)
-        with io.open(description_file, "w", encoding='utf8') as fh:
-            fh.write(dataset_xml)
+        openml.utils._write_cache_file(did_cache_dir, "description.xml",
+                                       dataset_xml)
+        openml.utils._evict_cache(keep=did_cache_dir)
 
     description = xmltodict.parse(dataset_xml)[
         "oml:data_set_description"]
@@ -672,7 +694,8 @@ def _get_dataset_arff(did_cache_dir, description):
     Checks if the file is in the cache, if yes, return the path to the file. If
     not, downloads the file and caches it, then returns the file path.
 
-    This function is NOT thread/multiprocessing safe.
+    Must be called while holding the exclusive lock on the dataset, unless
+    the file is already cached.
 
     Parameters
     ----------
@@ -688,20 +711,33 @@ def _get_dataset_arff(did_cache_dir, description):
         Location of ARFF file.
     """
     output_file_path = os.path.join(did_cache_dir, "dataset.arff")
-    md5_checksum_fixture = description.get("oml:md5_checksum")
-    did = description.get("oml:id")
 
     # This means the file is still there; whether it is useful is up to
     # the user and not checked by the program.
     try:
         with io.open(output_file_path, encoding='utf8'):
             pass
+        openml.utils._record_cache_access(DATASETS_CACHE_DIR_NAME, hit=True)
         return output_file_path
     except (OSError, IOError):
-        pass
+        openml.utils._record_cache_access(DATASETS_CACHE_DIR_NAME, hit=False)
 
     url = description['oml:url']
     arff_string = openml._api_calls._read_url(url)
+    _check_arff_checksum(arff_string, description)
+
+    openml.utils._write_cache_file(did_cache_dir, "dataset.arff", arff_string)
+    del arff_string
+    openml.utils._evict_cache(keep=did_cache_dir)
+
+    return output_file_path
+
+
+def _check_arff_checksum(arff_string, description):
+    """Raise an OpenMLHashException if the md5 checksum of a downloaded ARFF
+    file differs from the one in the dataset description."""
+    md5_checksum_fixture = description.get("oml:md5_checksum")
+    did = description.get("oml:id")
     md5 = hashlib.md5()
     md5.update(arff_string.encode('utf-8'))
     md5_checksum = md5.hexdigest()
@@ -713,12 +749,6 @@ def _get_dataset_arff(did_cache_dir, description):
             )
         )
 
-    with io.open(output_file_path, "w", encoding='utf8') as fh:
-        fh.write(arff_string)
-    del arff_string
-
-    return output_file_path
-
 
 def _get_dataset_features(did_cache_dir, dataset_id):
     """API call to get dataset features (cached)
@@ -726,7 +756,8 @@ def _get_dataset_features(did_cache_dir, dataset_id):
     Features are feature descriptions for each column.
     (name, index, categorical, ...)
 
-    This function is NOT thread/multiprocessing safe.
+    Must be called while holding the exclusive lock on the dataset, unless
+    the file is already cached.
 
     Parameters
     ----------
@@ -745,15 +776,20 @@ def _get_dataset_features(did_cache_dir, dataset_id):
 
     # Dataset features aren't subject to change...
     try:
-        with io.open(features_file, encoding='utf8') as fh:
-            features_xml = fh.read()
+        features = openml.utils._parse_cached_xml(
+            features_file, force_list=('oml:feature',),
+        )
+        openml.utils._record_cache_access(DATASETS_CACHE_DIR_NAME, hit=True)
     except (OSError, IOError):
+        openml.utils._record_cache_access(DATASETS_CACHE_DIR_NAME, hit=False)
         features_xml = openml._api_calls._perform_api_call("data/features/%d" % dataset_id)
 
-        with io.open(features_file, "w", encoding='utf8') as fh:
-            fh.write(features_xml)
+        openml.utils._write_cache_file(did_cache_dir, "features.xml",
+                                       features_xml)
+        openml.utils._evict_cache(keep=did_cache_dir)
+        features = xmltodict.parse(features_xml, force_list=('oml:feature',))
 
-    features = xmltodict.parse(features_xml, force_list=('oml:feature',))["oml:data_features"]
+    features = features["oml:data_features"]
 
     return features
 
@@ -763,7 +799,8 @@ def _get_dataset_qualities(did_cache_dir, dataset_id):
 
     Features are metafeatures (number of features, number of classes, ...)
 
-    This function is NOT thread/multiprocessing safe.
+    Must be called while holding the exclusive lock on the dataset, unless
+    the file is already cached.
 
     Parameters
     ----------
@@ -781,15 +818,20 @@ def _get_dataset_qualities(did_cache_dir, dataset_id):
     # Dataset qualities are subject to change and must be fetched every time
     qualities_file = os.path.join(did_cache_dir, "qualities.xml")
     try:
-        with io.open(qualities_file, encoding='utf8') as fh:
-            qualities_xml = fh.read()
+        qualities = openml.utils._parse_cached_xml(
+            qualities_file, force_list=('oml:quality',),
+        )
+        openml.utils._record_cache_access(DATASETS_CACHE_DIR_NAME, hit=True)
     except (OSError, IOError):
+        openml.utils._record_cache_access(DATASETS_CACHE_DIR_NAME, hit=False)
         qualities_xml = openml._api_calls._perform_api_call("data/qualities/%d" % dataset_id)
 
-        with io.open(qualities_file, "w", encoding='utf8') as fh:
-            fh.write(qualities_xml)
+        openml.utils._write_cache_file(did_cache_dir, "qualities.xml",
+                                       qualities_xml)
+        openml.utils._evict_cache(keep=did_cache_dir)
+        qualities = xmltodict.parse(qualities_xml, force_list=('oml:quality',))
 
-    qualities = xmltodict.parse(qualities_xml, force_list=('oml:quality',))['oml:data_qualities']['oml:quality']
+    qualities = qualities['oml:data_qualities']['oml:quality']
 
     return qualities
 
@@ -1,14 +1,29 @@
+from collections import OrderedDict
+import functools
 import json
+import re
+import threading
+
+import numpy as np
 import xmltodict
 
 import openml.utils
 import openml._api_calls
+from .. import config
 from ..evaluations import OpenMLEvaluation
 
 
-def list_evaluations(function, offset=None, size=None, id=None, task=None,
-                     setup=None, flow=None, uploader=None, tag=None,
-                     per_fold=None):
+# Number of stored evaluations which are downloaded again when a listing in
+# the evaluation store is synchronized, to detect deleted evaluations
+_STORE_SYNC_OVERLAP = 100
+
+_RUN_ID_PATTERN = re.compile(r'<oml:run_id>\s*([0-9]+)\s*</oml:run_id>')
+_FOLD_VALUES_PATTERN = re.compile(r'<oml:values>([^<]*)</oml:values>')
+
+
+def list_evaluations(function=None, offset=None, size=None, id=None,
+                     task=None, setup=None, flow=None, uploader=None, tag=None,
+                     per_fold=None, functions=None, output_format='dict'):
     """
     List all run-evaluation pairs matching all of the given filters.
     (Supports large amount of results)
@@ -16,7 +31,8 @@ def list_evaluations(function, offset=None, size=None, id=None, task=None,
     Parameters
     ----------
     function : str
-        the evaluation function. e.g., predictive_accuracy
+        the evaluation function. e.g., predictive_accuracy. Either
+        ``function`` or ``functions`` must be given.
     offset : int, optional
         the number of runs to skip, starting from the first
     size : int, optional
@@ -36,19 +52,396 @@ def list_evaluations(function, offset=None, size=None, id=None, task=None,
 
     per_fold : bool, optional
 
+    functions : list, optional
+        several evaluation functions, which are listed concurrently. ``offset``
+        and ``size`` apply to the listing of each function.
+
+    output_format : str, optional (default='dict')
+        ``dict`` or ``array``. ``array`` requires ``per_fold`` and a single
+        ``function``, and returns the values per fold as a NumPy array.
+
     Returns
     -------
-    dict
+    dict or pandas.DataFrame
+        A dict mapping run IDs to ``OpenMLEvaluation`` objects for a single
+        ``function``. For ``functions``, a DataFrame indexed by run ID with
+        the columns ``task_id``, ``setup_id``, ``flow_id``, ``flow_name``,
+        ``data_id``, ``data_name`` and ``upload_time``, followed by one column
+        per function. It holds the value of the function, or the list of
+        values per fold if ``per_fold`` is True, and is missing for runs which
+        were not evaluated with the function.
+
+        For ``output_format='array'``, a tuple ``(run_ids, values)`` of the
+        sorted run IDs and a float array of shape ``(n_runs, n_repeats,
+        n_folds)`` with the value of each run on each fold. Runs with fewer
+        repeats or folds than others are padded with NaN.
+
+    Notes
+    -----
+    If the configuration option ``evaluation_store`` is enabled, listings
+    without ``offset`` and ``size`` are stored in the cache directory.
+    Repeating such a listing only downloads the evaluations which were added
+    since, and in offline mode a stored listing is returned without asking
+    the server. Evaluations of runs which were deleted on the server can
+    remain in a stored listing until more than 100 of its evaluations were
+    deleted.
     """
+    if (function is None) == (functions is None):
+        raise ValueError('Exactly one of function and functions must be '
+                         'given')
+    if output_format not in ('dict', 'array'):
+        raise ValueError("output_format must be 'dict' or 'array', got %s"
+                         % output_format)
     if per_fold is not None:
         per_fold = str(per_fold).lower()
 
+    if output_format == 'array':
+        if function is None or per_fold != 'true':
+            raise ValueError("output_format='array' requires a single "
+                             "function and per_fold=True")
+        return _list_evaluations_fold_values(
+            function, offset=offset, size=size, id=id, task=task,
+            setup=setup, flow=flow, uploader=uploader, tag=tag,
+            per_fold=per_fold,
+        )
+
+    if functions is not None:
+        return _list_evaluations_of_functions(
+            functions, offset=offset, size=size, id=id, task=task,
+            setup=setup, flow=flow, uploader=uploader, tag=tag,
+            per_fold=per_fold,
+        )
+
+    if config.evaluation_store and offset is None and size is None:
+        return _list_stored_evaluations(function, id=id, task=task,
+                                        setup=setup, flow=flow,
+                                        uploader=uploader, tag=tag,
+                                        per_fold=per_fold)
+
     return openml.utils._list_all(_list_evaluations, function, offset=offset,
                                   size=size, id=id, task=task, setup=setup,
                                   flow=flow, uploader=uploader, tag=tag,
                                   per_fold=per_fold)
 
 
+def _list_evaluations_of_functions(functions, offset=None, size=None,
+                                   **filters):
+    """List the evaluations of several functions concurrently and join them
+    by run ID, see :func:`list_evaluations`.
+
+    Each function is listed by a thread of its own. Pages are added to the
+    joined columns as they arrive, so that the information about a run is
+    stored only once rather than once per function.
+    """
+    import pandas as pd
+
+    functions = list(OrderedDict.fromkeys(functions))
+    if len(functions) == 0:
+        raise ValueError('functions must not be empty')
+    per_fold = filters.get('per_fold') == 'true'
+    lock = threading.Lock()
+    runs = {}
+    values = {function: {} for function in functions}
+    errors = []
+
+    def add_evaluations(function, evaluations):
+        with lock:
+            function_values = values[function]
+            for run_id, evaluation in evaluations.items():
+                if run_id not in runs:
+                    runs[run_id] = (evaluation.task_id, evaluation.setup_id,
+                                    evaluation.flow_id, evaluation.flow_name,
+                                    evaluation.data_id, evaluation.data_name,
+                                    evaluation.upload_time)
+                function_values[run_id] = (evaluation.values if per_fold
+                                           else evaluation.value)
+        return evaluations.keys()
+
+    def list_function(function):
+        try:
+            if config.evaluation_store and offset is None and size is None:
+                add_evaluations(function,
+                                _list_stored_evaluations(function, **filters))
+            else:
+                openml.utils._list_all_pages(
+                    _list_evaluations,
+                    functools.partial(add_evaluations, function), function,
+                    offset=offset, size=size, **filters)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=list_function, args=(function,))
+               for function in functions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+    run_ids = sorted(runs)
+    evaluations = pd.DataFrame(
+        [runs[run_id] for run_id in run_ids],
+        columns=['task_id', 'setup_id', 'flow_id', 'flow_name', 'data_id',
+                 'data_name', 'upload_time'],
+        index=pd.Index(run_ids, name='run_id'),
+    )
+    for function in functions:
+        function_values = values.pop(function)
+        evaluations[function] = [function_values.get(run_id)
+                                 for run_id in run_ids]
+    return evaluations
+
+
+def _list_evaluations_fold_values(function, offset=None, size=None,
+                                  **filters):
+    """List the values per fold of an evaluation function as an array, see
+    :func:`list_evaluations`.
+
+    The values are read from the XML of the listing without parsing it into
+    ``OpenMLEvaluation`` objects, and converted to floats all at once.
+    """
+    run_ids = []
+    fold_values = []
+
+    def list_page(function, **page_filters):
+        api_call = _list_evaluations_api_call(function, **page_filters)
+        xml_string = openml._api_calls._perform_api_call(api_call)
+        return _parse_evaluations_fold_values(xml_string)
+
+    def add_page(page):
+        page_run_ids, page_fold_values = page
+        run_ids.extend(page_run_ids)
+        fold_values.extend(page_fold_values)
+        return page_run_ids
+
+    if config.evaluation_store and offset is None and size is None:
+        evaluations = _list_stored_evaluations(function, **filters)
+        for run_id, evaluation in evaluations.items():
+            run_ids.append(run_id)
+            fold_values.append(json.dumps(evaluation.values or []))
+    else:
+        openml.utils._list_all_pages(list_page, add_page, function,
+                                     offset=offset, size=size, **filters)
+    return _fold_values_to_array(run_ids, fold_values)
+
+
+def _parse_evaluations_fold_values(xml_string):
+    """Extract the run IDs and the values per fold in JSON format from the
+    xml returned by the api call of _list_evaluations.
+
+    Returns
+    -------
+    run_ids : list
+
+    fold_values : list
+    """
+    if 'oml:evaluations' not in xml_string:
+        raise ValueError('Error in return XML, does not contain '
+                         '"oml:evaluations": %s' % xml_string[:1000])
+    run_ids = []
+    fold_values = []
+    for evaluation in xml_string.split('</oml:evaluation>')[:-1]:
+        run_ids.append(int(_RUN_ID_PATTERN.search(evaluation).group(1)))
+        values = _FOLD_VALUES_PATTERN.search(evaluation)
+        fold_values.append('[]' if values is None else values.group(1))
+    return run_ids, fold_values
+
+
+def _fold_values_to_array(run_ids, fold_values):
+    """Convert values per fold in JSON format into an array.
+
+    Parameters
+    ----------
+    run_ids : list
+
+    fold_values : list
+        For each run, a JSON list of lists with the values of each repeat
+        and fold, or a flat list for a single repeat.
+
+    Returns
+    -------
+    run_ids : np.ndarray
+        Sorted run IDs.
+
+    values : np.ndarray
+        Array of shape ``(n_runs, n_repeats, n_folds)``, padded with NaN.
+
+    Raises
+    ------
+    ValueError
+        If the values of a run are neither a list of numbers nor a list of
+        lists of numbers.
+    """
+    # Numbers per repeat of each run
+    shapes = []
+    for values in fold_values:
+        values = re.sub(r'\s+', '', values)
+        if values.startswith('[['):
+            repeats = values[2:-2].split('],[')
+        elif values.strip('[]'):
+            repeats = [values.strip('[]')]
+        else:
+            repeats = []
+        if any('[' in repeat or ']' in repeat for repeat in repeats):
+            # e.g. values per sample of learning curve tasks
+            raise ValueError('Values per fold must be nested at most two '
+                             'levels deep, got %s' % values)
+        shapes.append(tuple(repeat.count(',') + 1 if repeat else 0
+                            for repeat in repeats))
+
+    # All numbers are converted at once
+    numbers = ' '.join(fold_values)
+    for old, new in (('[', ' '), (']', ' '), (',', ' '), ('null', 'nan')):
+        numbers = numbers.replace(old, new)
+    numbers = np.array(numbers.split(), dtype=np.float64)
+    if numbers.size != sum(sum(shape) for shape in shapes):
+        raise ValueError('Could not parse the values per fold, expected %d '
+                         'numbers but got %d' %
+                         (sum(sum(shape) for shape in shapes), numbers.size))
+
+    n_repeats = max([len(shape) for shape in shapes] or [0])
+    n_folds = max([max(shape) for shape in shapes if shape] or [0])
+    if len(set(shapes)) == 1 and shapes[0] == (n_folds, ) * n_repeats:
+        values = numbers.reshape(len(shapes), n_repeats, n_folds)
+    else:
+        values = np.full((len(shapes), n_repeats, n_folds), np.nan)
+        start = 0
+        for i, shape in enumerate(shapes):
+            for repeat, n_numbers in enumerate(shape):
+                values[i, repeat, :n_numbers] = \
+                    numbers[start:start + n_numbers]
+                start += n_numbers
+
+    run_ids = np.array(run_ids, dtype=np.int64)
+    order = np.argsort(run_ids, kind='mergesort')
+    return run_ids[order], values[order]
+
+
+def _list_stored_evaluations(function, **filters):
+    """List evaluations through the evaluation store in the cache manifest.
+
+    The store records the evaluations of each listing, identified by the
+    evaluation function and the filters, which was synchronized before. The
+    server lists evaluations in ascending order of their run ID, so
+    evaluations added since the last synchronization are at the end of the
+    listing. They are downloaded starting from the number of stored
+    evaluations, minus ``_STORE_SYNC_OVERLAP`` evaluations which overlap with
+    the stored ones. If none of them was stored, evaluations were deleted on
+    the server and the whole listing is downloaded again.
+
+    Parameters
+    ----------
+    function : str
+
+    filters : dict
+        Filters of :func:`list_evaluations` except ``offset`` and ``size``.
+
+    Returns
+    -------
+    dict
+    """
+    query = _evaluation_store_query(function, filters)
+    with openml.utils._cache_manifest_transaction(create=True) as manifest:
+        _create_evaluation_store_tables(manifest)
+        stored = manifest.execute(
+            'SELECT n_evaluations, max_run_id FROM evaluation_queries '
+            'WHERE query = ?', (query,)
+        ).fetchone()
+
+    if stored is not None and config.offline:
+        evaluations, complete = {}, False
+    else:
+        offset = 0
+        if stored is not None:
+            offset = max(stored[0] - _STORE_SYNC_OVERLAP, 0)
+        evaluations = openml.utils._list_all(_list_evaluations, function,
+                                             offset=offset, **filters)
+        complete = offset == 0
+        if not complete and (len(evaluations) == 0 or
+                             min(evaluations) > stored[1]):
+            config.logger.info('Evaluations were deleted on the server, '
+                               'downloading listing %s again' % query)
+            evaluations = openml.utils._list_all(_list_evaluations, function,
+                                                 **filters)
+            complete = True
+
+    per_fold = int(filters.get('per_fold') == 'true')
+    with openml.utils._cache_manifest_transaction(create=True) as manifest:
+        _create_evaluation_store_tables(manifest)
+        if complete:
+            manifest.execute(
+                'DELETE FROM evaluation_query_runs WHERE query = ?', (query,)
+            )
+        manifest.executemany(
+            'INSERT OR REPLACE INTO evaluations (function, per_fold, run_id, '
+            'task_id, setup_id, flow_id, flow_name, data_id, data_name, '
+            'upload_time, value, fold_values, array_data) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(function, per_fold, e.run_id, e.task_id, e.setup_id, e.flow_id,
+              e.flow_name, e.data_id, e.data_name, e.upload_time, e.value,
+              None if e.values is None else json.dumps(e.values),
+              e.array_data)
+             for e in evaluations.values()]
+        )
+        manifest.executemany(
+            'INSERT OR IGNORE INTO evaluation_query_runs VALUES (?, ?)',
+            [(query, run_id) for run_id in evaluations]
+        )
+        manifest.execute(
+            'INSERT OR REPLACE INTO evaluation_queries '
+            'SELECT ?, COUNT(*), MAX(run_id) FROM evaluation_query_runs '
+            'WHERE query = ?', (query, query)
+        )
+        rows = manifest.execute(
+            'SELECT e.run_id, e.task_id, e.setup_id, e.flow_id, e.flow_name, '
+            'e.data_id, e.data_name, e.function, e.upload_time, e.value, '
+            'e.fold_values, e.array_data FROM evaluation_query_runs q '
+            'JOIN evaluations e ON e.run_id = q.run_id '
+            'WHERE q.query = ? AND e.function = ? AND e.per_fold = ? '
+            'ORDER BY e.run_id', (query, function, per_fold)
+        ).fetchall()
+
+    evals = dict()
+    for row in rows:
+        row = list(row)
+        if row[10] is not None:
+            row[10] = json.loads(row[10])
+        evals[row[0]] = OpenMLEvaluation(*row)
+    return evals
+
+
+def _evaluation_store_query(function, filters):
+    """Identify a listing in the evaluation store by its function and
+    filters."""
+    query = {'function': function}
+    for name, value in filters.items():
+        if value is None:
+            continue
+        if name in ('id', 'task', 'setup', 'flow', 'uploader'):
+            value = sorted(set(int(i) for i in value))
+        query[name] = value
+    return json.dumps(query, sort_keys=True)
+
+
+def _create_evaluation_store_tables(manifest):
+    manifest.execute(
+        'CREATE TABLE IF NOT EXISTS evaluations (function TEXT, '
+        'per_fold INTEGER, run_id INTEGER, task_id INTEGER, '
+        'setup_id INTEGER, flow_id INTEGER, flow_name TEXT, data_id TEXT, '
+        'data_name TEXT, upload_time TEXT, value REAL, fold_values TEXT, '
+        'array_data TEXT, PRIMARY KEY (function, per_fold, run_id))'
+    )
+    manifest.execute(
+        'CREATE TABLE IF NOT EXISTS evaluation_queries (query TEXT PRIMARY '
+        'KEY, n_evaluations INTEGER, max_run_id INTEGER)'
+    )
+    manifest.execute(
+        'CREATE TABLE IF NOT EXISTS evaluation_query_runs (query TEXT, '
+        'run_id INTEGER, PRIMARY KEY (query, run_id))'
+    )
+
+
 def _list_evaluations(function, id=None, task=None,
                       setup=None, flow=None, uploader=None, **kwargs):
     """
@@ -79,7 +472,15 @@ def _list_evaluations(function, id=None, task=None,
     -------
     dict
     """
+    api_call = _list_evaluations_api_call(function, id=id, task=task,
+                                          setup=setup, flow=flow,
+                                          uploader=uploader, **kwargs)
+    return __list_evaluations(api_call)
+
 
+def _list_evaluations_api_call(function, id=None, task=None, setup=None,
+                               flow=None, uploader=None, **kwargs):
+    """Create the api call of _list_evaluations."""
     api_call = "evaluation/list/function/%s" % function
     if kwargs is not None:
         for operator, value in kwargs.items():
@@ -95,12 +496,17 @@ def _list_evaluations(function, id=None, task=None,
     if uploader is not None:
         api_call += "/uploader/%s" % ','.join([str(int(i)) for i in uploader])
 
-    return __list_evaluations(api_call)
+    return api_call
 
 
 def __list_evaluations(api_call):
     """Helper function to parse API calls which are lists of runs"""
     xml_string = openml._api_calls._perform_api_call(api_call)
+    return _parse_evaluations_list(xml_string)
+
+
+def _parse_evaluations_list(xml_string):
+    """Parse the xml returned by the api call of _list_evaluations."""
     evals_dict = xmltodict.parse(xml_string, force_list=('oml:evaluation',))
     # Minimalistic check if the XML is useful
     if 'oml:evaluations' not in evals_dict:
@@ -41,6 +41,13 @@ class OpenMLCacheException(PyOpenMLError):
         super(OpenMLCacheException, self).__init__(message)
 
 
+class OpenMLCacheMissError(OpenMLCacheException):
+    """A request would have to be sent to the server in offline mode, see
+    ``openml.config.offline``."""
+    def __init__(self, message):
+        super(OpenMLCacheMissError, self).__init__(message)
+
+
 class OpenMLHashException(PyOpenMLError):
     """Locally computed hash is different than hash announced by the server."""
     pass
@@ -49,4 +56,10 @@ class OpenMLHashException(PyOpenMLError):
 class PrivateDatasetError(PyOpenMLError):
     "Exception thrown when the user has no rights to access the dataset"
     def __init__(self, message):
-        super(PrivateDatasetError, self).__init__(message)
\ No newline at end of file
+        super(PrivateDatasetError, self).__init__(message)
+
+
+class OpenMLReplayError(PyOpenMLError):
+    """No recorded response exists for a request made while replaying."""
+    def __init__(self, message):
+        super(OpenMLReplayError, self).__init__(message)
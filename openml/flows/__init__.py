@@ -1,8 +1,61 @@
 from .flow import OpenMLFlow
 
-from .sklearn_converter import sklearn_to_flow, flow_to_sklearn, \
-    openml_param_name_to_sklearn, obtain_parameter_values
 from .functions import get_flow, list_flows, flow_exists, assert_flows_equal
 
+# The scikit-learn converter is imported on first use, because importing
+# scikit-learn and scipy.stats takes a large share of the time to import
+# openml.
+
+
+def sklearn_to_flow(o, parent_model=None):
+    """Create a flow from a scikit-learn model.
+
+    Parameters
+    ----------
+    o : mixed
+        The scikit-learn estimator or parameter value to serialize.
+
+    parent_model : mixed, optional
+        The model ``o`` is a parameter value of.
+
+    Returns
+    -------
+    OpenMLFlow or mixed
+    """
+    from .sklearn_converter import sklearn_to_flow
+    return sklearn_to_flow(o, parent_model)
+
+
+def flow_to_sklearn(o, components=None, initialize_with_defaults=False,
+                    recursion_depth=0):
+    """Initializes a sklearn model based on a flow.
+
+    See :func:`openml.flows.sklearn_converter.flow_to_sklearn`.
+    """
+    from .sklearn_converter import flow_to_sklearn
+    return flow_to_sklearn(o, components, initialize_with_defaults,
+                           recursion_depth)
+
+
+def openml_param_name_to_sklearn(openml_parameter, flow):
+    """Converts the name of an OpenMLParameter into the sklean name, given a
+    flow.
+
+    See :func:`openml.flows.sklearn_converter.openml_param_name_to_sklearn`.
+    """
+    from .sklearn_converter import openml_param_name_to_sklearn
+    return openml_param_name_to_sklearn(openml_parameter, flow)
+
+
+def obtain_parameter_values(flow):
+    """Extracts all parameter settings from the model inside a flow in OpenML
+    format.
+
+    See :func:`openml.flows.sklearn_converter.obtain_parameter_values`.
+    """
+    from .sklearn_converter import obtain_parameter_values
+    return obtain_parameter_values(flow)
+
+
 __all__ = ['OpenMLFlow', 'get_flow', 'list_flows', 'sklearn_to_flow',
            'flow_to_sklearn', 'flow_exists', 'openml_param_name_to_sklearn']
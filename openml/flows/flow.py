@@ -1,12 +1,26 @@
 from collections import OrderedDict
+import hashlib
 
 import six
 import xmltodict
 
 import openml._api_calls
+import openml.utils
 from ..utils import extract_xml_tags
 
 
+# Attributes of a flow which are not compared by assert_flows_equal and are
+# not part of its fingerprint
+FIELDS_GENERATED_BY_THE_SERVER = ['flow_id', 'uploader', 'version',
+                                  'upload_date',
+                                  # Tags aren't directly created by the
+                                  # server, but the uploader has no control
+                                  # over them!
+                                  'tags']
+FIELDS_IGNORED_BY_PYTHON_API = ['binary_url', 'binary_format', 'binary_md5',
+                                'model']
+
+
 class OpenMLFlow(object):
     """OpenML Flow. Stores machine learning models.
 
@@ -334,6 +348,7 @@ class OpenMLFlow(object):
             file_elements=file_elements,
         )
         flow_id = int(xmltodict.parse(return_value)['oml:upload_flow']['oml:id'])
+        openml.utils._memory_cache_invalidate('flows', flow_id)
         flow = openml.flows.functions.get_flow(flow_id)
         _copy_server_fields(flow, self)
         try:
@@ -346,6 +361,7 @@ class OpenMLFlow(object):
                              "New flow ID is %d. Please check manually and "
                              "remove the flow if necessary! Error is:\n'%s'" %
                              (flow_id, message))
+        openml.flows.functions._cache_flow_ids(self)
         return self
 
     def get_structure(self, key_item):
@@ -405,6 +421,45 @@ class OpenMLFlow(object):
             structure.pop(0)
             return self.components[sub_identifier].get_subflow(structure)
 
+    def fingerprint(self, ignore_parameter_values=False):
+        """Structural hash of the flow.
+
+        The fingerprint covers all attributes which are compared by
+        :func:`openml.flows.functions.assert_flows_equal`, including the
+        parameters and the components, so flows with the same fingerprint
+        are equal. Flows which differ only in attributes set by the server,
+        such as the flow ID, have the same fingerprint. It is computed on
+        each call, so that it reflects changes to the flow.
+
+        Parameters
+        ----------
+        ignore_parameter_values : bool
+            Whether to only include the names of the parameters and not their
+            values, as in ``assert_flows_equal``.
+
+        Returns
+        -------
+        str
+            Hexadecimal md5 hash.
+        """
+        ignored = FIELDS_GENERATED_BY_THE_SERVER + FIELDS_IGNORED_BY_PYTHON_API
+        md5 = hashlib.md5()
+        for key in sorted(self.__dict__):
+            if key in ignored:
+                continue
+            value = getattr(self, key)
+            if key == 'components':
+                value = [(name, value[name].fingerprint(ignore_parameter_values))
+                         for name in sorted(value)]
+            elif key == 'parameters' and ignore_parameter_values:
+                value = sorted(value)
+            elif isinstance(value, OrderedDict):
+                # The representation of an OrderedDict differs between Python
+                # versions
+                value = list(value.items())
+            md5.update(repr((key, value)).encode('utf8'))
+        return md5.hexdigest()
+
     def push_tag(self, tag):
         """Annotates this flow with a tag on the server.
 
@@ -415,6 +470,7 @@ class OpenMLFlow(object):
         """
         data = {'flow_id': self.flow_id, 'tag': tag}
         openml._api_calls._perform_api_call("/flow/tag", data=data)
+        openml.utils._memory_cache_invalidate('flows', self.flow_id)
 
     def remove_tag(self, tag):
         """Removes a tag from this flow on the server.
@@ -426,6 +482,7 @@ class OpenMLFlow(object):
         """
         data = {'flow_id': self.flow_id, 'tag': tag}
         openml._api_calls._perform_api_call("/flow/untag", data=data)
+        openml.utils._memory_cache_invalidate('flows', self.flow_id)
 
 
 def _copy_server_fields(source_flow, target_flow):
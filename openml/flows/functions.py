@@ -1,3 +1,5 @@
+import os
+
 import dateutil.parser
 
 import xmltodict
@@ -5,12 +7,24 @@ import six
 
 import openml._api_calls
 from . import OpenMLFlow
+from .flow import FIELDS_GENERATED_BY_THE_SERVER, FIELDS_IGNORED_BY_PYTHON_API
+from .. import config
+from ..exceptions import OpenMLCacheException
 import openml.utils
 
 
+FLOWS_CACHE_DIR_NAME = 'flows'
+
+# Flow IDs of the flow ID index which were already looked up in this process,
+# keyed by (cache directory, name, external version)
+_flow_ids = {}
+
+
 def get_flow(flow_id, reinstantiate=False):
     """Download the OpenML flow for a given flow ID.
 
+    Flows cannot change once they are uploaded, therefore they are cached.
+
     Parameters
     ----------
     flow_id : int
@@ -27,10 +41,28 @@ def get_flow(flow_id, reinstantiate=False):
         the flow
     """
     flow_id = int(flow_id)
-    flow_xml = openml._api_calls._perform_api_call("flow/%d" % flow_id)
-
-    flow_dict = xmltodict.parse(flow_xml)
-    flow = OpenMLFlow._from_dict(flow_dict)
+    flow = openml.utils._memory_cache_get(FLOWS_CACHE_DIR_NAME, flow_id)
+    if flow is None:
+        flow_dir = openml.utils._create_cache_directory_for_id(
+            FLOWS_CACHE_DIR_NAME, flow_id,
+        )
+        try:
+            flow = _get_cached_flow(flow_id)
+            openml.utils._record_cache_access(FLOWS_CACHE_DIR_NAME, hit=True)
+        except OpenMLCacheException:
+            openml.utils._record_cache_access(FLOWS_CACHE_DIR_NAME, hit=False)
+            flow_xml = openml._api_calls._perform_api_call("flow/%d" % flow_id)
+            with openml.utils._cache_entity_lock(FLOWS_CACHE_DIR_NAME,
+                                                 flow_id):
+                # The directory may have been evicted in the meantime
+                flow_dir = openml.utils._create_cache_directory_for_id(
+                    FLOWS_CACHE_DIR_NAME, flow_id,
+                )
+                openml.utils._write_cache_file(flow_dir, "flow.xml", flow_xml)
+            openml.utils._evict_cache(keep=flow_dir)
+            flow = OpenMLFlow._from_dict(xmltodict.parse(flow_xml))
+            _cache_flow_ids(flow)
+        openml.utils._memory_cache_put(FLOWS_CACHE_DIR_NAME, flow_id, flow)
 
     if reinstantiate:
         if not (flow.external_version.startswith('sklearn==') or
@@ -41,6 +73,29 @@ def get_flow(flow_id, reinstantiate=False):
     return flow
 
 
+def _get_cached_flow(fid):
+    """Load a flow from the cache.
+
+    Parameters
+    ----------
+    fid : int
+        ID of the flow.
+
+    Returns
+    -------
+    OpenMLFlow
+    """
+    flow_cache_dir = openml.utils._create_cache_directory_for_id(
+        FLOWS_CACHE_DIR_NAME, fid,
+    )
+    flow_file = os.path.join(flow_cache_dir, "flow.xml")
+    try:
+        return OpenMLFlow._from_dict(openml.utils._parse_cached_xml(flow_file))
+    except (OSError, IOError):
+        raise OpenMLCacheException("Flow file for fid %d not "
+                                   "cached" % fid)
+
+
 def list_flows(offset=None, size=None, tag=None, **kwargs):
 
     """
@@ -117,13 +172,22 @@ def flow_exists(name, external_version):
 
     Notes
     -----
-    see http://www.openml.org/api_docs/#!/flow/get_flow_exists_name_version
+    Flows which exist are recorded in an index in the cache directory, which
+    is checked before asking the server. Flows can not be changed once they
+    are uploaded, therefore the index never expires. Flows which do not
+    exist are not recorded, as they can be uploaded at any time.
+
+    See http://www.openml.org/api_docs/#!/flow/get_flow_exists_name_version
     """
     if not (isinstance(name, six.string_types) and len(name) > 0):
         raise ValueError('Argument \'name\' should be a non-empty string')
     if not (isinstance(name, six.string_types) and len(external_version) > 0):
         raise ValueError('Argument \'version\' should be a non-empty string')
 
+    flow_id = _get_cached_flow_id(name, external_version)
+    if flow_id is not None:
+        return flow_id
+
     xml_response = openml._api_calls._perform_api_call(
         "flow/exists",
         data={'name': name, 'external_version': external_version},
@@ -132,11 +196,88 @@ def flow_exists(name, external_version):
     result_dict = xmltodict.parse(xml_response)
     flow_id = int(result_dict['oml:flow_exists']['oml:id'])
     if flow_id > 0:
+        _cache_flow_id(name, external_version, flow_id)
         return flow_id
     else:
         return False
 
 
+def _get_cached_flow_id(name, external_version):
+    """Look up the ID of a flow in the flow ID index of the cache.
+
+    Parameters
+    ----------
+    name : str
+
+    external_version : str
+
+    Returns
+    -------
+    int or None
+        None if the flow is not in the index.
+    """
+    key = (config.get_cache_directory(), name, external_version)
+    flow_id = _flow_ids.get(key)
+    if flow_id is not None:
+        return flow_id
+    with openml.utils._cache_manifest_transaction(read_only=True) \
+            as manifest:
+        if manifest is None or \
+                not openml.utils._manifest_has_table(manifest, 'flow_ids'):
+            return None
+        row = manifest.execute(
+            'SELECT id FROM flow_ids WHERE name = ? AND external_version = ?',
+            (name, external_version),
+        ).fetchone()
+    if row is None:
+        return None
+    _flow_ids[key] = row[0]
+    return row[0]
+
+
+def _cache_flow_id(name, external_version, flow_id):
+    """Add a flow to the flow ID index of the cache.
+
+    Parameters
+    ----------
+    name : str
+
+    external_version : str
+
+    flow_id : int
+    """
+    key = (config.get_cache_directory(), name, external_version)
+    if _flow_ids.get(key) == flow_id:
+        return
+    with openml.utils._cache_manifest_transaction(create=True) as manifest:
+        if manifest is None:
+            return
+        _create_flow_id_table(manifest)
+        manifest.execute('INSERT OR REPLACE INTO flow_ids VALUES (?, ?, ?)',
+                         (name, external_version, flow_id))
+    _flow_ids[key] = flow_id
+
+
+def _cache_flow_ids(flow):
+    """Add a flow and all its subflows which have an ID to the flow ID index
+    of the cache."""
+    stack = [flow]
+    while len(stack) > 0:
+        current = stack.pop()
+        if current.flow_id is not None and current.external_version:
+            _cache_flow_id(current.name, current.external_version,
+                           current.flow_id)
+        stack.extend(current.components.values())
+
+
+def _create_flow_id_table(manifest):
+    manifest.execute(
+        'CREATE TABLE IF NOT EXISTS flow_ids (name TEXT, '
+        'external_version TEXT, id INTEGER, '
+        'PRIMARY KEY (name, external_version))'
+    )
+
+
 def __list_flows(api_call):
 
     xml_string = openml._api_calls._perform_api_call(api_call)
@@ -207,14 +348,16 @@ def assert_flows_equal(flow1, flow2,
         raise TypeError('Argument 2 must be of type OpenMLFlow, but is %s' %
                         type(flow2))
 
+    # Flows with the same fingerprint are equal
+    if not ignore_parameter_values_on_older_children and \
+            flow1.fingerprint(ignore_parameter_values) == \
+            flow2.fingerprint(ignore_parameter_values):
+        return
+
     # TODO as they are actually now saved during publish, it might be good to
     # check for the equality of these as well.
-    generated_by_the_server = ['flow_id', 'uploader', 'version', 'upload_date',
-                               # Tags aren't directly created by the server,
-                               # but the uploader has no control over them!
-                               'tags']
-    ignored_by_python_api = ['binary_url', 'binary_format', 'binary_md5',
-                             'model']
+    generated_by_the_server = FIELDS_GENERATED_BY_THE_SERVER
+    ignored_by_python_api = FIELDS_IGNORED_BY_PYTHON_API
 
     for key in set(flow1.__dict__.keys()).union(flow2.__dict__.keys()):
         if key in generated_by_the_server + ignored_by_python_api:
@@ -34,6 +34,21 @@ else:
 DEPENDENCIES_PATTERN = re.compile(
     '^(?P<name>[\w\-]+)((?P<operation>==|>=|>)(?P<version>(\d+\.)?(\d+\.)?(\d+)?(dev)?[0-9]*))?$')
 
+# Models are serialized many times, for example once per run of a
+# hyperparameter sweep. Everything which only depends on the class of a model
+# is therefore cached: the external version of its package by package name
+# and the names of its parameters by class.
+_external_versions = {}
+# False for classes whose parameters are not cached, see _get_parameters
+_parameter_names = {}
+_base_get_params = getattr(sklearn.base.BaseEstimator.get_params, '__func__',
+                           sklearn.base.BaseEstimator.get_params)
+# Likewise for deserializing: model classes by class name, the arguments of
+# constructors and the dependency strings which were already checked
+_model_classes = {}
+_fn_arguments = {}
+_satisfied_dependencies = set()
+
 
 def sklearn_to_flow(o, parent_model=None):
     # TODO: assert that only on first recursion lvl `parent_model` can be None
@@ -41,6 +56,11 @@ def sklearn_to_flow(o, parent_model=None):
     if _is_estimator(o):
         # is the main model or a submodel
         rval = _serialize_model(o)
+        if parent_model is None:
+            # Check that a component does not occur multiple times in a flow
+            # as this is not supported by OpenML. Checking the main model
+            # covers all its submodels.
+            _check_multiple_occurence_of_component_in_flow(o, rval.components)
     elif isinstance(o, (list, tuple)):
         # TODO: explain what type of parameter is here
         rval = [sklearn_to_flow(element, parent_model) for element in o]
@@ -119,9 +139,11 @@ def flow_to_sklearn(o, components=None, initialize_with_defaults=False,
     mixed
 
     """
+    # The arguments are formatted by logging only if the message is logged,
+    # formatting models is expensive
     logging.info('-%s flow_to_sklearn START o=%s, components=%s, '
-                 'init_defaults=%s' % ('-' * recursion_depth, o, components,
-                                       initialize_with_defaults))
+                 'init_defaults=%s', '-' * recursion_depth, o, components,
+                 initialize_with_defaults)
     depth_pp = recursion_depth + 1  # shortcut var, depth plus plus
 
     # First, we need to check whether the presented object is a json string.
@@ -199,8 +221,8 @@ def flow_to_sklearn(o, components=None, initialize_with_defaults=False,
                                   recursion_depth=recursion_depth)
     else:
         raise TypeError(o)
-    logging.info('-%s flow_to_sklearn END   o=%s, rval=%s'
-                 % ('-' * recursion_depth, o, rval))
+    logging.info('-%s flow_to_sklearn END   o=%s, rval=%s',
+                 '-' * recursion_depth, o, rval)
     return rval
 
 
@@ -392,10 +414,6 @@ def _serialize_model(model):
     parameters, parameters_meta_info, sub_components, sub_components_explicit =\
         _extract_information_from_model(model)
 
-    # Check that a component does not occur multiple times in a flow as this
-    # is not supported by OpenML
-    _check_multiple_occurence_of_component_in_flow(model, sub_components)
-
     # Create a flow name, which contains all components in brackets, for
     # example RandomizedSearchCV(Pipeline(StandardScaler,AdaBoostClassifier(DecisionTreeClassifier)),StandardScaler,AdaBoostClassifier(DecisionTreeClassifier))
     class_name = model.__module__ + "." + model.__class__.__name__
@@ -452,10 +470,12 @@ def _get_external_version_string(model, sub_components):
     # requirements for their subcomponents. The external version string is a
     # sorted concatenation of all modules which are present in this run.
     model_package_name = model.__module__.split('.')[0]
-    module = importlib.import_module(model_package_name)
-    model_package_version_number = module.__version__
-    external_version = _format_external_version(model_package_name,
-                                                model_package_version_number)
+    external_version = _external_versions.get(model_package_name)
+    if external_version is None:
+        module = importlib.import_module(model_package_name)
+        external_version = _format_external_version(model_package_name,
+                                                    module.__version__)
+        _external_versions[model_package_name] = external_version
     openml_version = _format_external_version('openml', openml.__version__)
     external_versions = set()
     external_versions.add(external_version)
@@ -469,6 +489,8 @@ def _get_external_version_string(model, sub_components):
 
 
 def _check_multiple_occurence_of_component_in_flow(model, sub_components):
+    """Raise a ValueError if a component occurs several times in the flow of
+    ``model``, given the flows of its direct components."""
     to_visit_stack = []
     to_visit_stack.extend(sub_components.values())
     known_sub_components = set()
@@ -496,7 +518,7 @@ def _extract_information_from_model(model):
     parameters = OrderedDict()
     parameters_meta_info = OrderedDict()
 
-    model_parameters = model.get_params(deep=False)
+    model_parameters = _get_parameters(model)
     for k, v in sorted(model_parameters.items(), key=lambda t: t[0]):
         rval = sklearn_to_flow(v, model)
 
@@ -508,7 +530,7 @@ def _extract_information_from_model(model):
             # Steps in a pipeline or feature union, or base classifiers in
             # voting classifier
             parameter_value = list()
-            reserved_keywords = set(model.get_params(deep=False).keys())
+            reserved_keywords = set(model_parameters.keys())
 
             for sub_component_tuple in rval:
                 identifier = sub_component_tuple[0]
@@ -600,6 +622,31 @@ def _extract_information_from_model(model):
     return parameters, parameters_meta_info, sub_components, sub_components_explicit
 
 
+def _get_parameters(model):
+    """Equivalent to ``model.get_params(deep=False)``.
+
+    ``BaseEstimator.get_params`` inspects the signature of the constructor of
+    the model on every call, which takes most of the time of serializing a
+    model. For models which do not override it, the parameter names are
+    therefore cached per class. Before scikit-learn 0.20, ``get_params``
+    additionally skipped deprecated parameters, so it is always called.
+    """
+    model_class = type(model)
+    parameter_names = _parameter_names.get(model_class)
+    if parameter_names is None:
+        get_params = getattr(model_class.get_params, '__func__',
+                             model_class.get_params)
+        if get_params is _base_get_params and \
+                LooseVersion(sklearn.__version__) >= LooseVersion('0.20'):
+            parameter_names = model_class._get_param_names()
+        else:
+            parameter_names = False
+        _parameter_names[model_class] = parameter_names
+    if parameter_names is False:
+        return model.get_params(deep=False)
+    return {name: getattr(model, name, None) for name in parameter_names}
+
+
 def _get_fn_arguments_with_defaults(fn_name):
     """
     Returns i) a dict with all parameter names (as key) that have a default value (as value) and ii) a set with all
@@ -617,6 +664,8 @@ def _get_fn_arguments_with_defaults(fn_name):
     params_without_defaults: dict
         a set with all parameters that do not have a default value
     """
+    if fn_name in _fn_arguments:
+        return _fn_arguments[fn_name]
     if sys.version_info[0] >= 3:
         signature = inspect.getfullargspec(fn_name)
     else:
@@ -628,11 +677,12 @@ def _get_fn_arguments_with_defaults(fn_name):
     params_with_defaults = {signature.args[-1*i]: signature.defaults[-1*i] for i in range(1, len_defaults + 1)}
     # retrieve the params without defaults
     params_without_defaults = {signature.args[i] for i in range(len(signature.args) - len_defaults)}
+    _fn_arguments[fn_name] = params_with_defaults, params_without_defaults
     return params_with_defaults, params_without_defaults
 
 
 def _deserialize_model(flow, keep_defaults, recursion_depth):
-    logging.info('-%s deserialize %s' % ('-' * recursion_depth, flow.name))
+    logging.info('-%s deserialize %s', '-' * recursion_depth, flow.name)
     model_name = flow.class_name
     _check_dependencies(flow.dependencies)
 
@@ -649,8 +699,8 @@ def _deserialize_model(flow, keep_defaults, recursion_depth):
 
     for name in parameters:
         value = parameters.get(name)
-        logging.info('--%s flow_parameter=%s, value=%s' %
-                     ('-' * recursion_depth, name, value))
+        logging.info('--%s flow_parameter=%s, value=%s',
+                     '-' * recursion_depth, name, value)
         rval = flow_to_sklearn(value,
                                components=components_,
                                initialize_with_defaults=keep_defaults,
@@ -663,15 +713,13 @@ def _deserialize_model(flow, keep_defaults, recursion_depth):
         if name not in components_:
             continue
         value = components[name]
-        logging.info('--%s flow_component=%s, value=%s'
-                     % ('-' * recursion_depth, name, value))
+        logging.info('--%s flow_component=%s, value=%s',
+                     '-' * recursion_depth, name, value)
         rval = flow_to_sklearn(value,
                                recursion_depth=recursion_depth + 1)
         parameter_dict[name] = rval
 
-    module_name = model_name.rsplit('.', 1)
-    model_class = getattr(importlib.import_module(module_name[0]),
-                          module_name[1])
+    model_class = _get_model_class(model_name)
 
     if keep_defaults:
         # obtain all params with a default
@@ -689,12 +737,22 @@ def _deserialize_model(flow, keep_defaults, recursion_depth):
     return model_class(**parameter_dict)
 
 
+def _get_model_class(class_name):
+    """Import the model class with the given fully qualified name."""
+    model_class = _model_classes.get(class_name)
+    if model_class is None:
+        module_name = class_name.rsplit('.', 1)
+        model_class = getattr(importlib.import_module(module_name[0]),
+                              module_name[1])
+        _model_classes[class_name] = model_class
+    return model_class
+
+
 def _check_dependencies(dependencies):
-    if not dependencies:
+    if not dependencies or dependencies in _satisfied_dependencies:
         return
 
-    dependencies = dependencies.split('\n')
-    for dependency_string in dependencies:
+    for dependency_string in dependencies.split('\n'):
         match = DEPENDENCIES_PATTERN.match(dependency_string)
         dependency_name = match.group('name')
         operation = match.group('operation')
@@ -717,6 +775,7 @@ def _check_dependencies(dependencies):
         if not check:
             raise ValueError('Trying to deserialize a model with dependency '
                              '%s not satisfied.' % dependency_string)
+    _satisfied_dependencies.add(dependencies)
 
 
 def serialize_type(o):
@@ -0,0 +1,244 @@
+"""Instrumentation of the requests to the OpenML server and of the cache.
+
+Every request to the server and every lookup in the cache emits an event,
+a dictionary which is passed to all registered listeners. Events have a
+``type`` and the following fields:
+
+``api_call``
+    ``method`` (``get`` or ``post``), ``url``, ``endpoint`` (the API call
+    without its arguments, e.g. ``data/features``, or ``download`` for files),
+    ``status_code`` (None if no response was received), ``duration`` (seconds,
+    including retries), ``retries``, ``bytes_sent``, ``bytes_received`` and
+    ``error`` (name of the exception which ended the request, or None).
+
+``cache_access``
+    ``key`` (cache subdirectory, e.g. ``datasets``), ``layer`` (``disk`` or
+    ``memory``) and ``hit``.
+
+:class:`MetricsAggregator` is a listener which sums up the events in memory
+and exports them as JSON or in the Prometheus text format::
+
+    aggregator = openml.metrics.MetricsAggregator()
+    openml.metrics.add_listener(aggregator)
+    ...
+    print(aggregator.to_prometheus())
+"""
+from collections import Counter, defaultdict
+import json
+import threading
+
+from . import config
+
+
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def add_listener(listener):
+    """Register a callable which is called with every event.
+
+    Listeners are called synchronously in the thread which emits the event
+    and should therefore return quickly. Exceptions raised by listeners are
+    logged and otherwise ignored.
+
+    Parameters
+    ----------
+    listener : callable
+        Called with the event dictionary as only argument.
+    """
+    with _listeners_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def remove_listener(listener):
+    """Unregister a listener registered with :func:`add_listener`.
+
+    Parameters
+    ----------
+    listener : callable
+    """
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def _has_listeners():
+    """Whether any listener is registered. Allows to skip computing the
+    fields of an event nobody listens to."""
+    return len(_listeners) > 0
+
+
+def _emit(event_type, **fields):
+    """Pass an event to all registered listeners."""
+    if not _listeners:
+        return
+    event = dict(fields)
+    event['type'] = event_type
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(event)
+        except Exception:
+            config.logger.exception('Metrics listener %r failed' % listener)
+
+
+def _endpoint(url):
+    """Name of the API call of an URL without its arguments.
+
+    For example ``data/features`` for ``<server>/data/features/2``.
+    URLs which are not API calls, such as file downloads, are named
+    ``download``.
+    """
+    server = config.server.rstrip('/') + '/'
+    if not url.startswith(server):
+        return 'download'
+    parts = [part for part in url[len(server):].split('/') if part]
+    if not parts:
+        return ''
+    if len(parts) > 1 and not parts[1].lstrip('-').isdigit():
+        return '/'.join(parts[:2])
+    return parts[0]
+
+
+class MetricsAggregator(object):
+    """Listener which sums up events in memory.
+
+    API calls are aggregated per endpoint and HTTP method, cache accesses per
+    cache subdirectory and layer. Instances are thread safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Discard all aggregated values."""
+        with self._lock:
+            self._api_calls = defaultdict(Counter)
+            self._status_codes = defaultdict(Counter)
+            self._cache = defaultdict(Counter)
+
+    def __call__(self, event):
+        with self._lock:
+            if event['type'] == 'api_call':
+                key = (event['endpoint'], event['method'])
+                counter = self._api_calls[key]
+                counter['count'] += 1
+                counter['duration'] += event['duration']
+                counter['retries'] += event['retries']
+                counter['bytes_sent'] += event['bytes_sent']
+                counter['bytes_received'] += event['bytes_received']
+                if event['error'] is not None:
+                    counter['errors'] += 1
+                status = event['status_code']
+                self._status_codes[key][
+                    'none' if status is None else str(status)] += 1
+            elif event['type'] == 'cache_access':
+                key = (event['key'], event['layer'])
+                self._cache[key]['hits' if event['hit'] else 'misses'] += 1
+
+    def to_dict(self):
+        """Aggregated values as a JSON serializable dictionary.
+
+        Returns
+        -------
+        dict
+            With a list of records for ``api_calls`` and ``cache``.
+        """
+        with self._lock:
+            api_calls = []
+            for (endpoint, method), counter in sorted(self._api_calls.items()):
+                record = {
+                    'endpoint': endpoint,
+                    'method': method,
+                    'status_codes': dict(self._status_codes[(endpoint,
+                                                             method)]),
+                }
+                for name in ('count', 'retries', 'errors', 'bytes_sent',
+                             'bytes_received'):
+                    record[name] = counter[name]
+                record['duration'] = float(counter['duration'])
+                api_calls.append(record)
+            cache = []
+            for (key, layer), counter in sorted(self._cache.items()):
+                cache.append({'key': key, 'layer': layer,
+                              'hits': counter['hits'],
+                              'misses': counter['misses']})
+        return {'api_calls': api_calls, 'cache': cache}
+
+    def to_json(self):
+        """Aggregated values as a JSON string, see :meth:`to_dict`.
+
+        Returns
+        -------
+        str
+        """
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    def to_prometheus(self):
+        """Aggregated values in the Prometheus text exposition format.
+
+        Returns
+        -------
+        str
+        """
+        metrics = self.to_dict()
+        lines = []
+
+        def _metric(name, metric_type, help_text, samples):
+            lines.append('# HELP %s %s' % (name, help_text))
+            lines.append('# TYPE %s %s' % (name, metric_type))
+            for suffix, labels, value in samples:
+                labels = ','.join('%s="%s"' % (label, _escape(label_value))
+                                  for label, label_value in labels)
+                lines.append('%s%s{%s} %s' % (name, suffix, labels,
+                                              _format_value(value)))
+
+        def _labels(record):
+            return [('endpoint', record['endpoint']),
+                    ('method', record['method'])]
+
+        _metric('openml_api_requests_total', 'counter',
+                'Number of requests to the OpenML server.',
+                [('', _labels(record) + [('status', status)], count)
+                 for record in metrics['api_calls']
+                 for status, count in sorted(record['status_codes'].items())])
+        _metric('openml_api_request_duration_seconds', 'summary',
+                'Duration of requests including retries.',
+                [sample for record in metrics['api_calls'] for sample in (
+                    ('_sum', _labels(record), record['duration']),
+                    ('_count', _labels(record), record['count']),
+                )])
+        for name, field, help_text in (
+                ('openml_api_retries_total', 'retries',
+                 'Number of retried requests.'),
+                ('openml_api_errors_total', 'errors',
+                 'Number of requests which failed without response.'),
+                ('openml_api_sent_bytes_total', 'bytes_sent',
+                 'Size of the request bodies.'),
+                ('openml_api_received_bytes_total', 'bytes_received',
+                 'Size of the response bodies.'),
+        ):
+            _metric(name, 'counter', help_text,
+                    [('', _labels(record), record[field])
+                     for record in metrics['api_calls']])
+        _metric('openml_cache_accesses_total', 'counter',
+                'Number of cache lookups.',
+                [('', [('key', record['key']), ('layer', record['layer']),
+                       ('outcome', outcome)], record[field])
+                 for record in metrics['cache']
+                 for outcome, field in (('hit', 'hits'), ('miss', 'misses'))])
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(label_value):
+    return label_value.replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n')
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
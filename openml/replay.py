@@ -0,0 +1,481 @@
+"""Record responses of the OpenML server and replay them offline.
+
+Responses are stored in a *cassette*, a directory which holds one JSON index
+file per distinct request and the raw response bodies::
+
+    with openml.replay.record('cassette'):
+        openml.datasets.get_dataset(61)
+
+    # Later, without network access
+    with openml.replay.replay('cassette'):
+        openml.datasets.get_dataset(61)
+
+Requests are identified by their method, path and parameters, without the
+API key, which is also removed from the recorded URLs. A request which is sent several times is answered with the recorded
+responses in order, repeating the last one. Uploads are identified by method
+and path only, since their content usually differs between runs.
+
+:class:`ReplayServer` serves a cassette over HTTP on the local machine. It
+can stand in for the OpenML server for clients which do not go through
+:func:`openml._api_calls.send_request`, for example the asynchronous client
+or other processes::
+
+    with openml.replay.ReplayServer('cassette') as server:
+        openml.config.server = server.api_url
+        ...
+"""
+from collections import Counter
+import contextlib
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+
+import requests
+import requests.adapters
+import requests.models
+import requests.structures
+import requests.utils
+import six
+from six.moves import BaseHTTPServer, socketserver
+from six.moves.urllib.parse import parse_qsl, unquote, urlencode, \
+    urlsplit, urlunsplit
+
+import openml._api_calls
+import openml.utils
+from . import config
+from .exceptions import OpenMLReplayError
+
+
+__all__ = ['Cassette', 'ReplayServer', 'record', 'replay']
+
+# Headers of recorded responses which are replayed
+_RECORDED_HEADERS = ('Content-Type', 'Content-Encoding', 'Retry-After')
+
+# Upload API calls which ReplayServer answers even if they were not recorded,
+# mapped to the root element and the ID element of the response
+_UPLOAD_RESPONSES = {
+    'data': ('upload_data_set', 'id'),
+    'flow': ('upload_flow', 'id'),
+    'run': ('upload_run', 'run_id'),
+}
+
+
+def _request_key(method, url, body=None, content_type=None):
+    """Identify a request by its method, path and parameters.
+
+    Parameters
+    ----------
+    method : str
+
+    url : str
+        URL or path of the request, including the query string.
+
+    body : str or bytes, optional
+        Body of the request.
+
+    content_type : str, optional
+        Content type of the body. Only form encoded bodies are part of the
+        key, uploads are identified by method and path.
+
+    Returns
+    -------
+    str
+    """
+    split_url = urlsplit(url)
+    parameters = parse_qsl(split_url.query, keep_blank_values=True)
+    if body and content_type and \
+            content_type.startswith('application/x-www-form-urlencoded'):
+        if isinstance(body, six.binary_type):
+            body = body.decode('utf-8')
+        parameters.extend(parse_qsl(body, keep_blank_values=True))
+    parameters = sorted([key, value] for key, value in parameters
+                        if key != 'api_key')
+    key = json.dumps([method.upper(), unquote(split_url.path), parameters])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _url_without_api_key(url):
+    """Remove the API key from the query string of a URL.
+
+    Parameters
+    ----------
+    url : str
+
+    Returns
+    -------
+    str
+    """
+    split_url = urlsplit(url)
+    parameters = [(key, value) for key, value
+                  in parse_qsl(split_url.query, keep_blank_values=True)
+                  if key != 'api_key']
+    return urlunsplit(split_url._replace(query=urlencode(parameters)))
+
+
+class Cassette(object):
+    """Directory of recorded responses.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the cassette, created if it does not exist.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+        self._lock = threading.Lock()
+        # Number of responses replayed per request key
+        self._replayed = Counter()
+
+    @property
+    def server(self):
+        """The value of ``openml.config.server`` when the cassette was
+        recorded, or None."""
+        meta_file = os.path.join(self.path, 'meta.json')
+        if not os.path.exists(meta_file):
+            return None
+        with io.open(meta_file, encoding='utf8') as fh:
+            return json.load(fh)['server']
+
+    def _read_index(self, key):
+        index_file = os.path.join(self.path, '%s.json' % key)
+        if not os.path.exists(index_file):
+            return []
+        with io.open(index_file, encoding='utf8') as fh:
+            return json.load(fh)
+
+    def _write_json(self, filename, content):
+        with openml.utils._atomic_write(os.path.join(self.path,
+                                                     filename)) as fh:
+            fh.write(json.dumps(content, sort_keys=True).encode('utf-8'))
+
+    def append(self, key, method, url, status_code, headers, content):
+        """Record a response.
+
+        Parameters
+        ----------
+        key : str
+            Key of the request, see :func:`_request_key`.
+
+        method : str
+
+        url : str
+            URL of the request, recorded without the API key.
+
+        status_code : int
+
+        headers : dict
+            Response headers. Only the headers in ``_RECORDED_HEADERS`` are
+            recorded.
+
+        content : bytes
+            Response body.
+        """
+        with self._lock:
+            if self.server is None:
+                self._write_json('meta.json', {'server': config.server})
+            index = self._read_index(key)
+            body_file = '%s-%d.body' % (key, len(index))
+            with openml.utils._atomic_write(os.path.join(self.path,
+                                                         body_file)) as fh:
+                fh.write(content)
+            index.append({
+                'method': method,
+                'url': _url_without_api_key(url),
+                'status_code': status_code,
+                'headers': {name: headers[name] for name in _RECORDED_HEADERS
+                            if name in headers},
+                'body': body_file,
+            })
+            self._write_json('%s.json' % key, index)
+
+    def next_response(self, key):
+        """Get the next recorded response of a request.
+
+        Parameters
+        ----------
+        key : str
+            Key of the request, see :func:`_request_key`.
+
+        Returns
+        -------
+        tuple or None
+            The status code, headers and body of the response, None if the
+            request was not recorded.
+        """
+        with self._lock:
+            index = self._read_index(key)
+            if not index:
+                return None
+            entry = index[min(self._replayed[key], len(index) - 1)]
+            self._replayed[key] += 1
+        with open(os.path.join(self.path, entry['body']), 'rb') as fh:
+            content = fh.read()
+        return entry['status_code'], entry['headers'], content
+
+    def origins(self):
+        """Scheme and host of all recorded URLs, e.g.
+        ``https://test.openml.org``.
+
+        Returns
+        -------
+        set
+        """
+        origins = set()
+        for filename in os.listdir(self.path):
+            if filename.endswith('.json') and filename != 'meta.json':
+                for entry in self._read_index(filename[:-len('.json')]):
+                    split_url = urlsplit(entry['url'])
+                    origins.add('%s://%s' % (split_url.scheme,
+                                             split_url.netloc))
+        return origins
+
+
+def _prepared_request_key(request):
+    return _request_key(request.method, request.url, request.body,
+                        request.headers.get('Content-Type'))
+
+
+class _RecordingAdapter(requests.adapters.HTTPAdapter):
+    """Transport adapter which records all responses in a cassette."""
+
+    def __init__(self, cassette):
+        super(_RecordingAdapter, self).__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        response = super(_RecordingAdapter, self).send(request, **kwargs)
+        self.cassette.append(_prepared_request_key(request), request.method,
+                             request.url, response.status_code,
+                             response.headers, response.content)
+        return response
+
+
+class _ReplayAdapter(requests.adapters.BaseAdapter):
+    """Transport adapter which answers requests from a cassette."""
+
+    def __init__(self, cassette):
+        super(_ReplayAdapter, self).__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        recorded = self.cassette.next_response(_prepared_request_key(request))
+        if recorded is None:
+            raise OpenMLReplayError('No recorded response for %s %s' %
+                                    (request.method, request.url))
+        status_code, headers, content = recorded
+        response = requests.models.Response()
+        response.status_code = status_code
+        response.headers = requests.structures.CaseInsensitiveDict(headers)
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers)
+        response._content = content
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+@contextlib.contextmanager
+def _mount(adapter):
+    openml._api_calls._transport_adapters.append(adapter)
+    try:
+        yield adapter.cassette
+    finally:
+        openml._api_calls._transport_adapters.remove(adapter)
+        adapter.close()
+
+
+def record(path):
+    """Record all responses of the server while the context is active.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the cassette. Responses are added to an existing
+        cassette.
+
+    Returns
+    -------
+    context manager
+        Yields the :class:`Cassette`.
+    """
+    return _mount(_RecordingAdapter(Cassette(path)))
+
+
+def replay(path):
+    """Answer all requests from a cassette while the context is active.
+
+    Requests which were not recorded raise an
+    :class:`openml.exceptions.OpenMLReplayError`.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the cassette.
+
+    Returns
+    -------
+    context manager
+        Yields the :class:`Cassette`.
+    """
+    return _mount(_ReplayAdapter(Cassette(path)))
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class _ReplayRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._replay(None)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._replay(body)
+
+    def _replay(self, body):
+        replay_server = self.server.replay_server
+        key = _request_key(self.command, self.path, body,
+                           self.headers.get('Content-Type'))
+        recorded = replay_server.cassette.next_response(key)
+        if recorded is None and self.command == 'POST':
+            recorded = replay_server._upload_response(self.path)
+        if recorded is None:
+            status_code = 404
+            headers = {'Content-Type': 'text/plain'}
+            content = ('No recorded response for %s %s' %
+                       (self.command, self.path)).encode('utf-8')
+        else:
+            status_code, headers, content = recorded
+            content = replay_server._rewrite_origins(
+                content, headers.get('Content-Type', ''),
+            )
+
+        # Compress like the OpenML server
+        buffer_ = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer_, mode='wb') as fh:
+            fh.write(content)
+        content = buffer_.getvalue()
+
+        self.send_response(status_code)
+        for name, value in headers.items():
+            if name != 'Content-Encoding':
+                self.send_header(name, value)
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        config.logger.debug('Replay server: ' + format % args)
+
+
+class ReplayServer(object):
+    """Local HTTP server which answers requests from a cassette.
+
+    URLs of the recorded servers in XML and JSON responses, for example the
+    download URLs in dataset descriptions, are replaced by the URL of the
+    replay server. Uploads of datasets, flows and runs which were not
+    recorded are accepted and answered with new IDs counting up from 1, so
+    that publishing can be benchmarked without recording real uploads. Other
+    requests which were not recorded are answered with status code 404.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the cassette.
+
+    host : str
+        Address to listen on.
+
+    port : int
+        Port to listen on, 0 picks a free port.
+    """
+
+    def __init__(self, path, host='127.0.0.1', port=0):
+        self.cassette = Cassette(path)
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+        self._origins = None
+        self._lock = threading.Lock()
+        self._n_uploads = 0
+
+    @property
+    def url(self):
+        """Scheme, host and port of the running server."""
+        return 'http://%s:%d' % (self.host, self.port)
+
+    @property
+    def api_url(self):
+        """Value for ``openml.config.server`` to use the running server."""
+        recorded_server = self.cassette.server
+        path = urlsplit(recorded_server).path if recorded_server else ''
+        return self.url + path
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._origins = self.cassette.origins()
+        self._server = _ThreadingHTTPServer((self.host, self.port),
+                                            _ReplayRequestHandler)
+        self._server.replay_server = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def _upload_response(self, path):
+        """Answer an upload which was not recorded, None if ``path`` is not
+        an upload API call."""
+        api_path = urlsplit(self.api_url).path
+        path = urlsplit(path).path
+        if not path.startswith(api_path):
+            return None
+        upload = _UPLOAD_RESPONSES.get(path[len(api_path):].strip('/'))
+        if upload is None:
+            return None
+        with self._lock:
+            self._n_uploads += 1
+            upload_id = self._n_uploads
+        content = ('<oml:%s xmlns:oml="http://openml.org/openml">'
+                   '<oml:%s>%d</oml:%s></oml:%s>'
+                   % (upload[0], upload[1], upload_id, upload[1], upload[0]))
+        return 200, {'Content-Type': 'text/xml'}, content.encode('utf-8')
+
+    def _rewrite_origins(self, content, content_type):
+        if 'xml' not in content_type and 'json' not in content_type:
+            return content
+        for origin in self._origins:
+            content = content.replace(origin.encode('utf-8'),
+                                      self.url.encode('utf-8'))
+        return content
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -1,4 +1,5 @@
 from .run import OpenMLRun
+from .profiling import RunProfile, profile_run
 from .trace import OpenMLRunTrace, OpenMLTraceIteration
 from .functions import (
     run_model_on_task,
@@ -9,12 +10,14 @@ from .functions import (
     get_run_trace,
     initialize_model_from_run,
     initialize_model_from_trace,
+    find_existing_runs,
 )
 
 __all__ = [
     'OpenMLRun',
     'OpenMLRunTrace',
     'OpenMLTraceIteration',
+    'RunProfile',
     'run_model_on_task',
     'run_flow_on_task',
     'get_run',
@@ -22,5 +25,7 @@ __all__ = [
     'get_runs',
     'get_run_trace',
     'initialize_model_from_run',
-    'initialize_model_from_trace'
+    'initialize_model_from_trace',
+    'find_existing_runs',
+    'profile_run',
 ]
@@ -1,5 +1,5 @@
 import collections
-import io
+import copy
 import json
 import os
 import sys
@@ -7,22 +7,26 @@ import time
 import warnings
 
 import numpy as np
-import sklearn.pipeline
 import six
 import xmltodict
-import sklearn.metrics
+
+try:
+    import psutil
+except ImportError:
+    # Optional, the CPU time of worker processes is then read from /proc
+    psutil = None
 
 import openml
 import openml.utils
 import openml._api_calls
 from ..exceptions import PyOpenMLError
 from .. import config
-from openml.flows.sklearn_converter import _check_n_jobs
 from openml.flows.flow import _copy_server_fields
 from ..flows import sklearn_to_flow, get_flow, flow_exists, OpenMLFlow
 from ..setups import setup_exists, initialize_model
 from ..exceptions import OpenMLCacheException, OpenMLServerException
 from ..tasks import OpenMLTask
+from .profiling import _active_profile, _stage
 from .run import OpenMLRun, _get_version_information
 from .trace import OpenMLRunTrace
 
@@ -30,6 +34,114 @@ from .trace import OpenMLRunTrace
 # circular imports
 
 RUNS_CACHE_DIR_NAME = 'runs'
+# Elements of the run xml which are always parsed into a list
+RUN_XML_FORCE_LIST = ('oml:file', 'oml:evaluation', 'oml:parameter_setting')
+
+if six.PY2:
+    _wall_clock = time.time
+else:
+    _wall_clock = time.perf_counter
+
+
+def _check_n_jobs(model):
+    # scikit-learn is only imported when running a model
+    from openml.flows.sklearn_converter import _check_n_jobs
+    return _check_n_jobs(model)
+
+
+def _proc_stat_fields(pid):
+    """Fields of ``/proc/<pid>/stat`` after the executable name, which can
+    contain spaces, starting with the state; the parent process ID is the
+    second field and utime, stime, cutime and cstime are the 12th to 15th.
+    Returns ``None`` if the process terminated in the meantime."""
+    try:
+        with open('/proc/%d/stat' % pid) as fh:
+            stat = fh.read()
+    except (IOError, OSError):
+        return None
+    return stat[stat.rfind(')') + 2:].split()
+
+
+def _proc_descendants(pid):
+    """Process IDs of the live descendants of a process, read from
+    ``/proc``."""
+    if os.path.isfile('/proc/%d/task/%d/children' % (pid, pid)):
+        descendants = []
+        parents = [pid]
+        while parents:
+            parent = parents.pop()
+            try:
+                for thread in os.listdir('/proc/%d/task' % parent):
+                    with open('/proc/%d/task/%s/children'
+                              % (parent, thread)) as fh:
+                        children = [int(child) for child in fh.read().split()]
+                    descendants.extend(children)
+                    parents.extend(children)
+            except (IOError, OSError):
+                # The process terminated in the meantime
+                continue
+        return descendants
+
+    # The kernel does not list the children of a process, so the parents of
+    # all processes are read
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            fields = _proc_stat_fields(int(entry))
+            if fields is not None:
+                children.setdefault(int(fields[1]), []).append(int(entry))
+    descendants = []
+    parents = [pid]
+    while parents:
+        parent_children = children.get(parents.pop(), [])
+        descendants.extend(parent_children)
+        parents.extend(parent_children)
+    return descendants
+
+
+def _live_descendants_cpu_time():
+    """User and system CPU time in seconds of the live descendant processes
+    (including the children they waited for), or ``None`` if it cannot be
+    determined on this platform."""
+    pid = os.getpid()
+    if psutil is not None:
+        cpu_time = 0.0
+        for child in psutil.Process(pid).children(recursive=True):
+            try:
+                times = child.cpu_times()
+            except psutil.Error:
+                # The child terminated in the meantime
+                continue
+            cpu_time += (times.user + times.system + times.children_user +
+                         times.children_system)
+        return cpu_time
+    if not os.path.isfile('/proc/%d/stat' % pid):
+        return None
+    cpu_ticks = 0
+    for descendant in _proc_descendants(pid):
+        fields = _proc_stat_fields(descendant)
+        if fields is not None:
+            cpu_ticks += sum(int(field) for field in fields[11:15])
+    return float(cpu_ticks) / os.sysconf('SC_CLK_TCK')
+
+
+def _cpu_time_with_children(parallel=True):
+    """User and system CPU time in seconds of the process and all its
+    descendant processes, both live ones (such as the worker processes of
+    joblib) and terminated ones which were waited for.
+
+    Live descendants are only looked for if the model runs in ``parallel``.
+    Their CPU time is read with psutil if it is installed and from ``/proc``
+    otherwise. If neither is available, ``None`` is returned for a model
+    which runs in parallel, because its workers could be processes."""
+    times = os.times()
+    cpu_time = times[0] + times[1] + times[2] + times[3]
+    if not parallel:
+        return cpu_time
+    live_cpu_time = _live_descendants_cpu_time()
+    if live_cpu_time is None:
+        return None
+    return cpu_time + live_cpu_time
 
 
 def run_model_on_task(model, task, avoid_duplicate_runs=True, flow_tags=None,
@@ -99,17 +211,19 @@ def run_flow_on_task(flow, task, avoid_duplicate_runs=True, flow_tags=None,
 
     # skips the run if it already exists and the user opts for this in the config file.
     # also, if the flow is not present on the server, the check is not needed.
-    flow_id = flow_exists(flow.name, flow.external_version)
-    if avoid_duplicate_runs and flow_id:
-        flow_from_server = get_flow(flow_id)
-        flow_from_server.model = flow.model
-        setup_id = setup_exists(flow_from_server)
-        ids = _run_exists(task.task_id, setup_id)
-        if ids:
-            raise PyOpenMLError("Run already exists in server. Run id(s): %s" % str(ids))
-        _copy_server_fields(flow_from_server, flow)
-
-    dataset = task.get_dataset()
+    with _stage('check_duplicates'):
+        flow_id = flow_exists(flow.name, flow.external_version)
+        if avoid_duplicate_runs and flow_id:
+            flow_from_server = copy.copy(get_flow(flow_id))
+            flow_from_server.model = flow.model
+            setup_id = setup_exists(flow_from_server)
+            ids = _run_exists(task.task_id, setup_id)
+            if ids:
+                raise PyOpenMLError("Run already exists in server. Run id(s): %s" % str(ids))
+            _copy_server_fields(flow_from_server, flow)
+
+    with _stage('load_dataset'):
+        dataset = task.get_dataset()
 
     if task.class_labels is None:
         raise ValueError('The task has no class labels. This method currently '
@@ -128,7 +242,8 @@ def run_flow_on_task(flow, task, avoid_duplicate_runs=True, flow_tags=None,
         if flow.flow_id is not None:
             raise ValueError('flow.flow_id is not None, but the flow does not'
                              'exist on the server according to flow_exists')
-        _publish_flow_if_necessary(flow)
+        with _stage('upload'):
+            _publish_flow_if_necessary(flow)
         # if the flow was published successfully
         # and has an id
         if flow.flow_id is not None:
@@ -163,6 +278,7 @@ def run_flow_on_task(flow, task, avoid_duplicate_runs=True, flow_tags=None,
         tags=tags,
         trace=trace,
         data_content=data_content,
+        profile=_active_profile(),
     )
     # TODO: currently hard-coded sklearn assumption.
     run.parameter_settings = openml.flows.obtain_parameter_values(flow)
@@ -274,6 +390,8 @@ def initialize_model_from_trace(run_id, repeat, fold, iteration=None):
         raise ValueError('Combination repeat, fold, iteration not availavle')
     current = run_trace.trace_iterations[(repeat, fold, iteration)]
 
+    import sklearn.model_selection
+
     search_model = initialize_model_from_run(run_id)
     if not isinstance(search_model, sklearn.model_selection._search.BaseSearchCV):
         raise ValueError('Deserialized flow not instance of ' \
@@ -313,6 +431,77 @@ def _run_exists(task_id, setup_id):
         return set()
 
 
+def find_existing_runs(model_task_pairs, seed=None):
+    """Check for many combinations of a model and a task whether they were
+    already run on the server.
+
+    This is the check done by :func:`run_model_on_task` with
+    ``avoid_duplicate_runs=True``, but it needs far fewer requests for many
+    combinations, for example for a hyperparameter sweep: every flow and
+    every setup is looked up once, known flows and setups are taken from
+    the cache, and the existing runs of all combinations are listed
+    together.
+
+    Parameters
+    ----------
+    model_task_pairs : list
+        List of ``(model, task)`` tuples. Tasks are given either as
+        ``OpenMLTask`` or as task ID.
+
+    seed : int, optional
+        Seed with which the models would be run, see
+        :func:`run_model_on_task`. Unseeded components of the models are
+        seeded in place, as :func:`run_model_on_task` would do.
+
+    Returns
+    -------
+    list
+        For every combination in the same order, the set of IDs of the runs
+        of the model on the task. Combinations with an empty set still need
+        to be run.
+    """
+    # Flow, setup and task of every combination, setup_id is None if the
+    # flow or the setup does not exist on the server
+    combinations = []
+    flow_ids = {}
+    setup_ids = {}
+    for model, task in model_task_pairs:
+        task_id = task.task_id if isinstance(task, OpenMLTask) else int(task)
+        model = _get_seeded_model(model, seed=seed)
+        flow = sklearn_to_flow(model)
+        flow_key = (flow.name, flow.external_version)
+        if flow_key not in flow_ids:
+            flow_ids[flow_key] = flow_exists(*flow_key)
+        if not flow_ids[flow_key]:
+            combinations.append((task_id, None))
+            continue
+
+        flow_from_server = copy.copy(get_flow(flow_ids[flow_key]))
+        flow_from_server.model = model
+        description = openml.setups.functions._setup_description(
+            flow_from_server)
+        if description not in setup_ids:
+            setup_ids[description] = \
+                openml.setups.functions._setup_exists_for_description(
+                    description)
+        combinations.append((task_id, setup_ids[description] or None))
+
+    runs = {}
+    task_ids = sorted(set(task_id for task_id, setup_id in combinations
+                          if setup_id is not None))
+    existing_setup_ids = sorted(set(setup_id for _, setup_id in combinations
+                                    if setup_id is not None))
+    listed_runs = openml.utils._list_all_in_chunks(
+        _list_runs, 100, {'task': task_ids, 'setup': existing_setup_ids},
+    )
+    for run_id, run in listed_runs.items():
+        key = (run['task_id'], run['setup_id'])
+        runs.setdefault(key, set()).add(run_id)
+
+    return [set(runs.get((task_id, setup_id), set()))
+            for task_id, setup_id in combinations]
+
+
 def _get_seeded_model(model, seed=None):
     """Sets all the non-seeded components of a model with a seed.
        Models that are already seeded will maintain the seed. In
@@ -333,6 +522,7 @@ def _get_seeded_model(model, seed=None):
             a version of the model where all (sub)components have
             a seed
     """
+    import sklearn.model_selection
 
     def _seed_current_object(current_value):
         if isinstance(current_value, int):  # acceptable behaviour
@@ -427,6 +617,8 @@ def _prediction_to_row(rep_no, fold_no, sample_no, row_id, correct_label,
 
 
 def _run_task_get_arffcontent(model, task, add_local_measures):
+    import sklearn.base
+    import sklearn.model_selection
 
     def _prediction_to_probabilities(y, model_classes):
         # y: list or numpy array of predictions
@@ -491,11 +683,12 @@ def _run_task_get_arffcontent(model, task, add_local_measures):
     # to ensure it contains the hyperparameter data (in cv_results_)
     if isinstance(model_fold, sklearn.model_selection._search.BaseSearchCV):
         # arff_tracecontent is already set
-        arff_trace_attributes = _extract_arfftrace_attributes(model_fold)
-        trace = OpenMLRunTrace.generate(
-            arff_trace_attributes,
-            arff_tracecontent,
-        )
+        with _stage('extract_trace'):
+            arff_trace_attributes = _extract_arfftrace_attributes(model_fold)
+            trace = OpenMLRunTrace.generate(
+                arff_trace_attributes,
+                arff_tracecontent,
+            )
     else:
         trace = None
 
@@ -536,6 +729,13 @@ def _run_model_on_fold(model, task, rep_no, fold_no, sample_no, can_measure_runt
             Determines whether to calculate a set of measures (i.e., predictive
             accuracy) locally, to later verify server behaviour
 
+        The wall clock time and the CPU time of the process and its child
+        processes are measured also for models which are executed in
+        parallel, and returned as ``wall_clock_time_millis[_training|_testing]``
+        and ``cpu_time_millis[_training|_testing]``. The CPU time of the live
+        worker processes of a parallel model requires psutil or ``/proc``,
+        without either the CPU time is only returned for sequential models.
+
         Returns
         -------
         arff_datacontent : List[List]
@@ -549,6 +749,9 @@ def _run_model_on_fold(model, task, rep_no, fold_no, sample_no, can_measure_runt
         model : sklearn model
             The model trained on this fold
     """
+    import sklearn.metrics
+    import sklearn.model_selection
+    import sklearn.pipeline
     def _prediction_to_probabilities(y, model_classes):
         # y: list or numpy array of predictions
         # model_classes: sklearn classifier mapping from original array id to prediction index id
@@ -563,26 +766,40 @@ def _run_model_on_fold(model, task, rep_no, fold_no, sample_no, can_measure_runt
     # TODO: if possible, give a warning if model is already fitted (acceptable in case of custom experimentation,
     # but not desirable if we want to upload to OpenML).
 
-    train_indices, test_indices = task.get_train_test_split_indices(repeat=rep_no,
-                                                                    fold=fold_no,
-                                                                    sample=sample_no)
-
-    X, Y = task.get_X_and_y()
-    trainX = X[train_indices]
-    trainY = Y[train_indices]
-    testX = X[test_indices]
-    testY = Y[test_indices]
+    with _stage('fetch_split'):
+        train_indices, test_indices = task.get_train_test_split_indices(repeat=rep_no,
+                                                                        fold=fold_no,
+                                                                        sample=sample_no)
+
+    with _stage('load_dataset'):
+        X, Y = task.get_X_and_y()
+    with _stage('slice_data'):
+        trainX = X[train_indices]
+        trainY = Y[train_indices]
+        testX = X[test_indices]
+        testY = Y[test_indices]
     user_defined_measures = collections.OrderedDict()
 
     try:
         # for measuring runtime. Only available since Python 3.3
         if can_measure_runtime:
             modelfit_starttime = time.process_time()
-        model.fit(trainX, trainY)
-
+        # wall clock and CPU time including child processes are also valid
+        # for models running in parallel
+        modelfit_wallstart = _wall_clock()
+        modelfit_cpustart = _cpu_time_with_children(not can_measure_runtime)
+        with _stage('fit'):
+            model.fit(trainX, trainY)
+
+        modelfit_cpuend = _cpu_time_with_children(not can_measure_runtime)
+        modelfit_wall_duration = (_wall_clock() - modelfit_wallstart) * 1000
         if can_measure_runtime:
             modelfit_duration = (time.process_time() - modelfit_starttime) * 1000
             user_defined_measures['usercpu_time_millis_training'] = modelfit_duration
+        user_defined_measures['wall_clock_time_millis_training'] = modelfit_wall_duration
+        if modelfit_cpustart is not None:
+            modelfit_cpu_duration = (modelfit_cpuend - modelfit_cpustart) * 1000
+            user_defined_measures['cpu_time_millis_training'] = modelfit_cpu_duration
     except AttributeError as e:
         # typically happens when training a regressor on classification task
         raise PyOpenMLError(str(e))
@@ -590,7 +807,8 @@ def _run_model_on_fold(model, task, rep_no, fold_no, sample_no, can_measure_runt
     # extract trace, if applicable
     arff_tracecontent = []
     if isinstance(model, sklearn.model_selection._search.BaseSearchCV):
-        arff_tracecontent.extend(_extract_arfftrace(model, rep_no, fold_no))
+        with _stage('extract_trace'):
+            arff_tracecontent.extend(_extract_arfftrace(model, rep_no, fold_no))
 
     # search for model classes_ (might differ depending on modeltype)
     # first, pipelines are a special case (these don't have a classes_
@@ -608,17 +826,28 @@ def _run_model_on_fold(model, task, rep_no, fold_no, sample_no, can_measure_runt
 
     if can_measure_runtime:
         modelpredict_starttime = time.process_time()
-
-    PredY = model.predict(testX)
-    try:
-        ProbaY = model.predict_proba(testX)
-    except AttributeError:
-        ProbaY = _prediction_to_probabilities(PredY, list(model_classes))
-
+    modelpredict_wallstart = _wall_clock()
+    modelpredict_cpustart = _cpu_time_with_children(not can_measure_runtime)
+
+    with _stage('predict'):
+        PredY = model.predict(testX)
+        try:
+            ProbaY = model.predict_proba(testX)
+        except AttributeError:
+            ProbaY = _prediction_to_probabilities(PredY, list(model_classes))
+
+    modelpredict_cpuend = _cpu_time_with_children(not can_measure_runtime)
+    modelpredict_wall_duration = (_wall_clock() - modelpredict_wallstart) * 1000
     if can_measure_runtime:
         modelpredict_duration = (time.process_time() - modelpredict_starttime) * 1000
         user_defined_measures['usercpu_time_millis_testing'] = modelpredict_duration
         user_defined_measures['usercpu_time_millis'] = modelfit_duration + modelpredict_duration
+    user_defined_measures['wall_clock_time_millis_testing'] = modelpredict_wall_duration
+    user_defined_measures['wall_clock_time_millis'] = modelfit_wall_duration + modelpredict_wall_duration
+    if modelpredict_cpustart is not None:
+        modelpredict_cpu_duration = (modelpredict_cpuend - modelpredict_cpustart) * 1000
+        user_defined_measures['cpu_time_millis_testing'] = modelpredict_cpu_duration
+        user_defined_measures['cpu_time_millis'] = modelfit_cpu_duration + modelpredict_cpu_duration
 
     if ProbaY.shape[1] != len(task.class_labels):
         warnings.warn("Repeat %d Fold %d: estimator only predicted for %d/%d classes!" % (rep_no, fold_no, ProbaY.shape[1], len(task.class_labels)))
@@ -627,19 +856,22 @@ def _run_model_on_fold(model, task, rep_no, fold_no, sample_no, can_measure_runt
     def _calculate_local_measure(sklearn_fn, openml_name):
         user_defined_measures[openml_name] = sklearn_fn(testY, PredY)
 
-    if add_local_measures:
-        _calculate_local_measure(sklearn.metrics.accuracy_score, 'predictive_accuracy')
+    with _stage('assemble_rows'):
+        if add_local_measures:
+            _calculate_local_measure(sklearn.metrics.accuracy_score, 'predictive_accuracy')
 
-    arff_datacontent = []
-    for i in range(0, len(test_indices)):
-        arff_line = _prediction_to_row(rep_no, fold_no, sample_no,
-                                       test_indices[i], task.class_labels[testY[i]],
-                                       PredY[i], ProbaY[i], task.class_labels, model_classes)
-        arff_datacontent.append(arff_line)
+        arff_datacontent = []
+        for i in range(0, len(test_indices)):
+            arff_line = _prediction_to_row(rep_no, fold_no, sample_no,
+                                           test_indices[i], task.class_labels[testY[i]],
+                                           PredY[i], ProbaY[i], task.class_labels, model_classes)
+            arff_datacontent.append(arff_line)
     return arff_datacontent, arff_tracecontent, user_defined_measures, model
 
 
 def _extract_arfftrace(model, rep_no, fold_no):
+    import sklearn.model_selection
+
     if not isinstance(model, sklearn.model_selection._search.BaseSearchCV):
         raise ValueError('model should be instance of'\
                          ' sklearn.model_selection._search.BaseSearchCV')
@@ -667,6 +899,8 @@ def _extract_arfftrace(model, rep_no, fold_no):
 
 
 def _extract_arfftrace_attributes(model):
+    import sklearn.model_selection
+
     if not isinstance(model, sklearn.model_selection._search.BaseSearchCV):
         raise ValueError('model should be instance of'\
                          ' sklearn.model_selection._search.BaseSearchCV')
@@ -734,22 +968,33 @@ def get_run(run_id):
     run : OpenMLRun
         Run corresponding to ID, fetched from the server.
     """
+    run = openml.utils._memory_cache_get(RUNS_CACHE_DIR_NAME, run_id)
+    if run is not None:
+        return run
+
     run_dir = openml.utils._create_cache_directory_for_id(RUNS_CACHE_DIR_NAME, run_id)
-    run_file = os.path.join(run_dir, "description.xml")
 
     if not os.path.exists(run_dir):
         os.makedirs(run_dir)
 
     try:
-        return _get_cached_run(run_id)
+        run = _get_cached_run(run_id)
+        openml.utils._record_cache_access(RUNS_CACHE_DIR_NAME, hit=True)
 
     except (OpenMLCacheException):
+        openml.utils._record_cache_access(RUNS_CACHE_DIR_NAME, hit=False)
         run_xml = openml._api_calls._perform_api_call("run/%d" % run_id)
-        with io.open(run_file, "w", encoding='utf8') as fh:
-            fh.write(run_xml)
-
-    run = _create_run_from_xml(run_xml)
+        with openml.utils._cache_entity_lock(RUNS_CACHE_DIR_NAME, run_id):
+            # The directory may have been evicted in the meantime
+            run_dir = openml.utils._create_cache_directory_for_id(
+                RUNS_CACHE_DIR_NAME, run_id,
+            )
+            openml.utils._write_cache_file(run_dir, "description.xml",
+                                           run_xml)
+        openml.utils._evict_cache(keep=run_dir)
+        run = _create_run_from_xml(run_xml)
 
+    openml.utils._memory_cache_put(RUNS_CACHE_DIR_NAME, run_id, run)
     return run
 
 
@@ -766,6 +1011,24 @@ def _create_run_from_xml(xml, from_server=True):
     run : OpenMLRun
         New run object representing run_xml.
     """
+    run_dict = xmltodict.parse(xml, force_list=RUN_XML_FORCE_LIST)
+    return _create_run_from_dict(run_dict, from_server=from_server)
+
+
+def _create_run_from_dict(run_dict, from_server=True):
+    """Create a run object from a dictionary parsed from its xml.
+
+    Parameters
+    ----------
+    run_dict : dict
+        XML describing a run, parsed by xmltodict with
+        ``force_list=RUN_XML_FORCE_LIST``.
+
+    Returns
+    -------
+    run : OpenMLRun
+        New run object.
+    """
 
     def obtain_field(xml_obj, fieldname, from_server, cast=None):
         # this function can be used to check whether a field is present in an object.
@@ -780,7 +1043,7 @@ def _create_run_from_xml(xml, from_server=True):
         else:
             raise AttributeError('Run XML does not contain required (server) field: ', fieldname)
 
-    run = xmltodict.parse(xml, force_list=['oml:file', 'oml:evaluation', 'oml:parameter_setting'])["oml:run"]
+    run = run_dict["oml:run"]
     run_id = obtain_field(run, 'oml:run_id', from_server, cast=int)
     uploader = obtain_field(run, 'oml:uploader', from_server, cast=int)
     uploader_name = obtain_field(run, 'oml:uploader_name', from_server)
@@ -866,8 +1129,9 @@ def _create_run_from_xml(xml, from_server=True):
                          'description XML' % run_id)
 
     if 'predictions' not in files and from_server is True:
-        task = openml.tasks.get_task(task_id)
-        if task.task_type_id == 8:
+        # The task type is part of the description, downloading the task is
+        # not necessary
+        if task_type == 'Subgroup Discovery':
             raise NotImplementedError(
                 'Subgroup discovery tasks are not yet supported.'
             )
@@ -905,9 +1169,10 @@ def _get_cached_run(run_id):
     )
     try:
         run_file = os.path.join(run_cache_dir, "description.xml")
-        with io.open(run_file, encoding='utf8') as fh:
-            run = _create_run_from_xml(xml=fh.read())
-        return run
+        run_dict = openml.utils._parse_cached_xml(
+            run_file, force_list=RUN_XML_FORCE_LIST,
+        )
+        return _create_run_from_dict(run_dict)
 
     except (OSError, IOError):
         raise OpenMLCacheException("Run file for run id %d not "
@@ -993,7 +1258,15 @@ def _list_runs(id=None, task=None, setup=None,
     dict
         List of found runs.
     """
+    api_call = _list_runs_api_call(id=id, task=task, setup=setup, flow=flow,
+                                   uploader=uploader,
+                                   display_errors=display_errors, **kwargs)
+    return __list_runs(api_call)
+
 
+def _list_runs_api_call(id=None, task=None, setup=None, flow=None,
+                        uploader=None, display_errors=False, **kwargs):
+    """Create the api call of _list_runs."""
     api_call = "run/list"
     if kwargs is not None:
         for operator, value in kwargs.items():
@@ -1010,12 +1283,17 @@ def _list_runs(id=None, task=None, setup=None,
         api_call += "/uploader/%s" % ','.join([str(int(i)) for i in uploader])
     if display_errors:
         api_call += "/show_errors/true"
-    return __list_runs(api_call)
+    return api_call
 
 
 def __list_runs(api_call):
     """Helper function to parse API calls which are lists of runs"""
     xml_string = openml._api_calls._perform_api_call(api_call)
+    return _parse_runs_list(xml_string)
+
+
+def _parse_runs_list(xml_string):
+    """Parse the xml returned by the api call of _list_runs."""
     runs_dict = xmltodict.parse(xml_string, force_list=('oml:run',))
     # Minimalistic check if the XML is useful
     if 'oml:runs' not in runs_dict:
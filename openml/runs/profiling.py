@@ -0,0 +1,172 @@
+"""Opt-in profiling of the stages of a run.
+
+Within :func:`profile_run`, :func:`openml.runs.run_model_on_task`,
+:func:`openml.runs.run_flow_on_task` and :meth:`openml.OpenMLRun.publish`
+record how long each stage of a run takes::
+
+    with openml.runs.profile_run() as profile:
+        run = openml.runs.run_model_on_task(model, task)
+        run.publish()
+    print(run.profile)
+"""
+from collections import OrderedDict
+import contextlib
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+from .. import config
+
+
+# Stages of a run in the order in which they are executed
+STAGES = (
+    'check_duplicates',
+    'load_dataset',
+    'fetch_split',
+    'slice_data',
+    'fit',
+    'predict',
+    'assemble_rows',
+    'extract_trace',
+    'serialize',
+    'upload',
+)
+
+_active = threading.local()
+
+
+def _cpu_time():
+    times = os.times()
+    return times[0] + times[1]
+
+
+def _peak_rss():
+    """Peak resident set size of the process in bytes, None if unknown."""
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    if sys.platform != 'darwin':
+        peak_rss *= 1024
+    return peak_rss
+
+
+class RunProfile(object):
+    """Wall time, CPU time and peak memory of the stages of a run.
+
+    Stages which are executed several times, such as ``fit`` once per fold,
+    are summed up.
+
+    Attributes
+    ----------
+    stages : OrderedDict
+        Maps the name of each executed stage to a dictionary with the number
+        of times it was executed (``count``), its wall time and CPU time in
+        seconds (``wall_time``, ``cpu_time``) and the peak resident set size
+        of the process in bytes at the end of the stage (``peak_rss``, None if
+        it cannot be measured on this platform). The peak resident set size
+        is the maximum since the start of the process, not of the stage.
+    """
+
+    def __init__(self):
+        self.stages = OrderedDict()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Context manager which measures a stage.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage, usually one of ``STAGES``.
+        """
+        wall_start = time.time()
+        cpu_start = _cpu_time()
+        try:
+            yield
+        finally:
+            if name not in self.stages:
+                self.stages[name] = {'count': 0, 'wall_time': 0.0,
+                                     'cpu_time': 0.0, 'peak_rss': None}
+            stage = self.stages[name]
+            stage['count'] += 1
+            stage['wall_time'] += time.time() - wall_start
+            stage['cpu_time'] += _cpu_time() - cpu_start
+            peak_rss = _peak_rss()
+            if peak_rss is not None:
+                stage['peak_rss'] = max(stage['peak_rss'] or 0, peak_rss)
+
+    def to_dict(self):
+        """Measurements of all stages, see ``stages``.
+
+        Returns
+        -------
+        OrderedDict
+        """
+        return OrderedDict((name, dict(stage))
+                           for name, stage in self.stages.items())
+
+    def __str__(self):
+        lines = ['%-16s %5s %10s %10s %10s' % ('stage', 'count', 'wall [s]',
+                                               'cpu [s]', 'rss [MB]')]
+        for name, stage in self.stages.items():
+            peak_rss = stage['peak_rss']
+            lines.append('%-16s %5d %10.3f %10.3f %10s' % (
+                name, stage['count'], stage['wall_time'], stage['cpu_time'],
+                '-' if peak_rss is None else '%.1f' % (peak_rss / 2. ** 20),
+            ))
+        return '\n'.join(lines)
+
+
+@contextlib.contextmanager
+def profile_run(profile=None):
+    """Profile the stages of runs executed or published in this thread
+    while the context is active.
+
+    The profile is also stored in the ``profile`` attribute of runs created
+    while it is active, and logged at level INFO when the context exits.
+
+    Parameters
+    ----------
+    profile : RunProfile, optional
+        Profile to add the measurements to. By default, a new one is
+        created.
+
+    Yields
+    ------
+    RunProfile
+    """
+    if profile is None:
+        profile = RunProfile()
+    previous = getattr(_active, 'profile', None)
+    _active.profile = profile
+    try:
+        yield profile
+    finally:
+        _active.profile = previous
+        config.logger.info('Run profile:\n%s' % profile)
+
+
+def _active_profile():
+    """The profile of the enclosing :func:`profile_run`, or None."""
+    return getattr(_active, 'profile', None)
+
+
+@contextlib.contextmanager
+def _stage(name, profile=None):
+    """Measure a stage in ``profile`` or, by default, in the active profile.
+    Does nothing if there is no profile."""
+    if profile is None:
+        profile = _active_profile()
+    if profile is None:
+        yield
+    else:
+        with profile.stage(name):
+            yield
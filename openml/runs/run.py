@@ -14,6 +14,7 @@ import openml
 import openml._api_calls
 from ..tasks import get_task
 from ..exceptions import PyOpenMLError
+from .profiling import _stage
 
 
 class OpenMLRun(object):
@@ -30,7 +31,7 @@ class OpenMLRun(object):
                  data_content=None, trace=None,
                  model=None, task_type=None, task_evaluation_measure=None, flow_name=None,
                  parameter_settings=None, predictions_url=None, task=None,
-                 flow=None, run_id=None):
+                 flow=None, run_id=None, profile=None):
         self.uploader = uploader
         self.uploader_name = uploader_name
         self.task_id = task_id
@@ -55,6 +56,7 @@ class OpenMLRun(object):
         self.model = model
         self.tags = tags
         self.predictions_url = predictions_url
+        self.profile = profile
 
     def __str__(self):
         flow_name = self.flow_name
@@ -309,20 +311,23 @@ class OpenMLRun(object):
                 "(Should have been added while executing the task.) "
             )
 
-        description_xml = self._create_description_xml()
-        file_elements = {'description': ("description.xml", description_xml)}
+        with _stage('serialize', self.profile):
+            description_xml = self._create_description_xml()
+            file_elements = {'description': ("description.xml", description_xml)}
 
-        if self.error_message is None:
-            predictions = arff.dumps(self._generate_arff_dict())
-            file_elements['predictions'] = ("predictions.arff", predictions)
+            if self.error_message is None:
+                predictions = arff.dumps(self._generate_arff_dict())
+                file_elements['predictions'] = ("predictions.arff", predictions)
 
-        if self.trace is not None:
-            trace_arff = arff.dumps(self.trace.trace_to_arff())
-            file_elements['trace'] = ("trace.arff", trace_arff)
+            if self.trace is not None:
+                trace_arff = arff.dumps(self.trace.trace_to_arff())
+                file_elements['trace'] = ("trace.arff", trace_arff)
 
-        return_value = openml._api_calls._perform_api_call("/run/", file_elements=file_elements)
+        with _stage('upload', self.profile):
+            return_value = openml._api_calls._perform_api_call("/run/", file_elements=file_elements)
         run_id = int(xmltodict.parse(return_value)['oml:upload_run']['oml:run_id'])
         self.run_id = run_id
+        openml.utils._memory_cache_invalidate('runs', run_id)
         return self
 
     def _create_description_xml(self):
@@ -360,6 +365,7 @@ class OpenMLRun(object):
         """
         data = {'run_id': self.run_id, 'tag': tag}
         openml._api_calls._perform_api_call("/run/tag", data=data)
+        openml.utils._memory_cache_invalidate('runs', self.run_id)
 
     def remove_tag(self, tag):
         """Removes a tag from this run on the server.
@@ -371,6 +377,7 @@ class OpenMLRun(object):
         """
         data = {'run_id': self.run_id, 'tag': tag}
         openml._api_calls._perform_api_call("/run/untag", data=data)
+        openml.utils._memory_cache_invalidate('runs', self.run_id)
 
 
 ################################################################################
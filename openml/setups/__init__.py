@@ -1,5 +1,6 @@
 from .setup import OpenMLSetup, OpenMLParameter
-from .functions import get_setup, list_setups, setup_exists, initialize_model
+from .functions import get_setup, get_setups, list_setups, setup_exists, \
+    initialize_model
 
-__all__ = ['OpenMLSetup', 'OpenMLParameter', 'get_setup', 'list_setups',
-           'setup_exists', 'initialize_model']
+__all__ = ['OpenMLSetup', 'OpenMLParameter', 'get_setup', 'get_setups',
+           'list_setups', 'setup_exists', 'initialize_model']
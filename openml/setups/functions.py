@@ -1,8 +1,11 @@
 from collections import OrderedDict
+import hashlib
+import json
+import threading
 
-import io
 import openml
 import os
+import six
 import xmltodict
 
 from .. import config
@@ -12,6 +15,17 @@ from openml.exceptions import OpenMLServerNoResult
 import openml.utils
 
 
+# Setup IDs of the setup ID index which were already looked up in this
+# process, keyed by (cache directory, md5 of the setup description)
+_setup_ids = {}
+
+# Models of the flows most recently used by initialize_model, keyed by
+# (cache directory, flow ID), see _get_model_template
+_MODEL_TEMPLATES_CACHE_SIZE = 100
+_model_templates = OrderedDict()
+_model_templates_lock = threading.Lock()
+
+
 def setup_exists(flow):
     """
     Checks whether a hyperparameter configuration already exists on the server.
@@ -27,7 +41,19 @@ def setup_exists(flow):
     -------
     setup_id : int
         setup id iff exists, False otherwise
+
+    Notes
+    -----
+    Setups which exist are recorded in an index in the cache directory, which
+    is checked before asking the server. Setups can not be changed once they
+    are created, therefore the index never expires.
     """
+    return _setup_exists_for_description(_setup_description(flow))
+
+
+def _setup_description(flow):
+    """The description of the hyperparameter configuration of a flow which is
+    sent to the server by :func:`setup_exists`."""
     # sadly, this api call relies on a run object
     openml.flows.functions._check_flow_for_server_id(flow)
     if flow.model is None:
@@ -41,30 +67,94 @@ def setup_exists(flow):
 
     # TODO: currently hard-coded sklearn assumption
     openml_param_settings = openml.flows.obtain_parameter_values(flow)
-    description = xmltodict.unparse(_to_dict(flow.flow_id,
-                                             openml_param_settings),
-                                    pretty=True)
+    return xmltodict.unparse(_to_dict(flow.flow_id, openml_param_settings),
+                             pretty=True)
+
+
+def _setup_exists_for_description(description):
+    """Look up the ID of the setup with the description created by
+    :func:`_setup_description`, first in the setup ID index and then on the
+    server."""
+    setup_id = _get_cached_setup_id(description)
+    if setup_id is not None:
+        return setup_id
+
     file_elements = {'description': ('description.arff', description)}
     result = openml._api_calls._perform_api_call('/setup/exists/',
                                                  file_elements=file_elements)
     result_dict = xmltodict.parse(result)
     setup_id = int(result_dict['oml:setup_exists']['oml:id'])
     if setup_id > 0:
+        _cache_setup_id(description, setup_id)
         return setup_id
     else:
         return False
 
 
+def _get_cached_setup_id(description):
+    """Look up the ID of a setup in the setup ID index of the cache.
+
+    Parameters
+    ----------
+    description : str
+        Description of the setup, see :func:`_setup_description`.
+
+    Returns
+    -------
+    int or None
+        None if the setup is not in the index.
+    """
+    md5 = hashlib.md5(description.encode('utf8')).hexdigest()
+    key = (config.get_cache_directory(), md5)
+    setup_id = _setup_ids.get(key)
+    if setup_id is not None:
+        return setup_id
+    with openml.utils._cache_manifest_transaction(read_only=True) \
+            as manifest:
+        if manifest is None or \
+                not openml.utils._manifest_has_table(manifest, 'setup_ids'):
+            return None
+        row = manifest.execute('SELECT id FROM setup_ids WHERE md5 = ?',
+                               (md5,)).fetchone()
+    if row is None:
+        return None
+    _setup_ids[key] = row[0]
+    return row[0]
+
+
+def _cache_setup_id(description, setup_id):
+    """Add a setup to the setup ID index of the cache.
+
+    Parameters
+    ----------
+    description : str
+        Description of the setup, see :func:`_setup_description`.
+
+    setup_id : int
+    """
+    md5 = hashlib.md5(description.encode('utf8')).hexdigest()
+    with openml.utils._cache_manifest_transaction(create=True) as manifest:
+        if manifest is None:
+            return
+        _create_setup_id_table(manifest)
+        manifest.execute('INSERT OR REPLACE INTO setup_ids VALUES (?, ?)',
+                         (md5, setup_id))
+    _setup_ids[(config.get_cache_directory(), md5)] = setup_id
+
+
+def _create_setup_id_table(manifest):
+    manifest.execute('CREATE TABLE IF NOT EXISTS setup_ids '
+                     '(md5 TEXT PRIMARY KEY, id INTEGER)')
+
+
 def _get_cached_setup(setup_id):
     """Load a run from the cache."""
     cache_dir = config.get_cache_directory()
     setup_cache_dir = os.path.join(cache_dir, "setups", str(setup_id))
     try:
         setup_file = os.path.join(setup_cache_dir, "description.xml")
-        with io.open(setup_file, encoding='utf8') as fh:
-            setup_xml = xmltodict.parse(fh.read())
-            setup = _create_setup_from_xml(setup_xml)
-        return setup
+        setup_xml = openml.utils._parse_cached_xml(setup_file)
+        return _create_setup_from_xml(setup_xml)
 
     except (OSError, IOError):
         raise openml.exceptions.OpenMLCacheException("Setup file for setup id %d not cached" % setup_id)
@@ -85,22 +175,139 @@ def get_setup(setup_id):
     OpenMLSetup
         an initialized openml setup object
     """
+    setup = openml.utils._memory_cache_get('setups', setup_id)
+    if setup is not None:
+        return setup
+
     setup_dir = os.path.join(config.get_cache_directory(), "setups", str(setup_id))
-    setup_file = os.path.join(setup_dir, "description.xml")
 
     if not os.path.exists(setup_dir):
         os.makedirs(setup_dir)
 
     try:
-        return _get_cached_setup(setup_id)
+        setup = _get_cached_setup(setup_id)
+        openml.utils._record_cache_access('setups', hit=True)
 
     except (openml.exceptions.OpenMLCacheException):
+        openml.utils._record_cache_access('setups', hit=False)
         setup_xml = openml._api_calls._perform_api_call('/setup/%d' % setup_id)
-        with io.open(setup_file, "w", encoding='utf8') as fh:
-            fh.write(setup_xml)
+        with openml.utils._cache_entity_lock('setups', setup_id):
+            # The directory may have been evicted in the meantime
+            setup_dir = openml.utils._create_cache_directory_for_id(
+                'setups', setup_id,
+            )
+            openml.utils._write_cache_file(setup_dir, "description.xml",
+                                           setup_xml)
+        openml.utils._evict_cache(keep=setup_dir)
+        result_dict = xmltodict.parse(setup_xml)
+        setup = _create_setup_from_xml(result_dict)
+
+    openml.utils._memory_cache_put('setups', setup_id, setup)
+    return setup
+
+
+def get_setups(setup_ids, output_format='object'):
+    """Get many setups.
+
+    Setups which are not cached yet are downloaded with few listing requests
+    instead of one request per setup, and are then stored in the cache like
+    by :func:`get_setup`.
+
+    Parameters
+    ----------
+    setup_ids : iterable
+        Integers representing setup ids.
+
+    output_format : str, optional (default='object')
+        ``object`` to return a list of ``OpenMLSetup``, ``dataframe`` to
+        return a pandas DataFrame with one row per setup, indexed by setup
+        ID. It has a column ``flow_id`` and one column per hyperparameter,
+        named by the full name of the hyperparameter. The values of the
+        hyperparameters are decoded from JSON, so that columns of numbers or
+        booleans have a numerical or boolean type. Lists, dictionaries and
+        values which are not valid JSON are kept as strings.
+
+    Returns
+    -------
+    list of OpenMLSetup or pandas.DataFrame
+        In the order of ``setup_ids``.
+    """
+    if output_format not in ('object', 'dataframe'):
+        raise ValueError("output_format must be 'object' or 'dataframe', "
+                         "got %s" % output_format)
+    setup_ids = [int(setup_id) for setup_id in setup_ids]
+
+    setups = {}
+    missing_ids = []
+    for setup_id in setup_ids:
+        if setup_id in setups or setup_id in missing_ids:
+            continue
+        setup = openml.utils._memory_cache_get('setups', setup_id)
+        if setup is None:
+            try:
+                setup = _get_cached_setup(setup_id)
+                openml.utils._record_cache_access('setups', hit=True)
+            except openml.exceptions.OpenMLCacheException:
+                openml.utils._record_cache_access('setups', hit=False)
+                missing_ids.append(setup_id)
+                continue
+            openml.utils._memory_cache_put('setups', setup_id, setup)
+        setups[setup_id] = setup
+
+    descriptions = openml.utils._list_all_in_chunks(
+        _list_setup_descriptions, 500, {'setup': missing_ids},
+        batch_size=1000,
+    )
+    for setup_id, description in descriptions.items():
+        setup_xml = xmltodict.unparse(description, pretty=True)
+        with openml.utils._cache_entity_lock('setups', setup_id):
+            setup_dir = openml.utils._create_cache_directory_for_id(
+                'setups', setup_id,
+            )
+            openml.utils._write_cache_file(setup_dir, "description.xml",
+                                           setup_xml)
+        setup = _create_setup_from_xml(description)
+        openml.utils._memory_cache_put('setups', setup_id, setup)
+        setups[setup_id] = setup
+    if missing_ids:
+        openml.utils._evict_cache()
+
+    not_found = [setup_id for setup_id in missing_ids
+                 if setup_id not in setups]
+    if not_found:
+        raise OpenMLServerNoResult('Setups %s do not exist.' % not_found)
+
+    setups = [setups[setup_id] for setup_id in setup_ids]
+    if output_format == 'dataframe':
+        return _setups_to_dataframe(setups)
+    return setups
 
-    result_dict = xmltodict.parse(setup_xml)
-    return _create_setup_from_xml(result_dict)
+
+def _setups_to_dataframe(setups):
+    import pandas as pd
+
+    rows = []
+    parameter_names = set()
+    for setup in setups:
+        row = {'setup_id': setup.setup_id, 'flow_id': setup.flow_id}
+        for parameter in (setup.parameters or {}).values():
+            row[parameter.full_name] = _decode_parameter_value(parameter.value)
+            parameter_names.add(parameter.full_name)
+        rows.append(row)
+    columns = ['setup_id', 'flow_id'] + sorted(parameter_names)
+    return pd.DataFrame(rows, columns=columns).set_index('setup_id')
+
+
+def _decode_parameter_value(value):
+    """Decode a hyperparameter value which is serialized as JSON, see
+    :func:`get_setups`."""
+    try:
+        decoded = json.loads(value)
+    except (TypeError, ValueError):
+        return value
+    if isinstance(decoded, (list, dict)):
+        return value
+    return decoded
 
 
 def list_setups(offset=None, size=None, flow=None, tag=None, setup=None):
@@ -143,6 +350,30 @@ def _list_setups(setup=None, **kwargs):
     dict
         """
 
+    setups = dict()
+    descriptions = _list_setup_descriptions(setup=setup, **kwargs)
+    for description in descriptions.values():
+        current = _create_setup_from_xml(description)
+        setups[current.setup_id] = current
+
+    return setups
+
+
+def _list_setup_descriptions(setup=None, **kwargs):
+    """
+    Perform API call `/setup/list/{filters}` and return the description of
+    every setup in the format returned by API call `/setup/{id}`.
+
+    Parameters
+    ----------
+    See :func:`_list_setups`.
+
+    Returns
+    -------
+    OrderedDict
+        Mapping from setup ID to the parsed XML description of the setup.
+    """
+
     api_call = "setup/list"
     if setup is not None:
         api_call += "/setup/%s" % ','.join([str(int(i)) for i in setup])
@@ -150,10 +381,10 @@ def _list_setups(setup=None, **kwargs):
         for operator, value in kwargs.items():
             api_call += "/%s/%s" % (operator, value)
 
-    return __list_setups(api_call)
+    return __list_setup_descriptions(api_call)
 
 
-def __list_setups(api_call):
+def __list_setup_descriptions(api_call):
     """Helper function to parse API calls which are lists of setups"""
     xml_string = openml._api_calls._perform_api_call(api_call)
     setups_dict = xmltodict.parse(xml_string, force_list=('oml:setup',))
@@ -174,13 +405,15 @@ def __list_setups(api_call):
     assert type(setups_dict['oml:setups']['oml:setup']) == list, \
         type(setups_dict['oml:setups'])
 
-    setups = dict()
+    descriptions = OrderedDict()
     for setup_ in setups_dict['oml:setups']['oml:setup']:
         # making it a dict to give it the right format
-        current = _create_setup_from_xml({'oml:setup_parameters': setup_})
-        setups[current.setup_id] = current
+        description = OrderedDict([('@xmlns:oml', 'http://openml.org/openml')])
+        description.update(setup_)
+        descriptions[int(setup_['oml:setup_id'])] = \
+            {'oml:setup_parameters': description}
 
-    return setups
+    return descriptions
 
 
 def initialize_model(setup_id):
@@ -198,25 +431,100 @@ def initialize_model(setup_id):
     model : sklearn model
         the scikitlearn model with all parameters initialized
     """
-    setup = get_setup(setup_id)
-    flow = openml.flows.get_flow(setup.flow_id)
+    import sklearn.base
 
-    # instead of using scikit-learns "set_params" function, we override the
-    # OpenMLFlow objects default parameter value so we can utilize the
-    # flow_to_sklearn function to reinitialize the flow with the set defaults.
+    setup = get_setup(setup_id)
+    template, structure, component_parameters = \
+        _get_model_template(setup.flow_id)
+
+    # The template was initialized with the parameter values stored in the
+    # flow, a clone of it gets the parameter values of the setup. Parameters
+    # which hold the components of a flow, such as the steps of a pipeline,
+    # are the same in all setups of a flow and are kept.
+    model = sklearn.base.clone(template)
+    parameters = {}
     for hyperparameter in setup.parameters.values():
-        structure = flow.get_structure('flow_id')
-        if len(structure[hyperparameter.flow_id]) > 0:
-            subflow = flow.get_subflow(structure[hyperparameter.flow_id])
-        else:
-            subflow = flow
-        subflow.parameters[hyperparameter.parameter_name] = \
-            hyperparameter.value
-
-    model = openml.flows.flow_to_sklearn(flow)
+        path = structure[hyperparameter.flow_id]
+        if (tuple(path), hyperparameter.parameter_name) in \
+                component_parameters:
+            continue
+        name = '__'.join(path + [hyperparameter.parameter_name])
+        parameters[name] = openml.flows.flow_to_sklearn(hyperparameter.value)
+    model.set_params(**parameters)
     return model
 
 
+def _get_model_template(flow_id):
+    """Get the model of a flow with the parameter values stored in the flow.
+
+    Templates are cached by flow ID, as flows can not change.
+
+    Parameters
+    ----------
+    flow_id : int
+
+    Returns
+    -------
+    template : sklearn model
+        Must not be modified.
+
+    structure : dict
+        Structure of the flow by flow ID, see ``OpenMLFlow.get_structure``.
+
+    component_parameters : set
+        ``(path, parameter name)`` of all parameters which refer to
+        components of the flow, where path is the tuple of identifiers of
+        the subflow they belong to.
+    """
+    key = (config.get_cache_directory(), int(flow_id))
+    with _model_templates_lock:
+        entry = _model_templates.pop(key, None)
+        if entry is not None:
+            # Re-insert the entry to mark it as most recently used
+            _model_templates[key] = entry
+            return entry
+
+    flow = openml.flows.get_flow(flow_id)
+    template = openml.flows.flow_to_sklearn(flow)
+    structure = flow.get_structure('flow_id')
+    component_parameters = set()
+    for path in structure.values():
+        subflow = flow.get_subflow(path) if len(path) > 0 else flow
+        for name, value in subflow.parameters.items():
+            if _refers_to_component(value):
+                component_parameters.add((tuple(path), name))
+
+    entry = (template, structure, component_parameters)
+    with _model_templates_lock:
+        _model_templates[key] = entry
+        while len(_model_templates) > _MODEL_TEMPLATES_CACHE_SIZE:
+            _model_templates.popitem(last=False)
+    return entry
+
+
+def _refers_to_component(value):
+    """Whether a serialized parameter value contains a component
+    reference."""
+    if not isinstance(value, six.string_types):
+        return False
+    try:
+        value = json.loads(value)
+    except ValueError:
+        return False
+
+    stack = [value]
+    while len(stack) > 0:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if current.get('oml-python:serialized_object') == \
+                    'component_reference':
+                return True
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return False
+
+
 def _to_dict(flow_id, openml_parameter_settings):
     # for convenience, this function (ab)uses the run object.
     xml = OrderedDict()
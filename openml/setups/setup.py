@@ -1,3 +1,5 @@
+import hashlib
+
 
 class OpenMLSetup(object):
     """Setup object (a.k.a. Configuration).
@@ -24,6 +26,29 @@ class OpenMLSetup(object):
         self.setup_id = setup_id
         self.flow_id = flow_id
         self.parameters = parameters
+        self._fingerprint = None
+
+    def fingerprint(self):
+        """Hash of the flow and the parameter values of the setup.
+
+        Setups of the same flow with the same parameter values have the same
+        fingerprint, regardless of their setup ID. Setups can not change,
+        therefore the fingerprint is computed only once.
+
+        Returns
+        -------
+        str
+            Hexadecimal md5 hash.
+        """
+        if self._fingerprint is None:
+            parameters = sorted(
+                (parameter.flow_id, parameter.parameter_name, parameter.value)
+                for parameter in (self.parameters or {}).values()
+            )
+            self._fingerprint = hashlib.md5(
+                repr((self.flow_id, parameters)).encode('utf8')
+            ).hexdigest()
+        return self._fingerprint
 
 
 class OpenMLParameter(object):
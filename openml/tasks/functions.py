@@ -1,12 +1,9 @@
 from collections import OrderedDict
-import io
-import re
 import os
 
-from oslo_concurrency import lockutils
 import xmltodict
 
-from ..exceptions import OpenMLCacheException
+from ..exceptions import OpenMLCacheException, OpenMLCacheMissError
 from ..datasets import get_dataset
 from .task import (
     OpenMLClassificationTask,
@@ -30,17 +27,9 @@ def _get_cached_tasks():
     """
     tasks = OrderedDict()
 
-    task_cache_dir = openml.utils._create_cache_directory(TASKS_CACHE_DIR_NAME)
-    directory_content = os.listdir(task_cache_dir)
-    directory_content.sort()
-    # Find all dataset ids for which we have downloaded the dataset
-    # description
-
-    for filename in directory_content:
-        if not re.match(r"[0-9]*", filename):
-            continue
-
-        tid = int(filename)
+    # Find all task ids for which we have downloaded the task description
+    for tid in openml.utils._list_cached_ids(TASKS_CACHE_DIR_NAME,
+                                             ["task.xml"]):
         tasks[tid] = _get_cached_task(tid)
 
     return tasks
@@ -65,8 +54,9 @@ def _get_cached_task(tid):
     )
 
     try:
-        with io.open(os.path.join(tid_cache_dir, "task.xml"), encoding='utf8') as fh:
-            return _create_task_from_xml(fh.read())
+        return _create_task_from_dict(openml.utils._parse_cached_xml(
+            os.path.join(tid_cache_dir, "task.xml"),
+        ))
     except (OSError, IOError):
         openml.utils._remove_cache_dir_for_id(TASKS_CACHE_DIR_NAME, tid_cache_dir)
         raise OpenMLCacheException("Task file for tid %d not "
@@ -283,51 +273,84 @@ def get_task(task_id):
         The OpenML task id.
     """
     task_id = int(task_id)
-
-    with lockutils.external_lock(
-            name='task.functions.get_task:%d' % task_id,
-            lock_path=openml.utils._create_lockfiles_dir(),
-    ):
+    task = openml.utils._memory_cache_get(TASKS_CACHE_DIR_NAME, task_id)
+    if task is not None:
+        return task
+
+    # A fully cached task is read under a shared lock, so that many processes
+    # can load the same task at the same time
+    with openml.utils._cache_entity_lock(TASKS_CACHE_DIR_NAME, task_id,
+                                         shared=True):
+        task = _get_fully_cached_task(task_id)
+        if task is not None:
+            openml.utils._record_cache_access(TASKS_CACHE_DIR_NAME, hit=True)
+            _load_task_dataset_and_split(task)
+            openml.utils._memory_cache_put(TASKS_CACHE_DIR_NAME, task_id, task)
+            return task
+
+    with openml.utils._cache_entity_lock(TASKS_CACHE_DIR_NAME, task_id):
         tid_cache_dir = openml.utils._create_cache_directory_for_id(
             TASKS_CACHE_DIR_NAME, task_id,
         )
 
         try:
             task = _get_task_description(task_id)
-            dataset = get_dataset(task.dataset_id)
-            # Clustering tasks do not have class labels
-            # and do not offer download_split
-            if isinstance(task, OpenMLSupervisedTask):
-                task.download_split()
-                if isinstance(task, OpenMLClassificationTask):
-                    task.class_labels = \
-                        dataset.retrieve_class_labels(task.target_name)
+            _load_task_dataset_and_split(task)
         except Exception as e:
-            openml.utils._remove_cache_dir_for_id(
-                TASKS_CACHE_DIR_NAME,
-                tid_cache_dir,
-            )
+            # Keep what is cached for offline use
+            if not isinstance(e, OpenMLCacheMissError):
+                openml.utils._remove_cache_dir_for_id(
+                    TASKS_CACHE_DIR_NAME,
+                    tid_cache_dir,
+                )
             raise e
 
+    openml.utils._memory_cache_put(TASKS_CACHE_DIR_NAME, task_id, task)
     return task
 
 
+def _get_fully_cached_task(task_id):
+    """Return a task if its description and its split are cached, else None.
+    """
+    tid_cache_dir = openml.utils._create_cache_directory_for_id(
+        TASKS_CACHE_DIR_NAME, task_id,
+    )
+    task_file = os.path.join(tid_cache_dir, "task.xml")
+    if not os.path.exists(task_file):
+        return None
+    task = _create_task_from_dict(openml.utils._parse_cached_xml(task_file))
+    if isinstance(task, OpenMLSupervisedTask) and not os.path.exists(
+            os.path.join(tid_cache_dir, "datasplits.arff")):
+        return None
+    return task
+
+
+def _load_task_dataset_and_split(task):
+    dataset = get_dataset(task.dataset_id)
+    # Clustering tasks do not have class labels
+    # and do not offer download_split
+    if isinstance(task, OpenMLSupervisedTask):
+        task.download_split()
+        if isinstance(task, OpenMLClassificationTask):
+            task.class_labels = \
+                dataset.retrieve_class_labels(task.target_name)
+
+
 def _get_task_description(task_id):
 
     try:
-        return _get_cached_task(task_id)
+        task = _get_cached_task(task_id)
+        openml.utils._record_cache_access(TASKS_CACHE_DIR_NAME, hit=True)
+        return task
     except OpenMLCacheException:
-        xml_file = os.path.join(
-            openml.utils._create_cache_directory_for_id(
-                TASKS_CACHE_DIR_NAME,
-                task_id,
-            ),
-            "task.xml",
+        openml.utils._record_cache_access(TASKS_CACHE_DIR_NAME, hit=False)
+        tid_cache_dir = openml.utils._create_cache_directory_for_id(
+            TASKS_CACHE_DIR_NAME,
+            task_id,
         )
         task_xml = openml._api_calls._perform_api_call("task/%d" % task_id)
-
-        with io.open(xml_file, "w", encoding='utf8') as fh:
-            fh.write(task_xml)
+        openml.utils._write_cache_file(tid_cache_dir, "task.xml", task_xml)
+        openml.utils._evict_cache(keep=tid_cache_dir)
         return _create_task_from_xml(task_xml)
 
 
@@ -343,7 +366,22 @@ def _create_task_from_xml(xml):
     -------
     OpenMLTask
     """
-    dic = xmltodict.parse(xml)["oml:task"]
+    return _create_task_from_dict(xmltodict.parse(xml))
+
+
+def _create_task_from_dict(xml_dict):
+    """Create a task given a dictionary parsed from its xml representation.
+
+    Parameters
+    ----------
+    xml_dict : dict
+        Task xml representation, parsed by xmltodict.
+
+    Returns
+    -------
+    OpenMLTask
+    """
+    dic = xml_dict["oml:task"]
     estimation_parameters = dict()
     inputs = dict()
     # Due to the unordered structure we obtain, we first have to extract
@@ -3,9 +3,10 @@ import os
 import six
 
 import numpy as np
-import scipy.io.arff
 from six.moves import cPickle as pickle
 
+import openml.utils
+
 
 Split = namedtuple("Split", ["train", "test"])
 
@@ -82,6 +83,7 @@ class OpenMLSplit(object):
             # Faster than liac-arff and sufficient in this situation!
             if not os.path.exists(filename):
                 raise FileNotFoundError('Split arff %s does not exist!' % filename)
+            import scipy.io.arff
             splits, meta = scipy.io.arff.loadarff(filename)
             name = meta.name
 
@@ -123,9 +125,10 @@ class OpenMLSplit(object):
                             np.array(repetitions[repetition][fold][sample][0], dtype=np.int32),
                             np.array(repetitions[repetition][fold][sample][1], dtype=np.int32))
 
-            with open(pkl_filename, "wb") as fh:
+            with openml.utils._atomic_write(pkl_filename) as fh:
                 pickle.dump({"name": name, "repetitions": repetitions}, fh,
                             protocol=2)
+            openml.utils._register_cache_file(pkl_filename)
 
         return cls(name, '', repetitions)
 
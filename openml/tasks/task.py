@@ -4,6 +4,7 @@ import os
 from .. import datasets
 from .split import OpenMLSplit
 import openml._api_calls
+import openml.utils
 from ..utils import _create_cache_directory_for_id
 
 
@@ -30,6 +31,7 @@ class OpenMLTask(object):
         """
         data = {'task_id': self.task_id, 'tag': tag}
         openml._api_calls._perform_api_call("/task/tag", data=data)
+        openml.utils._memory_cache_invalidate('tasks', self.task_id)
 
     def remove_tag(self, tag):
         """Removes a tag from this task on the server.
@@ -41,6 +43,7 @@ class OpenMLTask(object):
         """
         data = {'task_id': self.task_id, 'tag': tag}
         openml._api_calls._perform_api_call("/task/untag", data=data)
+        openml.utils._memory_cache_invalidate('tasks', self.task_id)
 
 
 class OpenMLSupervisedTask(OpenMLTask):
@@ -96,9 +99,11 @@ class OpenMLSupervisedTask(OpenMLTask):
             split_url = self.estimation_procedure["data_splits_url"]
             split_arff = openml._api_calls._read_url(split_url)
 
-            with io.open(cache_file, "w", encoding='utf8') as fh:
-                fh.write(split_arff)
+            openml.utils._write_cache_file(os.path.dirname(cache_file),
+                                           os.path.basename(cache_file),
+                                           split_arff)
             del split_arff
+            openml.utils._evict_cache(keep=os.path.dirname(cache_file))
 
     def download_split(self):
         """Download the OpenML split for a given task.
@@ -110,7 +115,9 @@ class OpenMLSupervisedTask(OpenMLTask):
 
         try:
             split = OpenMLSplit._from_arff_file(cached_split_file)
+            openml.utils._record_cache_access('tasks', hit=True)
         except (OSError, IOError):
+            openml.utils._record_cache_access('tasks', hit=False)
             # Next, download and cache the associated split file
             self._download_split(cached_split_file)
             split = OpenMLSplit._from_arff_file(cached_split_file)
@@ -57,6 +57,7 @@ class TestBase(unittest.TestCase):
         openml.config.avoid_duplicate_runs = False
 
         openml.config.cache_directory = self.workdir
+        openml.utils.clear_memory_cache()
 
         # If we're on travis, we save the api key in the config file to allow
         # the notebook tests to read them.
@@ -68,6 +69,11 @@ class TestBase(unittest.TestCase):
         # Increase the number of retries to avoid spurios server failures
         self.connection_n_retries = openml.config.connection_n_retries
         openml.config.connection_n_retries = 10
+        # but wait only briefly between them, so that failing tests fail fast
+        self.retry_backoff = openml.config.retry_backoff
+        self.retry_max_backoff = openml.config.retry_max_backoff
+        openml.config.retry_backoff = 0.01
+        openml.config.retry_max_backoff = 0.1
 
     def tearDown(self):
         os.chdir(self.cwd)
@@ -81,6 +87,8 @@ class TestBase(unittest.TestCase):
                 raise
         openml.config.server = self.production_server
         openml.config.connection_n_retries = self.connection_n_retries
+        openml.config.retry_backoff = self.retry_backoff
+        openml.config.retry_max_backoff = self.retry_max_backoff
 
     def _get_sentinel(self, sentinel=None):
         if sentinel is None:
@@ -117,4 +125,38 @@ class TestBase(unittest.TestCase):
                                           'deactivated'])
 
 
-__all__ = ['TestBase']
+def evaluations_xml(evaluations, function='predictive_accuracy',
+                    per_fold=False):
+    """XML of an evaluation listing as returned by the server, to mock it.
+
+    Parameters
+    ----------
+    evaluations : iterable
+        ``(run_id, value)`` tuples, the other fields of all evaluations are
+        the same.
+    function : str
+    per_fold : bool
+        Whether the values are the values per fold in JSON format.
+
+    Returns
+    -------
+    str
+    """
+    tag = 'values' if per_fold else 'value'
+    return (
+        '<oml:evaluations xmlns:oml="http://openml.org/openml">%s'
+        '</oml:evaluations>' % ''.join(
+            '<oml:evaluation><oml:run_id>%d</oml:run_id>'
+            '<oml:task_id>1</oml:task_id><oml:setup_id>2</oml:setup_id>'
+            '<oml:flow_id>3</oml:flow_id><oml:flow_name>flow</oml:flow_name>'
+            '<oml:data_id>4</oml:data_id><oml:data_name>data</oml:data_name>'
+            '<oml:function>%s</oml:function>'
+            '<oml:upload_time>2018-01-01 00:00:00</oml:upload_time>'
+            '<oml:%s>%s</oml:%s></oml:evaluation>'
+            % (run_id, function, tag, value, tag)
+            for run_id, value in evaluations
+        )
+    )
+
+
+__all__ = ['TestBase', 'evaluations_xml']
@@ -1,10 +1,68 @@
+from collections import Counter, OrderedDict
+import contextlib
+import copy
+import hashlib
+import io
+import itertools
 import os
+import sqlite3
+import sys
+import tempfile
+import threading
 import xmltodict
 import six
+from six.moves import cPickle as pickle
 import shutil
 
+from oslo_concurrency import lockutils
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, shared locks are not supported there
+    fcntl = None
+
 import openml._api_calls
 from . import config
+from . import metrics
+
+
+# Cache subdirectories which contain one directory per entity ID, mapped to
+# the name of the external lock which guards such an entity directory
+_CACHE_ENTITY_LOCK_NAMES = OrderedDict([
+    ('datasets', 'datasets.functions.get_dataset:%d'),
+    ('tasks', 'task.functions.get_task:%d'),
+    ('flows', 'flows.functions.get_flow:%d'),
+    ('runs', 'runs.functions.get_run:%d'),
+    ('setups', 'setups.functions.get_setup:%d'),
+])
+
+# Name of the SQLite database in the cache directory which records the files
+# stored in the entity directories
+_CACHE_MANIFEST_FILENAME = 'manifest.sqlite'
+
+# Number of cache hits and misses per cache subdirectory in this process
+_cache_hits = Counter()
+_cache_misses = Counter()
+
+# Locks on entity directories used by threads of this process, mapping
+# (lock directory, lock name) -> _EntityLock
+_entity_locks = {}
+_entity_locks_lock = threading.Lock()
+
+# Objects returned by get_dataset, get_task etc., mapping
+# (server, key, id) -> (object, estimated size) in least recently used order
+_memory_cache = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+# Map from the entity types of the OpenML API to the keys of the caches
+_ENTITY_TYPE_TO_CACHE_KEY = {
+    'data': 'datasets',
+    'task': 'tasks',
+    'flow': 'flows',
+    'setup': 'setups',
+    'run': 'runs',
+}
 
 
 def extract_xml_tags(xml_tag_name, node, allow_none=True):
@@ -83,6 +141,8 @@ def _tag_entity(entity_type, entity_id, tag, untag=False):
 
     post_variables = {'%s_id'%entity_type: entity_id, 'tag': tag}
     result_xml = openml._api_calls._perform_api_call(uri, post_variables)
+    _memory_cache_invalidate(_ENTITY_TYPE_TO_CACHE_KEY[entity_type],
+                             entity_id)
 
     result = xmltodict.parse(result_xml, force_list={'oml:tag'})[main_tag]
 
@@ -115,58 +175,152 @@ def _list_all(listing_call, *args, **filters):
     dict
     """
 
-    # eliminate filters that have a None value
-    active_filters = {key: value for key, value in filters.items() if value is not None}
-    page = 0
-    result = {}
-
-    # default batch size per paging. This one can be set in filters (batch_size),
-    # but should not be changed afterwards. the derived batch_size can be changed.
-    BATCH_SIZE_ORIG = 10000
-    if 'batch_size' in active_filters:
-        BATCH_SIZE_ORIG = active_filters['batch_size']
-        del active_filters['batch_size']
-
-    # max number of results to be shown
-    LIMIT = None
-    offset = 0
-    if 'size' in active_filters:
-        LIMIT = active_filters['size']
-        del active_filters['size']
-    # check if the batch size is greater than the number of results that need to be returned.
-    if LIMIT is not None:
-        if BATCH_SIZE_ORIG > LIMIT:
-            BATCH_SIZE_ORIG = min(LIMIT, BATCH_SIZE_ORIG)
-    if 'offset' in active_filters:
-        offset = active_filters['offset']
-        del active_filters['offset']
-    batch_size = BATCH_SIZE_ORIG
-    while True:
+    pager = _ListingPager(filters)
+    while not pager.done:
         try:
-            current_offset = offset + BATCH_SIZE_ORIG * page
-            new_batch = listing_call(
-                *args,
-                limit=batch_size,
-                offset=current_offset,
-                **active_filters
-            )
+            new_batch = listing_call(*args, **pager.page_filters())
         except openml.exceptions.OpenMLServerNoResult:
             # we want to return an empty dict in this case
             break
-        result.update(new_batch)
-        if len(new_batch) < batch_size:
-            break
-        page += 1
-        if LIMIT is not None:
+        pager.add_page(new_batch)
+    return pager.result
+
+
+def _list_all_pages(listing_call, add_page, *args, **filters):
+    """Helper to handle paged listing requests whose pages are processed as
+    they arrive instead of being collected in one dict.
+
+    Parameters
+    ----------
+    listing_call : callable
+        Call listing one page.
+    add_page : callable
+        Called with every page returned by ``listing_call``, returns the IDs
+        of the entities on the page.
+    *args : Variable length argument list
+        Any required arguments for the listing call.
+    **filters : Arbitrary keyword arguments
+        Any filters that can be applied to the listing function, see
+        :func:`_list_all`.
+    """
+    def list_page(*page_args, **page_filters):
+        page = listing_call(*page_args, **page_filters)
+        # The pager only needs the IDs of the page
+        return dict.fromkeys(add_page(page))
+
+    _list_all(list_page, *args, **filters)
+
+
+def _list_all_in_chunks(listing_call, chunk_size, chunked_filters, *args,
+                        **filters):
+    """Helper to handle listing requests which filter on many IDs.
+
+    The lists of IDs of the ``chunked_filters`` are split into chunks of at
+    most ``chunk_size`` IDs, which keeps the URLs of the listing requests
+    short, and :func:`_list_all` is called for every combination of chunks.
+
+    Parameters
+    ----------
+    listing_call : callable
+        Call listing, e.g. list_evaluations.
+    chunk_size : int
+    chunked_filters : dict
+        Filters mapped to the list of IDs they filter on.
+    *args : Variable length argument list
+        Any required arguments for the listing call.
+    **filters : Arbitrary keyword arguments
+        Any other filters that can be applied to the listing function, see
+        :func:`_list_all`.
+
+    Returns
+    -------
+    dict
+    """
+    names = sorted(chunked_filters)
+    chunks = []
+    for name in names:
+        ids = list(chunked_filters[name])
+        chunks.append([ids[i:i + chunk_size]
+                       for i in range(0, len(ids), chunk_size)])
+    result = OrderedDict()
+    for filter_chunks in itertools.product(*chunks):
+        filters.update(zip(names, filter_chunks))
+        result.update(_list_all(listing_call, *args, **filters))
+    return result
+
+
+class _ListingPager(object):
+    """Keeps track of the pages requested by a paged listing request.
+
+    Used by :func:`_list_all` and its asynchronous counterpart.
+
+    Parameters
+    ----------
+    filters : dict
+        Filters of the listing request, including the paging parameters
+        ``size``, ``offset`` and ``batch_size``.
+    """
+
+    def __init__(self, filters):
+        # eliminate filters that have a None value
+        self.active_filters = {key: value for key, value in filters.items()
+                               if value is not None}
+        self.page = 0
+        self.result = {}
+        self.done = False
+
+        # default batch size per paging. This one can be set in filters (batch_size),
+        # but should not be changed afterwards. the derived batch_size can be changed.
+        self.batch_size_orig = 10000
+        if 'batch_size' in self.active_filters:
+            self.batch_size_orig = self.active_filters.pop('batch_size')
+
+        # max number of results to be shown
+        self.limit = None
+        self.offset = 0
+        if 'size' in self.active_filters:
+            self.limit = self.active_filters.pop('size')
+        # check if the batch size is greater than the number of results that need to be returned.
+        if self.limit is not None:
+            if self.batch_size_orig > self.limit:
+                self.batch_size_orig = min(self.limit, self.batch_size_orig)
+        if 'offset' in self.active_filters:
+            self.offset = self.active_filters.pop('offset')
+        self.batch_size = self.batch_size_orig
+
+    def page_filters(self):
+        """Filters for requesting the next page.
+
+        Returns
+        -------
+        dict
+        """
+        page_filters = dict(self.active_filters)
+        page_filters['limit'] = self.batch_size
+        page_filters['offset'] = self.offset + self.batch_size_orig * self.page
+        return page_filters
+
+    def add_page(self, new_batch):
+        """Add the result of a page and check whether more pages are needed.
+
+        Parameters
+        ----------
+        new_batch : dict
+        """
+        self.result.update(new_batch)
+        if len(new_batch) < self.batch_size:
+            self.done = True
+            return
+        self.page += 1
+        if self.limit is not None:
             # check if the number of required results has been achieved
             # always do a 'bigger than' check, in case of bugs to prevent infinite loops
-            if len(result) >= LIMIT:
-                break
+            if len(self.result) >= self.limit:
+                self.done = True
+                return
             # check if there are enough results to fulfill a batch
-            if BATCH_SIZE_ORIG > LIMIT - len(result):
-                batch_size = LIMIT - len(result)
-
-    return result
+            if self.batch_size_orig > self.limit - len(self.result):
+                self.batch_size = self.limit - len(self.result)
 
 
 def _create_cache_directory(key):
@@ -174,7 +328,8 @@ def _create_cache_directory(key):
     cache_dir = os.path.join(cache, key)
     try:
         os.makedirs(cache_dir)
-    except:
+    except (OSError, IOError):
+        # The directory already exists or was created by another process
         pass
     return cache_dir
 
@@ -187,7 +342,7 @@ def _create_cache_directory_for_id(key, id_):
     is a directory for each task witch the task ID being the directory
     name. This function creates this cache directory.
 
-    This function is NOT thread/multiprocessing safe.
+    Creating the directory also marks the entity as recently used.
 
     Parameters
     ----------
@@ -203,19 +358,28 @@ def _create_cache_directory_for_id(key, id_):
     cache_dir = os.path.join(
         _create_cache_directory(key), str(id_)
     )
-    if os.path.exists(cache_dir) and os.path.isdir(cache_dir):
-        pass
-    elif os.path.exists(cache_dir) and not os.path.isdir(cache_dir):
-        raise ValueError('%s cache dir exists but is not a directory!' % key)
-    else:
+    try:
         os.makedirs(cache_dir)
+    except (OSError, IOError):
+        # The directory already exists or was created by another process
+        if not os.path.isdir(cache_dir):
+            raise ValueError('%s cache dir exists but is not a directory!'
+                             % key)
+    # The modification time of the directory serves as the time of last
+    # access for the least recently used eviction in _evict_cache. It cannot
+    # be updated on a read-only cache, which is still fine for reading.
+    try:
+        os.utime(cache_dir, None)
+    except OSError:
+        pass
     return cache_dir
 
 
 def _remove_cache_dir_for_id(key, cache_dir):
     """Remove the task cache directory
 
-    This function is NOT thread/multiprocessing safe.
+    The caller must hold the exclusive lock on the entity, see
+    :func:`_cache_entity_lock`.
 
     Parameters
     ----------
@@ -226,14 +390,802 @@ def _remove_cache_dir_for_id(key, cache_dir):
     try:
         shutil.rmtree(cache_dir)
     except (OSError, IOError):
-        raise ValueError('Cannot remove faulty %s cache directory %s.'
-                         'Please do this manually!' % (key, cache_dir))
+        if os.path.exists(cache_dir):
+            raise ValueError('Cannot remove faulty %s cache directory %s.'
+                             'Please do this manually!' % (key, cache_dir))
+    try:
+        id_ = int(os.path.basename(cache_dir))
+    except ValueError:
+        return
+    _memory_cache_invalidate(key, id_)
+    with _cache_manifest_transaction() as manifest:
+        if manifest is not None:
+            manifest.execute('DELETE FROM files WHERE key = ? AND id = ?',
+                             (key, id_))
 
 
 def _create_lockfiles_dir():
     dir = os.path.join(config.get_cache_directory(), 'locks')
     try:
         os.makedirs(dir)
-    except:
+    except (OSError, IOError):
+        # The directory already exists or was created by another process
         pass
     return dir
+
+
+class _EntityLock(object):
+    """Reader/writer lock of an entity directory shared by the threads of
+    this process.
+
+    File locks belong to the whole process, so two threads of a process would
+    both obtain the exclusive file lock, and a thread releasing its shared
+    file lock would release it for all threads. Therefore the file lock is
+    acquired by the first thread which holds the entity lock and released by
+    the last one, while the threads synchronize among themselves with this
+    lock.
+
+    Parameters
+    ----------
+    lock_path : str
+        Directory of the lock files.
+
+    lock_name : str
+    """
+
+    def __init__(self, lock_path, lock_name):
+        self.lock_path = lock_path
+        self.lock_name = lock_name
+        self.condition = threading.Condition(threading.Lock())
+        self.n_readers = 0
+        self.writer = False
+        # Number of threads which use or wait for this lock, see
+        # _get_entity_lock
+        self.n_users = 0
+        self._file_lock = None
+        self._file_handle = None
+
+    def acquire(self, shared=False, blocking=True):
+        """Acquire the lock.
+
+        Parameters
+        ----------
+        shared : bool
+            Whether to acquire a shared instead of the exclusive lock.
+
+        blocking : bool
+            Whether to wait for the lock.
+
+        Returns
+        -------
+        bool
+            Whether the lock was acquired.
+        """
+        with self.condition:
+            while self.writer or (not shared and self.n_readers > 0):
+                if not blocking:
+                    return False
+                self.condition.wait()
+            # The file lock is acquired while holding the condition, so that
+            # no other thread of this process assumes that it is held before
+            if not (shared and self.n_readers > 0):
+                if not self._acquire_file_lock(shared, blocking):
+                    return False
+            if shared:
+                self.n_readers += 1
+            else:
+                self.writer = True
+            return True
+
+    def release(self):
+        """Release the lock held by the calling thread."""
+        with self.condition:
+            if self.writer:
+                self.writer = False
+            else:
+                self.n_readers -= 1
+            if self.n_readers == 0:
+                self._release_file_lock()
+            self.condition.notify_all()
+
+    def _acquire_file_lock(self, shared, blocking):
+        if shared and fcntl is not None:
+            # Uses the same lock file as lockutils.external_lock, whose
+            # exclusive lock is also an fcntl lock
+            fh = open(os.path.join(self.lock_path, self.lock_name), 'a+')
+            try:
+                fcntl.lockf(fh, fcntl.LOCK_SH if blocking
+                            else fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except (OSError, IOError):
+                fh.close()
+                if blocking:
+                    raise
+                return False
+            self._file_handle = fh
+        else:
+            lock = lockutils.external_lock(name=self.lock_name,
+                                           lock_path=self.lock_path)
+            if not lock.acquire(blocking=blocking):
+                return False
+            self._file_lock = lock
+        return True
+
+    def _release_file_lock(self):
+        if self._file_handle is not None:
+            try:
+                fcntl.lockf(self._file_handle, fcntl.LOCK_UN)
+            finally:
+                self._file_handle.close()
+                self._file_handle = None
+        if self._file_lock is not None:
+            self._file_lock.release()
+            self._file_lock = None
+
+
+@contextlib.contextmanager
+def _get_entity_lock(key, id_):
+    """Get the lock of an entity directory, creating it if no thread of this
+    process uses it. It is dropped once no thread uses it anymore.
+
+    Yields
+    ------
+    _EntityLock
+    """
+    lock_path = _create_lockfiles_dir()
+    lock_name = _CACHE_ENTITY_LOCK_NAMES[key] % id_
+    with _entity_locks_lock:
+        lock = _entity_locks.get((lock_path, lock_name))
+        if lock is None:
+            lock = _EntityLock(lock_path, lock_name)
+            _entity_locks[(lock_path, lock_name)] = lock
+        lock.n_users += 1
+    try:
+        yield lock
+    finally:
+        with _entity_locks_lock:
+            lock.n_users -= 1
+            if lock.n_users == 0:
+                del _entity_locks[(lock_path, lock_name)]
+
+
+@contextlib.contextmanager
+def _cache_entity_lock(key, id_, shared=False):
+    """Lock an entity directory in the cache across threads and processes.
+
+    Reading an entity from the cache requires a shared lock, which can be held
+    by many threads and processes at the same time. Downloading files into
+    the entity directory or removing it requires the exclusive lock. On
+    platforms without ``fcntl``, processes always acquire the exclusive lock,
+    but threads of a process still share it.
+
+    Parameters
+    ----------
+    key : str
+        Cache subdirectory, must have a lock name in
+        ``_CACHE_ENTITY_LOCK_NAMES``.
+
+    id_ : int
+
+    shared : bool
+        Whether to acquire a shared instead of the exclusive lock.
+    """
+    with _get_entity_lock(key, id_) as lock:
+        lock.acquire(shared=shared)
+        try:
+            yield
+        finally:
+            lock.release()
+
+
+@contextlib.contextmanager
+def _atomic_write(path):
+    """Open a file for writing which atomically replaces ``path`` once
+    writing succeeded.
+
+    The content is written to a temporary file in the same directory, which is
+    renamed to ``path`` afterwards. Readers therefore either see the old or
+    the complete new file, but never a partially written one.
+
+    Parameters
+    ----------
+    path : str
+
+    Yields
+    ------
+    file
+        File opened for writing in binary mode.
+    """
+    directory, filename = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix='.%s.' % filename, suffix='.tmp',
+    )
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            yield fh
+        _replace_file(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except (OSError, IOError):
+            pass
+        raise
+
+
+def _replace_file(src, dst):
+    if six.PY2:
+        # os.replace does not exist in Python 2, and os.rename cannot
+        # overwrite files on Windows
+        if os.name == 'nt' and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+    else:
+        os.replace(src, dst)
+
+
+def _write_cache_file(cache_dir, filename, content):
+    """Write a string to a file in an entity cache directory.
+
+    The file is replaced atomically and recorded in the cache manifest
+    together with its size and its md5 checksum.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Entity cache directory as returned by
+        :func:`_create_cache_directory_for_id`.
+
+    filename : str
+
+    content : str
+        Content of the file. Will be encoded as utf8.
+
+    Returns
+    -------
+    str
+        Path of the written file.
+    """
+    path = os.path.join(cache_dir, filename)
+    content = content.encode('utf8')
+    with _atomic_write(path) as fh:
+        fh.write(content)
+    _register_cache_file(path, hashlib.md5(content).hexdigest())
+    return path
+
+
+def _parse_cached_xml(path, force_list=None):
+    """Parse an XML file stored in an entity cache directory.
+
+    The parsed content is stored in a pickle file next to the XML file (e.g.
+    ``features.pkl.py3`` for ``features.xml``). Subsequent calls load it from
+    there instead of parsing the XML again, as long as the modification time
+    and the size of the XML file are unchanged.
+
+    Parameters
+    ----------
+    path : str
+        Path to the XML file.
+
+    force_list : iterable, optional
+        Passed to ``xmltodict.parse``.
+
+    Returns
+    -------
+    OrderedDict
+        Parsed XML file.
+
+    Raises
+    ------
+    OSError, IOError
+        If the XML file does not exist.
+    """
+    stat = os.stat(path)
+    xml_signature = (stat.st_mtime, stat.st_size)
+    if six.PY2:
+        sidecar_path = os.path.splitext(path)[0] + '.pkl.py2'
+    else:
+        sidecar_path = os.path.splitext(path)[0] + '.pkl.py3'
+    parse_key = tuple(sorted(force_list)) if force_list else None
+
+    try:
+        with open(sidecar_path, 'rb') as fh:
+            sidecar = pickle.load(fh)
+    except Exception:
+        # The sidecar file is missing or corrupted
+        sidecar = None
+    if sidecar is None or sidecar.get('xml') != xml_signature:
+        sidecar = {'xml': xml_signature, 'parsed': {}}
+    elif parse_key in sidecar['parsed']:
+        return sidecar['parsed'][parse_key]
+
+    with io.open(path, encoding='utf8') as fh:
+        parsed = xmltodict.parse(fh.read(), force_list=force_list)
+    sidecar['parsed'][parse_key] = parsed
+    with _atomic_write(sidecar_path) as fh:
+        pickle.dump(sidecar, fh, -1)
+    _register_cache_file(sidecar_path)
+    return parsed
+
+
+def _register_cache_file(path, md5_checksum=None):
+    """Record a file of an entity cache directory in the cache manifest.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file. Files which are not located directly in an entity
+        cache directory are ignored.
+
+    md5_checksum : str, optional
+        md5 checksum of the file. Is computed from the file if not given.
+    """
+    entity_dir, filename = os.path.split(os.path.abspath(path))
+    key_dir, id_ = os.path.split(entity_dir)
+    cache, key = os.path.split(key_dir)
+    if cache != os.path.abspath(config.get_cache_directory()) \
+            or key not in _CACHE_ENTITY_LOCK_NAMES:
+        return
+    try:
+        id_ = int(id_)
+    except ValueError:
+        return
+    if md5_checksum is None:
+        md5_checksum = _md5_of_file(path)
+    size = os.path.getsize(path)
+    with _cache_manifest_transaction(create=True) as manifest:
+        manifest.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)',
+                         (key, id_, filename, size, md5_checksum))
+
+
+def _md5_of_file(path):
+    md5 = hashlib.md5()
+    with io.open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(2 ** 20), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+@contextlib.contextmanager
+def _cache_manifest_transaction(create=False, read_only=False):
+    """Open the cache manifest and run a transaction on it.
+
+    The cache manifest is a SQLite database in the cache directory with a
+    single table ``files``, which has one row (key, id, name, size, md5) per
+    file stored in an entity cache directory. It allows listing and validating
+    the cache without scanning the cache directory. When the manifest is
+    created, the files already stored in the cache directory are imported.
+
+    Parameters
+    ----------
+    create : bool
+        Whether to create the manifest if it does not exist yet.
+
+    read_only : bool
+        Whether the transaction only reads. Read-only transactions do not
+        take the write lock, so that they can run concurrently. Cannot be
+        combined with ``create``.
+
+    Yields
+    ------
+    sqlite3.Connection or None
+        None if the manifest does not exist and ``create`` is False.
+    """
+    if create and read_only:
+        raise ValueError('Creating the cache manifest requires writing')
+    path = os.path.join(config.get_cache_directory(), _CACHE_MANIFEST_FILENAME)
+    if not create and not os.path.exists(path):
+        yield None
+        return
+    _create_cache_directory('')
+
+    connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+    try:
+        if read_only:
+            connection.execute('BEGIN')
+        else:
+            # Acquire the write lock right away to serialize concurrent
+            # writers
+            connection.execute('BEGIN IMMEDIATE')
+        try:
+            _initialize_cache_manifest(connection, create)
+            yield connection
+        except _ManifestNotInitialized:
+            # Another process is just about to create the manifest
+            connection.execute('ROLLBACK')
+            yield None
+            return
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+    finally:
+        connection.close()
+
+
+class _ManifestNotInitialized(Exception):
+    pass
+
+
+def _initialize_cache_manifest(connection, create):
+    if _manifest_has_table(connection, 'files'):
+        return
+    if not create:
+        raise _ManifestNotInitialized()
+    connection.execute(
+        'CREATE TABLE files (key TEXT, id INTEGER, name TEXT, size INTEGER, '
+        'md5 TEXT, PRIMARY KEY (key, id, name))'
+    )
+    connection.executemany('INSERT INTO files VALUES (?, ?, ?, ?, NULL)',
+                           _scan_cache_files())
+
+
+def _manifest_has_table(manifest, name):
+    """Check whether a table exists in the cache manifest without creating
+    it, which would require the write lock."""
+    return manifest.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (name, ),
+    ).fetchone() is not None
+
+
+def _scan_cache_files():
+    """Find all files in entity cache directories by scanning the cache.
+
+    Yields
+    ------
+    tuple
+        (key, id, name, size) for every file.
+    """
+    cache = config.get_cache_directory()
+    for key in _CACHE_ENTITY_LOCK_NAMES:
+        key_dir = os.path.join(cache, key)
+        if not os.path.isdir(key_dir):
+            continue
+        for directory_name in os.listdir(key_dir):
+            try:
+                id_ = int(directory_name)
+            except ValueError:
+                continue
+            entity_dir = os.path.join(key_dir, directory_name)
+            if not os.path.isdir(entity_dir):
+                continue
+            for filename in os.listdir(entity_dir):
+                if filename.startswith('.'):
+                    # Temporary file of _atomic_write
+                    continue
+                path = os.path.join(entity_dir, filename)
+                try:
+                    if os.path.isfile(path):
+                        yield key, id_, filename, os.path.getsize(path)
+                except (OSError, IOError):
+                    # The file was removed in the meantime
+                    pass
+
+
+def _list_cached_ids(key, filenames):
+    """List the IDs of all entities for which all given files are cached.
+
+    Parameters
+    ----------
+    key : str
+        Cache subdirectory, e.g. ``datasets``.
+
+    filenames : list
+        Names of the files which must be present in an entity directory.
+
+    Returns
+    -------
+    list
+        Sorted list of entity IDs.
+
+    Notes
+    -----
+    Files which are recorded in the manifest but were removed from the cache
+    directory without the manifest being updated are removed from the
+    manifest, and their entities are not listed.
+    """
+    with _cache_manifest_transaction(read_only=True) as manifest:
+        if manifest is not None:
+            rows = manifest.execute(
+                'SELECT id FROM files WHERE key = ? AND name IN (%s) '
+                'GROUP BY id HAVING COUNT(name) = ? ORDER BY id'
+                % ', '.join('?' * len(filenames)),
+                [key] + list(filenames) + [len(filenames)],
+            ).fetchall()
+    if manifest is not None:
+        key_dir = os.path.join(config.get_cache_directory(), key)
+        ids = []
+        missing = []
+        for id_, in rows:
+            entity_missing = [
+                (key, id_, filename) for filename in filenames
+                if not os.path.isfile(os.path.join(key_dir, str(id_),
+                                                   filename))
+            ]
+            if entity_missing:
+                missing.extend(entity_missing)
+            else:
+                ids.append(id_)
+        if missing:
+            with _cache_manifest_transaction() as manifest:
+                if manifest is not None:
+                    manifest.executemany(
+                        'DELETE FROM files WHERE key = ? AND id = ? AND '
+                        'name = ?', missing,
+                    )
+        return ids
+
+    # There is no manifest yet, fall back to scanning the cache directory
+    files = {}
+    for key_, id_, filename, _ in _scan_cache_files():
+        if key_ == key:
+            files.setdefault(id_, set()).add(filename)
+    return sorted(id_ for id_ in files if files[id_].issuperset(filenames))
+
+
+def validate_cache(verify_checksums=False):
+    """Check the files recorded in the cache manifest.
+
+    Only the metadata of the files is read, unless checksums are verified.
+
+    Parameters
+    ----------
+    verify_checksums : bool
+        Whether to also recompute the md5 checksum of each file and compare it
+        to the checksum recorded when the file was written.
+
+    Returns
+    -------
+    list
+        Tuples (path, problem) for every file which is missing, has a
+        different size or a different checksum than recorded.
+    """
+    with _cache_manifest_transaction(read_only=True) as manifest:
+        if manifest is None:
+            return []
+        rows = manifest.execute(
+            'SELECT key, id, name, size, md5 FROM files ORDER BY key, id, name'
+        ).fetchall()
+
+    cache = config.get_cache_directory()
+    problems = []
+    for key, id_, filename, size, md5_checksum in rows:
+        path = os.path.join(cache, key, str(id_), filename)
+        if not os.path.isfile(path):
+            problems.append((path, 'missing'))
+        elif os.path.getsize(path) != size:
+            problems.append((path, 'size'))
+        elif verify_checksums and md5_checksum is not None \
+                and _md5_of_file(path) != md5_checksum:
+            problems.append((path, 'checksum'))
+    return problems
+
+
+def _record_cache_access(key, hit):
+    """Count a cache hit or miss for the cache subdirectory ``key``.
+
+    Parameters
+    ----------
+    key : str
+        Cache subdirectory, e.g. ``datasets``.
+
+    hit : bool
+        Whether the requested file was found in the cache.
+    """
+    if hit:
+        _cache_hits[key] += 1
+    else:
+        _cache_misses[key] += 1
+    metrics._emit('cache_access', key=key, layer='disk', hit=hit)
+
+
+def _list_cache_entries():
+    """List all entity directories in the cache.
+
+    Sizes are taken from the cache manifest if it exists.
+
+    Returns
+    -------
+    list
+        List of tuples ``(last_access, size, key, id_, path)``, where
+        ``last_access`` is the modification time of the entity directory and
+        ``size`` the size of all files in it in bytes.
+    """
+    with _cache_manifest_transaction(read_only=True) as manifest:
+        if manifest is not None:
+            sizes = manifest.execute(
+                'SELECT key, id, SUM(size) FROM files GROUP BY key, id'
+            ).fetchall()
+        else:
+            sizes = Counter()
+            for key, id_, _, size in _scan_cache_files():
+                sizes[(key, id_)] += size
+            sizes = [(key, id_, size) for (key, id_), size in sizes.items()]
+
+    cache = config.get_cache_directory()
+    entries = []
+    for key, id_, size in sizes:
+        path = os.path.join(cache, key, str(id_))
+        try:
+            entries.append((os.path.getmtime(path), size, key, id_, path))
+        except (OSError, IOError):
+            # The entity was removed in the meantime
+            pass
+    return entries
+
+
+def _evict_cache(max_size=None, keep=None):
+    """Remove the least recently used entities until the cache is small enough.
+
+    Entities whose lock is currently held, for example because this or another
+    process downloads or reads them, are skipped.
+
+    Parameters
+    ----------
+    max_size : int, optional
+        Maximum size of the cache in bytes. Defaults to
+        ``openml.config.cache_size_limit``. Nothing is removed if both are
+        None.
+
+    keep : str, optional
+        Path to an entity directory which must not be removed, usually the one
+        which was just filled by the caller.
+
+    Returns
+    -------
+    list
+        Paths of the removed entity directories.
+    """
+    if max_size is None:
+        max_size = config.cache_size_limit
+    if max_size is None:
+        return []
+
+    entries = sorted(_list_cache_entries())
+    total_size = sum(entry[1] for entry in entries)
+    removed = []
+    for _, size, key, id_, path in entries:
+        if total_size <= max_size:
+            break
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+
+        with _get_entity_lock(key, id_) as lock:
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                _remove_cache_dir_for_id(key, path)
+            finally:
+                lock.release()
+        total_size -= size
+        removed.append(path)
+    return removed
+
+
+def cache_stats():
+    """Get statistics about the cache directory of the current server.
+
+    Sizes and the number of entities are computed from the content of the
+    cache directory, while hits and misses are counted for this process only.
+
+    Returns
+    -------
+    dict
+        Mapping from entity type (``datasets``, ``tasks``, ``flows``,
+        ``runs``, ``setups``) to a dict with the keys ``n_entities``, ``size`` (in
+        bytes), ``hits``, ``misses`` and ``hit_ratio``. The ``hit_ratio`` is
+        None if the cache was not accessed yet.
+    """
+    stats = OrderedDict()
+    for key in _CACHE_ENTITY_LOCK_NAMES:
+        hits = _cache_hits[key]
+        misses = _cache_misses[key]
+        stats[key] = {
+            'n_entities': 0,
+            'size': 0,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / float(hits + misses) if hits + misses else None,
+        }
+    for _, size, key, _, _ in _list_cache_entries():
+        stats[key]['n_entities'] += 1
+        stats[key]['size'] += size
+    return stats
+
+
+def _memory_cache_get(key, id_):
+    """Get an object from the in-memory cache.
+
+    Parameters
+    ----------
+    key : str
+        Type of the object, e.g. ``datasets``.
+
+    id_ : int
+        OpenML ID of the object.
+
+    Returns
+    -------
+    object or None
+        A copy of the cached object, None if it is not cached or the
+        in-memory cache is disabled.
+    """
+    if not config.memory_cache_entries:
+        return None
+    cache_key = (config.server, key, int(id_))
+    with _memory_cache_lock:
+        entry = _memory_cache.pop(cache_key, None)
+        if entry is not None:
+            # Re-insert the entry to mark it as most recently used
+            _memory_cache[cache_key] = entry
+    metrics._emit('cache_access', key=key, layer='memory',
+                  hit=entry is not None)
+    # Callers may modify the returned object
+    return None if entry is None else copy.deepcopy(entry[0])
+
+
+def _memory_cache_put(key, id_, obj):
+    """Store an object in the in-memory cache.
+
+    The least recently used objects are dropped once more than
+    ``config.memory_cache_entries`` objects are stored or their estimated
+    size exceeds ``config.memory_cache_size_limit``. A copy of the object is
+    stored, so that modifying the object does not modify the cached one.
+
+    Parameters
+    ----------
+    key : str
+        Type of the object, e.g. ``datasets``.
+
+    id_ : int
+        OpenML ID of the object.
+
+    obj : object
+    """
+    if not config.memory_cache_entries:
+        return
+    size_limit = config.memory_cache_size_limit
+    # The size is only estimated if it is limited
+    size = 0
+    if size_limit is not None:
+        try:
+            size = len(pickle.dumps(obj, -1))
+        except Exception:
+            size = sys.getsizeof(obj)
+        if size > size_limit:
+            return
+    obj = copy.deepcopy(obj)
+
+    cache_key = (config.server, key, int(id_))
+    with _memory_cache_lock:
+        _memory_cache.pop(cache_key, None)
+        _memory_cache[cache_key] = (obj, size)
+        total_size = sum(entry[1] for entry in _memory_cache.values())
+        while len(_memory_cache) > config.memory_cache_entries or \
+                (size_limit is not None and total_size > size_limit):
+            _, (_, dropped_size) = _memory_cache.popitem(last=False)
+            total_size -= dropped_size
+
+
+def _memory_cache_invalidate(key, id_):
+    """Remove an object from the in-memory cache, e.g. after modifying it on
+    the server.
+
+    Parameters
+    ----------
+    key : str
+        Type of the object, e.g. ``datasets``.
+
+    id_ : int
+        OpenML ID of the object.
+    """
+    with _memory_cache_lock:
+        for cache_key in list(_memory_cache):
+            if cache_key[1:] == (key, int(id_)):
+                del _memory_cache[cache_key]
+
+
+def clear_memory_cache():
+    """Remove all datasets, tasks, flows, runs and setups from the in-memory
+    cache."""
+    with _memory_cache_lock:
+        _memory_cache.clear()
@@ -52,6 +52,9 @@ setuptools.setup(name="openml",
                          'nbconvert',
                          'jupyter_client',
                          'matplotlib'
+                     ],
+                     'async': [
+                         'aiohttp'
                      ]
                  },
                  test_suite="pytest",
@@ -132,6 +132,17 @@ class TestOpenMLDataset(TestBase):
                                 openml.datasets.functions._get_cached_dataset_arff,
                                 3)
 
+    @unittest.skipIf(os.name == 'nt', 'Shared locks are not supported')
+    @mock.patch('openml._api_calls._perform_api_call')
+    @mock.patch('openml.utils.lockutils.external_lock')
+    def test_get_dataset_cached_uses_shared_lock(self, lock_mock, api_mock):
+        openml.config.cache_directory = self.static_cache_dir
+        dataset = openml.datasets.get_dataset(2)
+        self.assertEqual(dataset.dataset_id, 2)
+        self.assertEqual(api_mock.call_count, 0)
+        # The exclusive lock is only needed to download files
+        self.assertEqual(lock_mock.call_count, 0)
+
     def _check_dataset(self, dataset):
             self.assertEqual(type(dataset), dict)
             self.assertGreaterEqual(len(dataset), 2)
@@ -1,6 +1,16 @@
+import re
+import sys
+
+import numpy as np
+
 import openml
 import openml.evaluations
-from openml.testing import TestBase
+from openml.testing import TestBase, evaluations_xml
+
+if sys.version_info[0] >= 3:
+    from unittest import mock
+else:
+    import mock
 
 
 class TestEvaluationFunctions(TestBase):
@@ -112,3 +122,132 @@ class TestEvaluationFunctions(TestBase):
         for run_id in evaluations.keys():
             self.assertIsNotNone(evaluations[run_id].value)
             self.assertIsNone(evaluations[run_id].values)
+
+    @mock.patch('openml._api_calls._perform_api_call')
+    def test_evaluation_store(self, api_call_mock):
+        server_run_ids = list(range(1, 151))
+
+        def perform_api_call(call):
+            self.assertTrue(
+                call.startswith('evaluation/list/function/predictive_accuracy'),
+                call)
+            self.assertTrue(call.endswith('/task/1'), call)
+            offset = int(re.search('/offset/([0-9]+)', call).group(1))
+            limit = int(re.search('/limit/([0-9]+)', call).group(1))
+            run_ids = server_run_ids[offset:offset + limit]
+            if len(run_ids) == 0:
+                raise openml.exceptions.OpenMLServerNoResult('No results')
+            return evaluations_xml((run_id, '0.%d' % run_id)
+                                   for run_id in run_ids)
+        api_call_mock.side_effect = perform_api_call
+
+        def list_evaluations():
+            return openml.evaluations.list_evaluations('predictive_accuracy',
+                                                       task=[1])
+
+        openml.config.evaluation_store = True
+        try:
+            evaluations = list_evaluations()
+            self.assertEqual(sorted(evaluations), server_run_ids)
+            self.assertIn('/offset/0', api_call_mock.call_args[0][0])
+
+            # Only the end of the listing is downloaded again
+            server_run_ids.extend([160, 170])
+            evaluations = list_evaluations()
+            self.assertEqual(sorted(evaluations), server_run_ids)
+            self.assertIn('/offset/50', api_call_mock.call_args[0][0])
+            self.assertEqual(evaluations[170].value, 0.17)
+            self.assertEqual(evaluations[170].data_id, '4')
+            self.assertIsNone(evaluations[170].values)
+
+            # Deleting more evaluations than the overlap downloads the
+            # listing again
+            del server_run_ids[:110]
+            n_calls = api_call_mock.call_count
+            evaluations = list_evaluations()
+            self.assertEqual(sorted(evaluations), server_run_ids)
+            self.assertEqual(api_call_mock.call_count, n_calls + 2)
+            self.assertIn('/offset/0', api_call_mock.call_args[0][0])
+
+            openml.config.offline = True
+            n_calls = api_call_mock.call_count
+            self.assertEqual(sorted(list_evaluations()), server_run_ids)
+            self.assertEqual(api_call_mock.call_count, n_calls)
+        finally:
+            openml.config.evaluation_store = False
+            openml.config.offline = False
+
+    @mock.patch('openml._api_calls._perform_api_call')
+    def test_list_evaluations_of_functions(self, api_call_mock):
+        run_ids = {'predictive_accuracy': [1, 2, 3],
+                   'area_under_roc_curve': [2, 3, 4]}
+
+        def perform_api_call(call):
+            function = re.search('function/([a-z_]+)', call).group(1)
+            self.assertIn('/task/1', call)
+            return evaluations_xml(((run_id, '0.%d' % run_id)
+                                    for run_id in run_ids[function]),
+                                   function=function)
+        api_call_mock.side_effect = perform_api_call
+
+        evaluations = openml.evaluations.list_evaluations(
+            functions=['predictive_accuracy', 'area_under_roc_curve'],
+            task=[1])
+        self.assertEqual(api_call_mock.call_count, 2)
+        self.assertEqual(list(evaluations.index), [1, 2, 3, 4])
+        self.assertEqual(list(evaluations.columns)[-2:],
+                         ['predictive_accuracy', 'area_under_roc_curve'])
+        self.assertEqual(list(evaluations['flow_id']), [3, 3, 3, 3])
+        self.assertEqual(list(evaluations['predictive_accuracy'][:3]),
+                         [0.1, 0.2, 0.3])
+        self.assertTrue(evaluations['predictive_accuracy'].isnull()[4])
+        self.assertEqual(evaluations['area_under_roc_curve'].dtype.kind, 'f')
+
+        self.assertRaises(ValueError, openml.evaluations.list_evaluations)
+        self.assertRaises(ValueError, openml.evaluations.list_evaluations,
+                          'predictive_accuracy',
+                          functions=['predictive_accuracy'])
+
+    @mock.patch('openml._api_calls._perform_api_call')
+    def test_list_evaluations_fold_values_array(self, api_call_mock):
+        fold_values = {5: '[[0.5,0.6,0.7],[0.8,0.9,1]]',
+                       3: '[[0.1,0.2,0.3],[0.4,0.5,0.6]]',
+                       4: '[[0.1,0.2],[0.3]]'}
+        xml_string = evaluations_xml(fold_values.items(), per_fold=True)
+        api_call_mock.return_value = xml_string
+
+        run_ids, values = openml.evaluations.list_evaluations(
+            'predictive_accuracy', task=[1], per_fold=True,
+            output_format='array')
+        self.assertIn('/per_fold/true', api_call_mock.call_args[0][0])
+        np.testing.assert_array_equal(run_ids, [3, 4, 5])
+        self.assertEqual(values.shape, (3, 2, 3))
+        evaluations = openml.evaluations.functions._parse_evaluations_list(
+            xml_string)
+        np.testing.assert_array_almost_equal(values[0],
+                                             evaluations[3].values)
+        np.testing.assert_array_almost_equal(values[2],
+                                             evaluations[5].values)
+        np.testing.assert_array_almost_equal(
+            values[1], [[0.1, 0.2, np.nan], [0.3, np.nan, np.nan]])
+
+        # Whitespace anywhere in the values does not change their shape
+        run_ids, values = \
+            openml.evaluations.functions._fold_values_to_array(
+                [1, 2], ['[[0.1, 0.2],\n\t[0.3]]', '[ 0.4 ,\t0.5 ]'])
+        np.testing.assert_array_equal(run_ids, [1, 2])
+        np.testing.assert_array_almost_equal(
+            values, [[[0.1, 0.2], [0.3, np.nan]],
+                     [[0.4, 0.5], [np.nan, np.nan]]])
+        for malformed in ('[[0.1,error],[0.3]]', '[[[1,2],[3,4]]]',
+                          '[[1,2],[3,[4]]]', '[[1,2],,[3]]'):
+            self.assertRaises(
+                ValueError,
+                openml.evaluations.functions._fold_values_to_array,
+                [1], [malformed])
+
+        self.assertRaises(ValueError, openml.evaluations.list_evaluations,
+                          'predictive_accuracy', output_format='array')
+        self.assertRaises(ValueError, openml.evaluations.list_evaluations,
+                          'predictive_accuracy', per_fold=True,
+                          output_format='dataframe')
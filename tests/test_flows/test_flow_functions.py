@@ -1,8 +1,18 @@
 from collections import OrderedDict
 import copy
+import os
+import sys
 import unittest
 
+if sys.version_info[0] >= 3:
+    from unittest import mock
+else:
+    import mock
+
 import six
+import sklearn.pipeline
+import sklearn.preprocessing
+from sklearn.tree import DecisionTreeClassifier
 
 import openml
 from openml.testing import TestBase
@@ -58,6 +68,37 @@ class TestFlowFunctions(TestBase):
             for did in flows:
                 self._check_flow(flows[did])
 
+    def test_flow_fingerprint(self):
+        flow = openml.flows.sklearn_to_flow(sklearn.pipeline.Pipeline(steps=[
+            ('scaler', sklearn.preprocessing.StandardScaler()),
+            ('tree', DecisionTreeClassifier()),
+        ]))
+        # Fields set by the server are ignored
+        server_flow = copy.deepcopy(flow)
+        server_flow.flow_id = 10
+        server_flow.components['tree'].upload_date = '2018-01-01T00:00:00'
+        self.assertEqual(flow.fingerprint(), server_flow.fingerprint())
+
+        other_flow = copy.deepcopy(flow)
+        other_flow.components['tree'].parameters['max_depth'] = '3'
+        self.assertNotEqual(flow.fingerprint(), other_flow.fingerprint())
+        self.assertEqual(flow.fingerprint(ignore_parameter_values=True),
+                         other_flow.fingerprint(ignore_parameter_values=True))
+        self.assertRaises(ValueError, openml.flows.functions.assert_flows_equal,
+                          flow, other_flow)
+
+        # Changes to a flow with an ID or to its copy are not hidden
+        server_flow.fingerprint()
+        copied_flow = copy.copy(server_flow)
+        copied_flow.parameters = dict(server_flow.parameters,
+                                      memory='"cache"')
+        self.assertRaises(ValueError, openml.flows.functions.assert_flows_equal,
+                          copied_flow, flow)
+        server_flow.parameters['memory'] = '"cache"'
+        self.assertNotEqual(server_flow.fingerprint(), flow.fingerprint())
+        self.assertRaises(ValueError, openml.flows.functions.assert_flows_equal,
+                          server_flow, flow)
+
     def test_are_flows_equal(self):
         flow = openml.flows.OpenMLFlow(name='Test',
                                        description='Test flow',
@@ -207,3 +248,56 @@ class TestFlowFunctions(TestBase):
                           ignore_parameter_values_on_older_children='2017-01-31T12-01-01')
         openml.flows.functions.assert_flows_equal(flow, flow,
                                                   ignore_parameter_values_on_older_children=None)
+
+    @mock.patch('openml._api_calls._perform_api_call')
+    def test_get_flow_cached(self, api_call_mock):
+        flow = openml.flows.sklearn_to_flow(DecisionTreeClassifier())
+        flow.flow_id = 10
+        api_call_mock.return_value = flow._to_xml()
+
+        downloaded_flow = openml.flows.get_flow(10)
+        self.assertEqual(api_call_mock.call_count, 1)
+        self.assertTrue(os.path.exists(os.path.join(
+            self.workdir, 'org', 'openml', 'test', 'flows', '10', 'flow.xml',
+        )))
+        # The second call is answered from the cache
+        cached_flow = openml.flows.get_flow(10)
+        self.assertEqual(api_call_mock.call_count, 1)
+        self.assertEqual(cached_flow.flow_id, 10)
+        openml.flows.functions.assert_flows_equal(cached_flow, downloaded_flow)
+
+    @mock.patch('openml._api_calls._perform_api_call')
+    def test_flow_exists_cached(self, api_call_mock):
+        api_call_mock.return_value = (
+            '<oml:flow_exists xmlns:oml="http://openml.org/openml">'
+            '<oml:exists>true</oml:exists><oml:id>5</oml:id>'
+            '</oml:flow_exists>'
+        )
+        self.assertEqual(openml.flows.flow_exists('flow', 'v1'), 5)
+        self.assertEqual(openml.flows.flow_exists('flow', 'v1'), 5)
+        self.assertEqual(api_call_mock.call_count, 1)
+        # The index is stored in the cache directory
+        openml.flows.functions._flow_ids.clear()
+        self.assertEqual(openml.flows.flow_exists('flow', 'v1'), 5)
+        self.assertEqual(api_call_mock.call_count, 1)
+
+        # Flows which do not exist are looked up every time
+        api_call_mock.return_value = (
+            '<oml:flow_exists xmlns:oml="http://openml.org/openml">'
+            '<oml:exists>false</oml:exists><oml:id>-1</oml:id>'
+            '</oml:flow_exists>'
+        )
+        self.assertFalse(openml.flows.flow_exists('flow', 'v2'))
+        self.assertFalse(openml.flows.flow_exists('flow', 'v2'))
+        self.assertEqual(api_call_mock.call_count, 3)
+
+    @mock.patch('openml._api_calls._perform_api_call')
+    def test_get_flow_fills_flow_id_index(self, api_call_mock):
+        flow = openml.flows.sklearn_to_flow(DecisionTreeClassifier())
+        flow.flow_id = 10
+        api_call_mock.return_value = flow._to_xml()
+        openml.flows.get_flow(10)
+
+        self.assertEqual(
+            openml.flows.flow_exists(flow.name, flow.external_version), 10)
+        self.assertEqual(api_call_mock.call_count, 1)
@@ -37,7 +37,7 @@ from openml.testing import TestBase
 from openml.flows import OpenMLFlow, sklearn_to_flow, flow_to_sklearn
 from openml.flows.functions import assert_flows_equal
 from openml.flows.sklearn_converter import _format_external_version, \
-    _check_dependencies, _check_n_jobs
+    _check_dependencies, _check_n_jobs, _get_parameters
 from openml.exceptions import PyOpenMLError
 
 this_directory = os.path.dirname(os.path.abspath(__file__))
@@ -843,6 +843,30 @@ class TestSklearn(TestBase):
                   "to serialize Pipeline"
         self.assertRaisesRegexp(ValueError, fixture, sklearn_to_flow, pipeline2)
 
+        # A duplicate within a submodel is found when checking the main model
+        bagging = sklearn.ensemble.BaggingClassifier(base_estimator=pipeline)
+        fixture = "Found a second occurence of component .*.PCA when trying " \
+                  "to serialize BaggingClassifier"
+        self.assertRaisesRegexp(ValueError, fixture, sklearn_to_flow, bagging)
+
+    def test_get_parameters(self):
+        models = [
+            sklearn.tree.DecisionTreeClassifier(max_depth=3),
+            sklearn.pipeline.Pipeline([('scaler',
+                                        sklearn.preprocessing.StandardScaler()),
+                                       ('dummy',
+                                        sklearn.dummy.DummyClassifier())]),
+            sklearn.model_selection.GridSearchCV(
+                sklearn.tree.DecisionTreeClassifier(), {'max_depth': [1, 2]}),
+        ]
+        for model in models:
+            # The second call uses the cached parameter names
+            for _ in range(2):
+                self.assertEqual(_get_parameters(model),
+                                 model.get_params(deep=False))
+        models[0].set_params(max_depth=5)
+        self.assertEqual(_get_parameters(models[0])['max_depth'], 5)
+
     def test_subflow_version_propagated(self):
         this_directory = os.path.dirname(os.path.abspath(__file__))
         tests_directory = os.path.abspath(os.path.join(this_directory,
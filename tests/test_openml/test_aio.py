@@ -0,0 +1,150 @@
+import hashlib
+import io
+import os
+import sys
+import threading
+import unittest
+
+if sys.version_info[0] >= 3:
+    from unittest import mock
+else:
+    import mock
+
+from openml.testing import TestBase, evaluations_xml
+import openml
+
+try:
+    import asyncio
+    import openml.aio
+except (ImportError, SyntaxError):
+    aio_available = False
+else:
+    aio_available = True
+
+
+def _result(value):
+    """Mock side effect returning an awaitable with the given result."""
+    future = asyncio.get_event_loop().create_future()
+    future.set_result(value)
+    return future
+
+
+@unittest.skipIf(not aio_available, 'Requires Python 3.5 and aiohttp')
+class TestAsyncClient(TestBase):
+    # These tests don't rely on the server
+
+    def _run(self, coroutine):
+        return asyncio.get_event_loop().run_until_complete(coroutine)
+
+    def _read_fixture(self, *path):
+        path = os.path.join(self.static_cache_dir, 'org', 'openml', 'test',
+                            *path)
+        with io.open(path, encoding='utf8') as fh:
+            return fh.read()
+
+    @mock.patch('openml.aio._read_url_async')
+    @mock.patch('openml.aio._perform_api_call_async')
+    def test_get_dataset_async(self, api_call_mock, read_url_mock):
+        arff = self._read_fixture('datasets', '2', 'dataset.arff')
+        description = self._read_fixture('datasets', '2', 'description.xml')
+        description = description.replace(
+            '4eaed8b6ec9d8211024b6c089b064761',
+            hashlib.md5(arff.encode('utf-8')).hexdigest(),
+        )
+        responses = {
+            'data/2': description,
+            'data/features/2': self._read_fixture('datasets', '2',
+                                                  'features.xml'),
+            'data/qualities/2': self._read_fixture('datasets', '2',
+                                                   'qualities.xml'),
+        }
+        api_call_mock.side_effect = lambda call: _result(responses[call])
+        read_url_mock.side_effect = lambda url: _result(arff)
+
+        dataset = self._run(openml.aio.get_dataset_async(2))
+        self.assertEqual(dataset.name, 'anneal')
+        self.assertEqual(sorted(call[0][0] for call
+                                in api_call_mock.call_args_list),
+                         sorted(responses))
+        self.assertEqual(read_url_mock.call_count, 1)
+
+        # The files are stored in the same layout as by get_dataset
+        did_cache_dir = os.path.join(openml.config.get_cache_directory(),
+                                     'datasets', '2')
+        for filename in openml.datasets.functions.DATASET_CACHE_FILENAMES:
+            self.assertTrue(os.path.exists(os.path.join(did_cache_dir,
+                                                        filename)))
+
+        # And are read from the cache afterwards
+        api_call_mock.reset_mock()
+        read_url_mock.reset_mock()
+        dataset = self._run(openml.aio.get_dataset_async(2))
+        self.assertEqual(dataset.name, 'anneal')
+        self.assertEqual(api_call_mock.call_count, 0)
+        self.assertEqual(read_url_mock.call_count, 0)
+
+    @mock.patch('openml.aio.get_dataset')
+    @mock.patch('openml.aio._missing_files')
+    def test_get_dataset_async_loads_in_executor(self, missing_files_mock,
+                                                 get_dataset_mock):
+        # Loading a cached dataset does not block the event loop
+        missing_files_mock.return_value = []
+        get_dataset_mock.side_effect = \
+            lambda dataset_id: threading.current_thread()
+        thread = self._run(openml.aio.get_dataset_async(2))
+        self.assertIsNot(thread, threading.current_thread())
+        get_dataset_mock.assert_called_once_with(2)
+
+    @mock.patch('openml.aio.get_run')
+    @mock.patch('openml.aio._perform_api_call_async')
+    def test_get_run_async(self, api_call_mock, get_run_mock):
+        # As get_run, only the run description is downloaded, also for runs
+        # without predictions
+        api_call_mock.return_value = _result(
+            '<oml:run xmlns:oml="http://openml.org/openml"></oml:run>')
+        get_run_mock.return_value = 'run'
+        self.assertEqual(self._run(openml.aio.get_run_async(999999)), 'run')
+        api_call_mock.assert_called_once_with('run/999999')
+        get_run_mock.assert_called_once_with(999999)
+
+    @mock.patch('openml.aio._perform_api_call_async')
+    def test_get_dataset_async_private(self, api_call_mock):
+        api_call_mock.side_effect = openml.exceptions.OpenMLServerException(
+            'Unknown dataset', code=112,
+        )
+        self.assertRaises(openml.exceptions.PrivateDatasetError, self._run,
+                          openml.aio.get_dataset_async(2))
+
+    @mock.patch('openml.aio._perform_api_call_async')
+    def test_list_evaluations_async(self, api_call_mock):
+        pages = [
+            evaluations_xml([(1, 0.5), (2, 0.5)]),
+            evaluations_xml([(3, 0.5)]),
+        ]
+        api_call_mock.side_effect = [_result(page) for page in pages]
+
+        # list_evaluations_async does not expose the batch size
+        evaluations = self._run(openml.aio._list_all_async(
+            openml.aio._list_evaluations_async, 'predictive_accuracy',
+            size=3, batch_size=2, task=[1],
+        ))
+        self.assertEqual(sorted(evaluations), [1, 2, 3])
+        self.assertEqual(evaluations[3].value, 0.5)
+        calls = [call[0][0] for call in api_call_mock.call_args_list]
+        self.assertEqual(len(calls), 2)
+        for call in calls:
+            self.assertTrue(call.startswith(
+                'evaluation/list/function/predictive_accuracy'))
+            self.assertIn('/task/1', call)
+        self.assertIn('/limit/2', calls[0])
+        self.assertIn('/offset/0', calls[0])
+        self.assertIn('/limit/1', calls[1])
+        self.assertIn('/offset/2', calls[1])
+
+        api_call_mock.side_effect = [_result(pages[1])]
+        evaluations = self._run(openml.aio.list_evaluations_async(
+            'predictive_accuracy', per_fold=False,
+        ))
+        self.assertEqual(list(evaluations), [3])
+        self.assertIn('/per_fold/false',
+                      api_call_mock.call_args_list[-1][0][0])
@@ -0,0 +1,200 @@
+import sys
+
+if sys.version_info[0] >= 3:
+    from unittest import mock
+else:
+    import mock
+
+import requests
+
+from openml.testing import TestBase
+import openml
+
+
+def _response(status_code, headers=None):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.headers = {} if headers is None else headers
+    return response
+
+
+@mock.patch('openml._api_calls.time.sleep')
+@mock.patch('openml._api_calls.requests.Session')
+class TestSendRequest(TestBase):
+    # These tests don't rely on the server
+
+    def setUp(self):
+        super(TestSendRequest, self).setUp()
+        # The backoff of the configuration, not the short one of the tests
+        openml.config.retry_backoff = 0.1
+        openml.config.retry_max_backoff = 10
+
+    def _session(self, session_mock):
+        return session_mock.return_value.__enter__.return_value
+
+    def test_retry_on_server_error(self, session_mock, sleep_mock):
+        session = self._session(session_mock)
+        session.get.side_effect = [_response(503), _response(500),
+                                   _response(200)]
+        response = openml._api_calls.send_request('get', 'url', {})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(session.get.call_count, 3)
+        # Exponential backoff with jitter
+        first, second = [call[0][0] for call in sleep_mock.call_args_list]
+        self.assertTrue(0.05 <= first <= 0.1)
+        self.assertTrue(0.1 <= second <= 0.2)
+
+    def test_retry_after(self, session_mock, sleep_mock):
+        session = self._session(session_mock)
+        session.get.side_effect = [_response(429, {'Retry-After': '3'}),
+                                   _response(200)]
+        openml._api_calls.send_request('get', 'url', {})
+        sleep_mock.assert_called_once_with(3.0)
+
+        # Long waits requested by the server are capped
+        session.get.side_effect = [_response(503, {'Retry-After': '3600'}),
+                                   _response(200)]
+        openml._api_calls.send_request('get', 'url', {})
+        self.assertEqual(sleep_mock.call_args[0][0],
+                         openml.config.retry_max_backoff)
+
+    def test_return_error_after_last_retry(self, session_mock, sleep_mock):
+        session = self._session(session_mock)
+        session.get.return_value = _response(503)
+        response = openml._api_calls.send_request('get', 'url', {})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(session.get.call_count, 10)
+
+    def test_no_retry_for_uploads(self, session_mock, sleep_mock):
+        session = self._session(session_mock)
+        session.post.return_value = _response(503)
+        response = openml._api_calls.send_request(
+            'post', 'url', {}, files={'description': 'xml'},
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(session.post.call_count, 1)
+
+    def test_no_retry_for_post_requests(self, session_mock, sleep_mock):
+        session = self._session(session_mock)
+        session.post.return_value = _response(503)
+        server = openml.config.server
+        response = openml._api_calls.send_request(
+            'post', server + '/data/tag', {'data_id': 1, 'tag': 'study'},
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(session.post.call_count, 1)
+
+        # Post requests which only read are retried
+        session.post.side_effect = [_response(503), _response(200)]
+        response = openml._api_calls.send_request(
+            'post', server + '/flow/exists', {'name': 'flow'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(session.post.call_count, 3)
+
+    def test_retry_on_connection_error(self, session_mock, sleep_mock):
+        session = self._session(session_mock)
+        session.get.side_effect = requests.exceptions.ConnectionError()
+        self.assertRaises(requests.exceptions.ConnectionError,
+                          openml._api_calls.send_request, 'get', 'url', {})
+        self.assertEqual(session.get.call_count, 10)
+        # The backoff is capped
+        delays = [call[0][0] for call in sleep_mock.call_args_list]
+        self.assertTrue(max(delays) <= openml.config.retry_max_backoff)
+
+    def test_rate_limit(self, session_mock, sleep_mock):
+        bucket = openml._api_calls._TokenBucket()
+        with mock.patch('openml._api_calls.time.time') as time_mock:
+            time_mock.return_value = 100.
+            # One second worth of requests can be sent at once
+            for _ in range(2):
+                bucket.acquire(2)
+            self.assertEqual(sleep_mock.call_count, 0)
+            bucket.acquire(2)
+            sleep_mock.assert_called_once_with(0.5)
+            bucket.acquire(2)
+            sleep_mock.assert_called_with(1.0)
+            time_mock.return_value = 110.
+            bucket.acquire(2)
+            self.assertEqual(sleep_mock.call_count, 2)
+
+    def test_metrics_event(self, session_mock, sleep_mock):
+        session = self._session(session_mock)
+        ok = _response(200)
+        ok.content = b'<oml:data/>'
+        ok.request.body = None
+        session.get.side_effect = [_response(503), ok]
+        events = []
+        openml.metrics.add_listener(events.append)
+        try:
+            openml._api_calls._perform_api_call('data/features/2')
+        finally:
+            openml.metrics.remove_listener(events.append)
+        self.assertEqual(len(events), 1)
+        event = events[0]
+        self.assertEqual(event['type'], 'api_call')
+        self.assertEqual(event['endpoint'], 'data/features')
+        self.assertEqual(event['method'], 'get')
+        self.assertEqual(event['status_code'], 200)
+        self.assertEqual(event['retries'], 1)
+        self.assertEqual(event['bytes_sent'], 0)
+        self.assertEqual(event['bytes_received'], 11)
+        self.assertIsNone(event['error'])
+        self.assertGreaterEqual(event['duration'], 0)
+
+    def test_metrics_event_on_error(self, session_mock, sleep_mock):
+        session = self._session(session_mock)
+        session.post.side_effect = requests.exceptions.ConnectionError()
+        events = []
+        openml.metrics.add_listener(events.append)
+        try:
+            self.assertRaises(requests.exceptions.ConnectionError,
+                              openml._api_calls.send_request, 'post',
+                              'https://www.openml.org/data/download/1', {})
+        finally:
+            openml.metrics.remove_listener(events.append)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['endpoint'], 'download')
+        self.assertEqual(events[0]['retries'], 9)
+        self.assertIsNone(events[0]['status_code'])
+        self.assertEqual(events[0]['error'], 'ConnectionError')
+
+    def test_parse_retry_after(self, session_mock, sleep_mock):
+        parse = openml._api_calls._parse_retry_after
+        self.assertEqual(parse('120'), 120.)
+        self.assertEqual(parse('Wed, 21 Oct 2015 07:28:00 GMT'), 0.)
+        self.assertIsNone(parse('soon'))
+
+
+@mock.patch('openml._api_calls.requests.Session')
+class TestOffline(TestBase):
+    # These tests don't rely on the server
+
+    def setUp(self):
+        super(TestOffline, self).setUp()
+        openml.config.cache_directory = self.static_cache_dir
+        openml.config.offline = True
+
+    def tearDown(self):
+        openml.config.offline = False
+        super(TestOffline, self).tearDown()
+
+    def test_getters_use_cache(self, session_mock):
+        dataset = openml.datasets.get_dataset(2)
+        self.assertEqual(dataset.name, 'anneal')
+        # The cached descriptions are those of run 100 and setup 100
+        run = openml.runs.get_run(1)
+        self.assertEqual(run.run_id, 100)
+        setup = openml.setups.get_setup(1)
+        self.assertEqual(setup.setup_id, 100)
+        self.assertEqual(session_mock.call_count, 0)
+
+    def test_cache_miss(self, session_mock):
+        self.assertRaisesRegexp(openml.exceptions.OpenMLCacheMissError,
+                                'Offline mode: .*/data/3 is not cached',
+                                openml.datasets.get_dataset, 3)
+        self.assertRaises(openml.exceptions.OpenMLCacheMissError,
+                          openml.datasets.list_datasets)
+        self.assertRaises(openml.exceptions.OpenMLCacheMissError,
+                          openml._api_calls._read_url, 'url')
+        self.assertEqual(session_mock.call_count, 0)
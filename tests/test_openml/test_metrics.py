@@ -0,0 +1,111 @@
+import json
+
+from openml.testing import TestBase
+import openml
+
+
+def _api_call(endpoint='data', method='get', status_code=200, **fields):
+    event = {
+        'type': 'api_call', 'method': method, 'url': 'url',
+        'endpoint': endpoint, 'status_code': status_code, 'duration': 0.5,
+        'retries': 0, 'bytes_sent': 0, 'bytes_received': 100, 'error': None,
+    }
+    event.update(fields)
+    return event
+
+
+class TestMetrics(TestBase):
+    # These tests don't rely on the server
+
+    def test_endpoint(self):
+        server = openml.config.server
+        self.assertEqual(openml.metrics._endpoint(server + '/data/2'), 'data')
+        self.assertEqual(
+            openml.metrics._endpoint(server + '/data/features/2'),
+            'data/features',
+        )
+        self.assertEqual(
+            openml.metrics._endpoint(server + '/evaluation/list/function/'
+                                              'predictive_accuracy/limit/10'),
+            'evaluation/list',
+        )
+        self.assertEqual(openml.metrics._endpoint(server + '//setup/1'),
+                         'setup')
+        self.assertEqual(
+            openml.metrics._endpoint('https://www.openml.org/data/download/1'),
+            'download',
+        )
+
+    def test_aggregator(self):
+        aggregator = openml.metrics.MetricsAggregator()
+        aggregator(_api_call())
+        aggregator(_api_call(retries=2, status_code=412))
+        aggregator(_api_call(endpoint='download', status_code=None,
+                             error='ConnectionError', bytes_received=0))
+        aggregator({'type': 'cache_access', 'key': 'datasets',
+                    'layer': 'disk', 'hit': True})
+        aggregator({'type': 'cache_access', 'key': 'datasets',
+                    'layer': 'disk', 'hit': False})
+        aggregator({'type': 'unknown'})
+
+        metrics = json.loads(aggregator.to_json())
+        self.assertEqual(metrics['cache'], [{'key': 'datasets',
+                                             'layer': 'disk', 'hits': 1,
+                                             'misses': 1}])
+        data, download = metrics['api_calls']
+        self.assertEqual(data['endpoint'], 'data')
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['retries'], 2)
+        self.assertEqual(data['errors'], 0)
+        self.assertEqual(data['bytes_received'], 200)
+        self.assertEqual(data['duration'], 1.0)
+        self.assertEqual(data['status_codes'], {'200': 1, '412': 1})
+        self.assertEqual(download['errors'], 1)
+        self.assertEqual(download['status_codes'], {'none': 1})
+
+        prometheus = aggregator.to_prometheus().splitlines()
+        self.assertIn('# TYPE openml_api_requests_total counter', prometheus)
+        self.assertIn('openml_api_requests_total{endpoint="data",'
+                      'method="get",status="412"} 1', prometheus)
+        self.assertIn('openml_api_request_duration_seconds_sum{'
+                      'endpoint="data",method="get"} 1.0', prometheus)
+        self.assertIn('openml_api_request_duration_seconds_count{'
+                      'endpoint="data",method="get"} 2', prometheus)
+        self.assertIn('openml_cache_accesses_total{key="datasets",'
+                      'layer="disk",outcome="miss"} 1', prometheus)
+
+        aggregator.reset()
+        self.assertEqual(aggregator.to_dict(),
+                         {'api_calls': [], 'cache': []})
+
+    def test_cache_events(self):
+        aggregator = openml.metrics.MetricsAggregator()
+        openml.metrics.add_listener(aggregator)
+        openml.config.memory_cache_entries = 10
+        try:
+            openml.utils._memory_cache_get('tasks', 1)
+            openml.utils._memory_cache_put('tasks', 1, 'task')
+            openml.utils._memory_cache_get('tasks', 1)
+            openml.utils._record_cache_access('tasks', hit=False)
+        finally:
+            openml.config.memory_cache_entries = 0
+            openml.metrics.remove_listener(aggregator)
+        self.assertEqual(aggregator.to_dict()['cache'], [
+            {'key': 'tasks', 'layer': 'disk', 'hits': 0, 'misses': 1},
+            {'key': 'tasks', 'layer': 'memory', 'hits': 1, 'misses': 1},
+        ])
+
+    def test_failing_listener(self):
+        def listener(event):
+            raise ValueError()
+        events = []
+        openml.metrics.add_listener(listener)
+        openml.metrics.add_listener(events.append)
+        try:
+            openml.metrics._emit('cache_access', key='runs', layer='disk',
+                                 hit=True)
+        finally:
+            openml.metrics.remove_listener(listener)
+            openml.metrics.remove_listener(events.append)
+        self.assertEqual(events, [{'type': 'cache_access', 'key': 'runs',
+                                   'layer': 'disk', 'hit': True}])
@@ -1,4 +1,8 @@
+import json
+import os
+import subprocess
 import sys
+import time
 
 if sys.version_info[0] >= 3:
     from unittest import mock
@@ -11,30 +15,95 @@ from openml.testing import TestBase
 import openml
 
 
+# Importing openml may take at most this many times as long as importing the
+# dependencies which are always needed. Generous, because wall clock times
+# vary on a busy machine; importing scikit-learn would still exceed it.
+IMPORT_TIME_FACTOR = 3
+
+_IMPORT_SCRIPT = '''
+import json, sys, time
+start = time.time()
+import numpy, requests, xmltodict, arff
+from oslo_concurrency import lockutils
+baseline = time.time() - start
+start = time.time()
+import openml
+duration = time.time() - start
+print(json.dumps({'baseline': baseline, 'duration': duration,
+                  'modules': sorted(sys.modules)}))
+'''
+
+
 class TestInit(TestBase):
     # Splitting not helpful, these test's don't rely on the server and take less
     # than 1 seconds
 
+    @mock.patch('openml.setups.functions.get_setup')
+    @mock.patch('openml.tasks.functions._get_task_description')
     @mock.patch('openml.tasks.functions.get_task')
     @mock.patch('openml.datasets.functions.get_dataset')
     @mock.patch('openml.flows.functions.get_flow')
     @mock.patch('openml.runs.functions.get_run')
-    def test_populate_cache(self, run_mock, flow_mock, dataset_mock, task_mock):
-        openml.populate_cache(task_ids=[1, 2], dataset_ids=[3, 4],
-                              flow_ids=[5, 6], run_ids=[7, 8])
-        self.assertEqual(run_mock.call_count, 2)
-        for argument, fixture in six.moves.zip(run_mock.call_args_list, [(7,), (8,)]):
-            self.assertEqual(argument[0], fixture)
+    def test_populate_cache(self, run_mock, flow_mock, dataset_mock,
+                            task_mock, task_description_mock, setup_mock):
+        def get_run(run_id):
+            return mock.Mock(task_id=run_id - 6, flow_id=5, setup_id=run_id)
+        run_mock.side_effect = get_run
+        # Both tasks are on dataset 3
+        task_description_mock.return_value = mock.Mock(dataset_id=3)
+        dataset_mock.side_effect = lambda dataset_id: time.sleep(0.1)
+
+        summary = openml.populate_cache(task_ids=[1, 2], dataset_ids=[3, 4],
+                                        flow_ids=[5, 6], run_ids=[7, 8])
 
+        def called_ids(function_mock):
+            return sorted(call[0][0] for call in function_mock.call_args_list)
+
+        # Every entity and its dependencies are downloaded exactly once
+        self.assertEqual(called_ids(run_mock), [7, 8])
+        self.assertEqual(called_ids(task_description_mock), [1, 2])
+        self.assertEqual(called_ids(task_mock), [1, 2])
+        self.assertEqual(called_ids(dataset_mock), [3, 4])
+        self.assertEqual(called_ids(flow_mock), [5, 6])
+        self.assertEqual(called_ids(setup_mock), [7, 8])
+        self.assertEqual(
+            {key: value for key, value in summary.items()
+             if key not in ('duration', 'bytes_received')},
+            {'datasets': 2, 'tasks': 2, 'flows': 2, 'runs': 2, 'setups': 2,
+             'errors': []},
+        )
+
+    @mock.patch('openml.flows.functions.get_flow')
+    @mock.patch('openml.runs.functions.get_run')
+    def test_populate_cache_error(self, run_mock, flow_mock):
+        run_mock.side_effect = openml.exceptions.OpenMLServerException(
+            'Run not found')
+        with self.assertRaisesRegexp(openml.exceptions.OpenMLServerException,
+                                     'Run not found') as cm:
+            openml.populate_cache(flow_ids=[1, 2], run_ids=[3], n_jobs=2)
+        # The other downloads are not aborted
         self.assertEqual(flow_mock.call_count, 2)
-        for argument, fixture in six.moves.zip(flow_mock.call_args_list, [(5,), (6,)]):
-            self.assertEqual(argument[0], fixture)
+        summary = cm.exception.summary
+        self.assertEqual(summary['flows'], 2)
+        self.assertEqual(summary['runs'], 0)
+        self.assertEqual(summary['errors'], [('run', 3)])
 
-        self.assertEqual(dataset_mock.call_count, 2)
-        for argument, fixture in six.moves.zip(dataset_mock.call_args_list, [(3,), (4,)]):
-            self.assertEqual(argument[0], fixture)
+    def test_import_is_fast(self):
+        # The tests run in a temporary working directory
+        openml_dir = os.path.dirname(os.path.dirname(openml.__file__))
+        output = subprocess.check_output([sys.executable, '-c',
+                                          _IMPORT_SCRIPT], cwd=openml_dir)
+        result = json.loads(output.decode('utf-8').splitlines()[-1])
+        # Heavy dependencies are only imported when they are used
+        for module in ('sklearn', 'scipy', 'pandas',
+                       'openml.flows.sklearn_converter'):
+            self.assertNotIn(module, result['modules'])
+        self.assertLess(result['duration'],
+                        IMPORT_TIME_FACTOR * result['baseline'])
 
-        self.assertEqual(task_mock.call_count, 2)
-        for argument, fixture in six.moves.zip(task_mock.call_args_list, [(1,), (2,)]):
-            self.assertEqual(argument[0], fixture)
-            
\ No newline at end of file
+    def test_lazy_converter(self):
+        from sklearn.tree import DecisionTreeClassifier
+        flow = openml.flows.sklearn_to_flow(DecisionTreeClassifier())
+        self.assertEqual(flow.name, 'sklearn.tree.tree.DecisionTreeClassifier')
+        model = openml.flows.flow_to_sklearn(flow)
+        self.assertIsInstance(model, DecisionTreeClassifier)
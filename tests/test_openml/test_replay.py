@@ -0,0 +1,162 @@
+import os
+import threading
+
+from six.moves import BaseHTTPServer
+
+from openml.testing import TestBase
+import openml
+import openml.replay
+
+
+class _OriginHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Stands in for the OpenML server while recording."""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path.startswith('/api/v1/xml/data/2'):
+            self._respond(200, 'text/xml', (
+                '<oml:data_set_description xmlns:oml="http://openml.org/'
+                'openml"><oml:url>http://%s:%d/data/download/1</oml:url>'
+                '</oml:data_set_description>' % self.server.server_address
+            ))
+        elif self.path.startswith('/data/download/1'):
+            self._respond(200, 'text/plain', '@relation test')
+        else:
+            self._respond(412, 'text/xml', (
+                '<oml:error xmlns:oml="http://openml.org/error"><oml:code>'
+                '111</oml:code><oml:message>Unknown</oml:message></oml:error>'
+            ))
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.requests.append(self.path)
+        self._respond(200, 'text/xml', '<oml:upload_flow xmlns:oml="http://'
+                                       'openml.org/openml"><oml:id>%d</oml:id>'
+                                       '</oml:upload_flow>'
+                      % len(self.server.requests))
+
+    def _respond(self, status_code, content_type, text):
+        content = text.encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestReplay(TestBase):
+    # These tests don't rely on the server
+
+    def setUp(self):
+        super(TestReplay, self).setUp()
+        self.cassette_dir = os.path.join(self.workdir, 'cassette')
+        self.origin = BaseHTTPServer.HTTPServer(('127.0.0.1', 0),
+                                                _OriginHandler)
+        self.origin.requests = []
+        thread = threading.Thread(target=self.origin.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.origin_url = 'http://127.0.0.1:%d' % self.origin.server_address[1]
+        openml.config.server = self.origin_url + '/api/v1/xml'
+        openml.config.connection_n_retries = 1
+
+    def tearDown(self):
+        self.origin.shutdown()
+        self.origin.server_close()
+        super(TestReplay, self).tearDown()
+
+    def _record(self):
+        with openml.replay.record(self.cassette_dir):
+            description = openml._api_calls._perform_api_call('data/2')
+            arff = openml._api_calls._read_url(self.origin_url +
+                                               '/data/download/1')
+            first_id = openml._api_calls._perform_api_call(
+                'flow/', file_elements={'description': 'first'},
+            )
+            second_id = openml._api_calls._perform_api_call(
+                'flow/', file_elements={'description': 'second'},
+            )
+            self.assertRaises(openml.exceptions.OpenMLServerException,
+                              openml._api_calls._perform_api_call,
+                              'data/3')
+        self.origin.requests = []
+        return description, arff, first_id, second_id
+
+    def test_record_and_replay(self):
+        description, arff, first_id, second_id = self._record()
+        self.assertIn('<oml:id>3</oml:id>', first_id)
+        self.assertIn('<oml:id>4</oml:id>', second_id)
+
+        with openml.replay.replay(self.cassette_dir):
+            # The API key is not part of the request key
+            openml.config.apikey = 'another key'
+            self.assertEqual(openml._api_calls._perform_api_call('data/2'),
+                             description)
+            self.assertEqual(openml._api_calls._read_url(
+                self.origin_url + '/data/download/1'), arff)
+            # Uploads are answered in the order in which they were recorded
+            self.assertEqual(openml._api_calls._perform_api_call(
+                'flow/', file_elements={'description': 'other'},
+            ), first_id)
+            self.assertEqual(openml._api_calls._perform_api_call(
+                'flow/', file_elements={'description': 'other'},
+            ), second_id)
+            self.assertEqual(openml._api_calls._perform_api_call(
+                'flow/', file_elements={'description': 'other'},
+            ), second_id)
+            self.assertRaisesRegexp(openml.exceptions.OpenMLServerException,
+                                    'Unknown',
+                                    openml._api_calls._perform_api_call,
+                                    'data/3')
+            self.assertRaises(openml.exceptions.OpenMLReplayError,
+                              openml._api_calls._perform_api_call, 'data/4')
+        self.assertEqual(self.origin.requests, [])
+        self.assertEqual(openml._api_calls._transport_adapters, [])
+
+    def test_record_without_api_key(self):
+        openml.config.apikey = 'secret-api-key'
+        self._record()
+        for filename in os.listdir(self.cassette_dir):
+            with open(os.path.join(self.cassette_dir, filename), 'rb') as fh:
+                self.assertNotIn(b'secret-api-key', fh.read(), filename)
+        # The URLs are still recorded
+        cassette = openml.replay.Cassette(self.cassette_dir)
+        self.assertEqual(cassette.origins(), {self.origin_url})
+
+    def test_replay_server(self):
+        description, arff, first_id, _ = self._record()
+        with openml.replay.ReplayServer(self.cassette_dir) as server:
+            openml.config.server = server.api_url
+            self.assertEqual(server.api_url, server.url + '/api/v1/xml')
+            served_description = openml._api_calls._perform_api_call(
+                'data/2')
+            # Download URLs point to the replay server
+            self.assertEqual(served_description,
+                             description.replace(self.origin_url,
+                                                 server.url))
+            self.assertEqual(
+                openml._api_calls._read_url(server.url + '/data/download/1'),
+                arff,
+            )
+            self.assertEqual(openml._api_calls._perform_api_call(
+                'flow/', file_elements={'description': 'other'},
+            ), first_id)
+            self.assertRaises(openml.exceptions.OpenMLServerError,
+                              openml._api_calls._perform_api_call, 'data/4')
+
+            # Uploads which were not recorded are accepted
+            for run_id in (1, 2):
+                self.assertEqual(
+                    openml._api_calls._perform_api_call(
+                        'run/', file_elements={'description': 'run'},
+                    ),
+                    '<oml:upload_run xmlns:oml="http://openml.org/openml">'
+                    '<oml:run_id>%d</oml:run_id></oml:upload_run>' % run_id,
+                )
+            self.assertRaises(openml.exceptions.OpenMLServerError,
+                              openml._api_calls._perform_api_call, 'run/tag',
+                              data={'run_id': 1, 'tag': 'tag'})
+        self.assertEqual(self.origin.requests, [])
@@ -0,0 +1,76 @@
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+
+from openml.testing import TestBase
+from openml.runs.profiling import RunProfile, _active_profile, _stage
+import openml
+
+
+class _Task(object):
+    """Stands in for a classification task with a 10-fold split."""
+
+    class_labels = ['a', 'b']
+
+    def __init__(self):
+        rng = np.random.RandomState(1)
+        self.X = rng.rand(50, 3)
+        self.y = rng.randint(2, size=50)
+
+    def get_train_test_split_indices(self, repeat=0, fold=0, sample=0):
+        test = np.arange(fold * 5, fold * 5 + 5)
+        return np.setdiff1d(np.arange(50), test), test
+
+    def get_X_and_y(self):
+        return self.X, self.y
+
+
+class TestProfiling(TestBase):
+    # These tests don't rely on the server
+
+    def test_run_profile(self):
+        profile = RunProfile()
+        for _ in range(2):
+            with profile.stage('fit'):
+                sum(range(10000))
+        with profile.stage('predict'):
+            pass
+
+        self.assertEqual(list(profile.stages), ['fit', 'predict'])
+        fit = profile.to_dict()['fit']
+        self.assertEqual(fit['count'], 2)
+        self.assertGreaterEqual(fit['wall_time'], 0)
+        self.assertGreaterEqual(fit['cpu_time'], 0)
+        self.assertGreater(fit['peak_rss'], 0)
+        lines = str(profile).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith('fit '))
+
+    def test_stage_without_profile(self):
+        self.assertIsNone(_active_profile())
+        with _stage('fit'):
+            pass
+
+        profile = RunProfile()
+        with _stage('fit', profile):
+            pass
+        self.assertEqual(profile.stages['fit']['count'], 1)
+
+    def test_profile_run(self):
+        with openml.runs.profile_run() as profile:
+            self.assertIs(_active_profile(), profile)
+            with openml.runs.profile_run() as inner_profile:
+                self.assertIs(_active_profile(), inner_profile)
+            self.assertIs(_active_profile(), profile)
+            for fold_no in range(2):
+                openml.runs.functions._run_model_on_fold(
+                    DecisionTreeClassifier(), _Task(), 0, fold_no, 0,
+                    can_measure_runtime=False, add_local_measures=True,
+                )
+        self.assertIsNone(_active_profile())
+
+        self.assertEqual(list(profile.stages), ['fetch_split', 'load_dataset',
+                                                'slice_data', 'fit', 'predict',
+                                                'assemble_rows'])
+        for stage in profile.stages.values():
+            self.assertEqual(stage['count'], 2)
+        self.assertEqual(inner_profile.stages, {})
@@ -4,6 +4,7 @@ from distutils.version import LooseVersion
 import json
 import os
 import random
+import subprocess
 import time
 import sys
 
@@ -14,6 +15,10 @@ import openml.exceptions
 import openml._api_calls
 import sklearn
 import unittest
+if sys.version_info[0] >= 3:
+    from unittest import mock
+else:
+    import mock
 
 from openml.testing import TestBase
 from openml.runs.functions import _run_task_get_arffcontent, \
@@ -245,6 +250,12 @@ class TestRun(TestBase):
         check_measures = {'usercpu_time_millis_testing': (0, max_time_allowed),
                           'usercpu_time_millis_training': (0, max_time_allowed),  # should take at least one millisecond (?)
                           'usercpu_time_millis': (0, max_time_allowed),
+                          'wall_clock_time_millis_testing': (0, max_time_allowed),
+                          'wall_clock_time_millis_training': (0, max_time_allowed),
+                          'wall_clock_time_millis': (0, max_time_allowed),
+                          'cpu_time_millis_testing': (0, max_time_allowed),
+                          'cpu_time_millis_training': (0, max_time_allowed),
+                          'cpu_time_millis': (0, max_time_allowed),
                           'predictive_accuracy': (0, 1)}
 
         self.assertIsInstance(fold_evaluations, dict)
@@ -281,6 +292,12 @@ class TestRun(TestBase):
         check_measures = {'usercpu_time_millis_testing': (0, max_time_allowed),
                           'usercpu_time_millis_training': (0, max_time_allowed),  # should take at least one millisecond (?)
                           'usercpu_time_millis': (0, max_time_allowed),
+                          'wall_clock_time_millis_testing': (0, max_time_allowed),
+                          'wall_clock_time_millis_training': (0, max_time_allowed),
+                          'wall_clock_time_millis': (0, max_time_allowed),
+                          'cpu_time_millis_testing': (0, max_time_allowed),
+                          'cpu_time_millis_training': (0, max_time_allowed),
+                          'cpu_time_millis': (0, max_time_allowed),
                           'predictive_accuracy': (0, 1)}
 
         self.assertIsInstance(sample_evaluations, dict)
@@ -799,6 +816,55 @@ class TestRun(TestBase):
             run_ids = _run_exists(task.task_id, setup_exists)
             self.assertTrue(run_ids, msg=(run_ids, clf))
 
+    @mock.patch('openml._api_calls._perform_api_call')
+    def test_find_existing_runs(self, api_call_mock):
+        flow = sklearn_to_flow(DecisionTreeClassifier())
+        flow.flow_id = 10
+        flow_xml = flow._to_xml()
+
+        def perform_api_call(call, **kwargs):
+            if call == 'flow/exists':
+                return ('<oml:flow_exists xmlns:oml="http://openml.org/openml">'
+                        '<oml:id>10</oml:id></oml:flow_exists>')
+            elif call == 'flow/10':
+                return flow_xml
+            elif call == '/setup/exists/':
+                description = kwargs['file_elements']['description'][1]
+                # Only the setup with max_depth=7 exists
+                exists = '<oml:value>7</oml:value>' in description
+                return ('<oml:setup_exists xmlns:oml="http://openml.org/openml">'
+                        '<oml:id>%d</oml:id></oml:setup_exists>'
+                        % (20 if exists else -1))
+            elif call.startswith('run/list/'):
+                self.assertIn('/task/1,2/', call)
+                self.assertTrue(call.endswith('/setup/20'))
+                return ('<oml:runs xmlns:oml="http://openml.org/openml">'
+                        '<oml:run><oml:run_id>30</oml:run_id>'
+                        '<oml:task_id>1</oml:task_id>'
+                        '<oml:setup_id>20</oml:setup_id>'
+                        '<oml:flow_id>10</oml:flow_id>'
+                        '<oml:uploader>1</oml:uploader></oml:run></oml:runs>')
+            raise ValueError(call)
+        api_call_mock.side_effect = perform_api_call
+
+        pairs = [
+            (DecisionTreeClassifier(max_depth=7), 1),
+            (DecisionTreeClassifier(max_depth=7), 2),
+            (DecisionTreeClassifier(max_depth=8), 1),
+            (DecisionTreeClassifier(max_depth=7), 1),
+        ]
+        existing_runs = openml.runs.find_existing_runs(pairs, seed=1)
+        self.assertEqual(existing_runs, [{30}, set(), set(), {30}])
+        # The models are seeded in place
+        self.assertIsNotNone(pairs[0][0].random_state)
+
+        calls = [call[0][0] for call in api_call_mock.call_args_list]
+        # Every flow and every setup is looked up once
+        self.assertEqual(calls.count('flow/exists'), 1)
+        self.assertEqual(calls.count('/setup/exists/'), 2)
+        self.assertEqual(len([call for call in calls
+                              if call.startswith('run/list/')]), 1)
+
     def test__get_seeded_model(self):
         # randomized models that are initialized without seeds, can be seeded
         randomized_clfs = [
@@ -1094,6 +1160,99 @@ class TestRun(TestBase):
             self.assertIn(arff_line[6], ['won', 'nowin'])
             self.assertIn(arff_line[7], ['won', 'nowin'])
 
+    def test__run_model_on_fold_parallel_runtime(self):
+        # Wall clock and CPU time are measured for parallel models, too
+        rng = np.random.RandomState(1)
+        X = rng.rand(40, 3)
+        y = rng.randint(2, size=40)
+        task = mock.Mock(class_labels=['a', 'b'])
+        task.get_train_test_split_indices.return_value = (np.arange(30),
+                                                          np.arange(30, 40))
+        task.get_X_and_y.return_value = (X, y)
+        clf = RandomForestClassifier(n_estimators=4, n_jobs=2)
+
+        res = openml.runs.functions._run_model_on_fold(
+            clf, task, 0, 0, 0,
+            can_measure_runtime=_check_n_jobs(clf), add_local_measures=True,
+        )
+        user_defined_measures = res[2]
+        self.assertEqual(set(user_defined_measures), {
+            'wall_clock_time_millis_training',
+            'wall_clock_time_millis_testing', 'wall_clock_time_millis',
+            'cpu_time_millis_training', 'cpu_time_millis_testing',
+            'cpu_time_millis', 'predictive_accuracy',
+        })
+        self.assertGreater(
+            user_defined_measures['wall_clock_time_millis_training'], 0)
+        for measure in ('wall_clock_time_millis', 'cpu_time_millis'):
+            self.assertGreaterEqual(
+                user_defined_measures[measure + '_testing'], 0)
+            self.assertAlmostEqual(
+                user_defined_measures[measure],
+                user_defined_measures[measure + '_training'] +
+                user_defined_measures[measure + '_testing'],
+            )
+
+    @mock.patch('openml.runs.functions._live_descendants_cpu_time')
+    def test__run_model_on_fold_sequential_cpu_time(self, live_cpu_time_mock):
+        # Sequential models have no worker processes to look for
+        rng = np.random.RandomState(1)
+        X = rng.rand(40, 3)
+        y = rng.randint(2, size=40)
+        task = mock.Mock(class_labels=['a', 'b'])
+        task.get_train_test_split_indices.return_value = (np.arange(30),
+                                                          np.arange(30, 40))
+        task.get_X_and_y.return_value = (X, y)
+        clf = DecisionTreeClassifier()
+
+        res = openml.runs.functions._run_model_on_fold(
+            clf, task, 0, 0, 0,
+            can_measure_runtime=_check_n_jobs(clf), add_local_measures=True,
+        )
+        self.assertIn('cpu_time_millis', res[2])
+        self.assertEqual(live_cpu_time_mock.call_count, 0)
+
+    @unittest.skipIf(not os.path.isfile('/proc/self/stat'), 'Requires /proc')
+    def test_proc_descendants(self):
+        child = subprocess.Popen([sys.executable, '-c',
+                                  'import time; time.sleep(10)'])
+        try:
+            self.assertIn(child.pid, openml.runs.functions._proc_descendants(
+                os.getpid()))
+        finally:
+            child.kill()
+            child.wait()
+
+    @unittest.skipIf(
+        openml.runs.functions._live_descendants_cpu_time() is None,
+        'CPU time of worker processes requires psutil or /proc',
+    )
+    def test__run_model_on_fold_worker_processes_cpu_time(self):
+        # The CPU time of worker processes which are already running when
+        # the fold starts is measured, too
+        rng = np.random.RandomState(1)
+        X = rng.rand(600, 10)
+        y = rng.randint(2, size=600)
+        task = mock.Mock(class_labels=['a', 'b'])
+        task.get_train_test_split_indices.return_value = (np.arange(500),
+                                                          np.arange(500, 600))
+        task.get_X_and_y.return_value = (X, y)
+        clf = GridSearchCV(RandomForestClassifier(n_estimators=20),
+                           {'max_depth': [2, 4, 8, None]}, cv=3, n_jobs=2)
+        # start the worker processes of joblib
+        clf.fit(X[:100], y[:100])
+
+        process_start = time.process_time()
+        res = openml.runs.functions._run_model_on_fold(
+            clf, task, 0, 0, 0,
+            can_measure_runtime=_check_n_jobs(clf), add_local_measures=True,
+        )
+        process_duration = (time.process_time() - process_start) * 1000
+        user_defined_measures = res[2]
+        # the workers do most of the work, which the process alone does not
+        self.assertGreater(user_defined_measures['cpu_time_millis_training'],
+                           process_duration)
+
     def test__create_trace_from_arff(self):
         with open(self.static_cache_dir + '/misc/trace.arff', 'r') as arff_file:
             trace_arff = arff.load(arff_file)
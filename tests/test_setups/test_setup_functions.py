@@ -11,6 +11,13 @@ from sklearn.tree import DecisionTreeClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.naive_bayes import GaussianNB
 from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+if sys.version_info[0] >= 3:
+    from unittest import mock
+else:
+    import mock
 
 
 def get_sentinel():
@@ -162,7 +169,149 @@ class TestSetupFunctions(TestBase):
         openml.config.cache_directory = self.static_cache_dir
         openml.setups.functions._get_cached_setup(1)
 
+    def test_get_setup_from_memory_cache(self):
+        openml.config.cache_directory = self.static_cache_dir
+        openml.config.memory_cache_entries = 10
+        try:
+            setup = openml.setups.get_setup(1)
+            with mock.patch('openml.setups.functions._get_cached_setup') \
+                    as cached_setup_mock:
+                self.assertIs(openml.setups.get_setup(1), setup)
+                self.assertEqual(cached_setup_mock.call_count, 0)
+        finally:
+            openml.config.memory_cache_entries = 0
+
     def test_get_uncached_setup(self):
         openml.config.cache_directory = self.static_cache_dir
         with self.assertRaises(openml.exceptions.OpenMLCacheException):
             openml.setups.functions._get_cached_setup(10)
+
+    @mock.patch('openml._api_calls._perform_api_call')
+    def test_setup_exists_cached(self, api_call_mock):
+        def perform_api_call(call, **kwargs):
+            if call == 'flow/exists':
+                id_ = 10
+            else:
+                id_ = 5
+            return ('<oml:%(call)s xmlns:oml="http://openml.org/openml">'
+                    '<oml:id>%(id)d</oml:id></oml:%(call)s>'
+                    % {'call': call.strip('/').replace('/', '_'), 'id': id_})
+        api_call_mock.side_effect = perform_api_call
+
+        flow = openml.flows.sklearn_to_flow(DecisionTreeClassifier())
+        flow.flow_id = 10
+        self.assertEqual(openml.setups.setup_exists(flow), 5)
+        self.assertEqual(openml.setups.setup_exists(flow), 5)
+        calls = [call[0][0] for call in api_call_mock.call_args_list]
+        self.assertEqual(calls, ['flow/exists', '/setup/exists/'])
+        # The index is stored in the cache directory
+        openml.setups.functions._setup_ids.clear()
+        self.assertEqual(openml.setups.setup_exists(flow), 5)
+        self.assertEqual(api_call_mock.call_count, 2)
+
+        # Other hyperparameters are a different setup
+        flow.model.set_params(max_depth=3)
+        self.assertEqual(openml.setups.setup_exists(flow), 5)
+        self.assertEqual(api_call_mock.call_count, 3)
+
+    @mock.patch('openml.setups.functions.get_setup')
+    @mock.patch('openml.flows.get_flow')
+    def test_initialize_model_from_template(self, get_flow_mock,
+                                            get_setup_mock):
+        flow = openml.flows.sklearn_to_flow(Pipeline(steps=[
+            ('scaler', StandardScaler()),
+            ('tree', DecisionTreeClassifier()),
+        ]))
+        flow.flow_id = 10
+        flow.components['scaler'].flow_id = 11
+        flow.components['tree'].flow_id = 12
+        get_flow_mock.return_value = flow
+
+        def get_setup(setup_id):
+            parameters = [
+                (10, 'steps', flow.parameters['steps']),
+                (11, 'with_mean', 'false'),
+                (12, 'max_depth', str(setup_id)),
+            ]
+            return openml.setups.OpenMLSetup(setup_id, 10, {
+                i: openml.setups.OpenMLParameter(i, flow_id, None, None, name,
+                                                 None, None, value)
+                for i, (flow_id, name, value) in enumerate(parameters)
+            })
+        get_setup_mock.side_effect = get_setup
+
+        model = openml.setups.initialize_model(3)
+        model2 = openml.setups.initialize_model(5)
+        # The flow is converted to a model once
+        self.assertEqual(get_flow_mock.call_count, 1)
+        self.assertIsNot(model, model2)
+        self.assertEqual([name for name, _ in model.steps], ['scaler', 'tree'])
+        self.assertFalse(model.steps[0][1].with_mean)
+        self.assertEqual(model.steps[1][1].max_depth, 3)
+        self.assertEqual(model2.steps[1][1].max_depth, 5)
+        self.assertIsNot(model.steps[1][1], model2.steps[1][1])
+
+    def test_setup_fingerprint(self):
+        def create_setup(setup_id, max_depth):
+            parameters = [(11, 'with_mean', 'false'),
+                          (12, 'max_depth', max_depth)]
+            return openml.setups.OpenMLSetup(setup_id, 10, {
+                i: openml.setups.OpenMLParameter(i, flow_id, None, None, name,
+                                                 None, None, value)
+                for i, (flow_id, name, value) in enumerate(parameters)
+            })
+
+        setup = create_setup(1, '3')
+        self.assertEqual(setup.fingerprint(), create_setup(2, '3').fingerprint())
+        self.assertNotEqual(setup.fingerprint(),
+                            create_setup(1, '4').fingerprint())
+
+    @mock.patch('openml._api_calls._perform_api_call')
+    def test_get_setups(self, api_call_mock):
+        def parameter(id_, name, value):
+            return ('<oml:parameter><oml:id>%d</oml:id>'
+                    '<oml:flow_id>10</oml:flow_id>'
+                    '<oml:flow_name>flow</oml:flow_name>'
+                    '<oml:full_name>flow(1)_%s</oml:full_name>'
+                    '<oml:parameter_name>%s</oml:parameter_name>'
+                    '<oml:data_type></oml:data_type>'
+                    '<oml:default_value></oml:default_value>'
+                    '<oml:value>%s</oml:value></oml:parameter>'
+                    % (id_, name, name, value))
+
+        def perform_api_call(call):
+            self.assertTrue(call.startswith('setup/list/setup/1,2,3/'), call)
+            setups = ''
+            for setup_id, max_depth, criterion in [(1, '3', '"gini"'),
+                                                   (2, '5', '"entropy"')]:
+                setups += ('<oml:setup><oml:setup_id>%d</oml:setup_id>'
+                           '<oml:flow_id>10</oml:flow_id>%s%s%s</oml:setup>'
+                           % (setup_id, parameter(1, 'max_depth', max_depth),
+                              parameter(2, 'criterion', criterion),
+                              parameter(3, 'class_weight', 'null')))
+            return ('<oml:setups xmlns:oml="http://openml.org/openml">%s'
+                    '</oml:setups>' % setups)
+        api_call_mock.side_effect = perform_api_call
+
+        # Setup 3 does not exist
+        self.assertRaises(openml.exceptions.OpenMLServerNoResult,
+                          openml.setups.get_setups, [1, 2, 3])
+        self.assertEqual(api_call_mock.call_count, 1)
+
+        # The existing setups were cached
+        setups = openml.setups.get_setups([2, 1, 2])
+        self.assertEqual(api_call_mock.call_count, 1)
+        self.assertEqual([setup.setup_id for setup in setups], [2, 1, 2])
+        self.assertEqual(len(setups[0].parameters), 3)
+        self.assertEqual(
+            openml.setups.get_setup(1).fingerprint(), setups[1].fingerprint())
+
+        df = openml.setups.get_setups([1, 2], output_format='dataframe')
+        self.assertEqual(list(df.index), [1, 2])
+        self.assertEqual(list(df.columns),
+                         ['flow_id', 'flow(1)_class_weight',
+                          'flow(1)_criterion', 'flow(1)_max_depth'])
+        self.assertEqual(list(df['flow(1)_max_depth']), [3, 5])
+        self.assertEqual(df['flow(1)_max_depth'].dtype.kind, 'i')
+        self.assertEqual(list(df['flow(1)_criterion']), ['gini', 'entropy'])
+        self.assertTrue(df['flow(1)_class_weight'].isnull().all())
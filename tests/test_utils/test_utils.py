@@ -1,8 +1,17 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+import unittest
+
 from openml.testing import TestBase
 import numpy as np
 import openml
 import sys
 
+import six
+
 if sys.version_info[0] >= 3:
     from unittest import mock
 else:
@@ -34,6 +43,38 @@ class OpenMLTaskTest(TestBase):
         self.assertEqual(len(datasets), 1)
         self.assertEqual(_perform_api_call.call_count, 1)
 
+    def test_list_all_in_chunks(self):
+        calls = []
+
+        def listing_call(limit, offset, task, setup):
+            calls.append((task, setup))
+            return {(task_id, setup_id): None for task_id in task
+                    for setup_id in setup}
+
+        result = openml.utils._list_all_in_chunks(
+            listing_call, 2, {'task': [1, 2, 3], 'setup': [4, 5]})
+        self.assertEqual(calls, [([1, 2], [4, 5]), ([3], [4, 5])])
+        self.assertEqual(len(result), 6)
+        self.assertEqual(
+            openml.utils._list_all_in_chunks(listing_call, 2, {'task': []}),
+            {})
+
+    def test_list_all_pages(self):
+        pages = {0: [1, 2], 2: [3]}
+        added = []
+
+        def listing_call(function, limit, offset):
+            self.assertEqual(function, 'predictive_accuracy')
+            return pages[offset]
+
+        def add_page(page):
+            added.append(page)
+            return page
+
+        openml.utils._list_all_pages(listing_call, add_page,
+                                     'predictive_accuracy', batch_size=2)
+        self.assertEqual(added, [[1, 2], [3]])
+
     def test_list_all_for_datasets(self):
         required_size = 127  # default test server reset value
         datasets = openml.datasets.list_datasets(batch_size=self._batch_size, size=required_size)
@@ -83,3 +124,302 @@ class OpenMLTaskTest(TestBase):
 
         # might not be on test server after reset, please rerun test at least once if fails
         self.assertEqual(len(evaluations), required_size)
+
+    def _create_cache_entry(self, key, id_, size, last_access):
+        cache_dir = openml.utils._create_cache_directory_for_id(key, id_)
+        with open(os.path.join(cache_dir, 'description.xml'), 'wb') as fh:
+            fh.write(b'0' * size)
+        os.utime(cache_dir, (last_access, last_access))
+        return cache_dir
+
+    def test_cache_stats(self):
+        self._create_cache_entry('datasets', 1, 100, 1000)
+        self._create_cache_entry('datasets', 2, 50, 1000)
+        self._create_cache_entry('runs', 1, 10, 1000)
+        openml.utils._cache_hits.clear()
+        openml.utils._cache_misses.clear()
+        openml.utils._record_cache_access('datasets', hit=True)
+        openml.utils._record_cache_access('datasets', hit=True)
+        openml.utils._record_cache_access('datasets', hit=True)
+        openml.utils._record_cache_access('datasets', hit=False)
+
+        stats = openml.utils.cache_stats()
+        self.assertEqual(list(stats.keys()),
+                         ['datasets', 'tasks', 'flows', 'runs', 'setups'])
+        self.assertEqual(stats['datasets']['n_entities'], 2)
+        self.assertEqual(stats['datasets']['size'], 150)
+        self.assertEqual(stats['datasets']['hit_ratio'], 0.75)
+        self.assertEqual(stats['runs']['n_entities'], 1)
+        self.assertEqual(stats['runs']['size'], 10)
+        self.assertIsNone(stats['runs']['hit_ratio'])
+        self.assertEqual(stats['tasks']['n_entities'], 0)
+
+    def test_evict_cache(self):
+        oldest = self._create_cache_entry('datasets', 1, 100, 1000)
+        old = self._create_cache_entry('setups', 1, 100, 2000)
+        newest = self._create_cache_entry('runs', 1, 100, 3000)
+
+        # Nothing happens without a size limit
+        self.assertEqual(openml.utils._evict_cache(), [])
+        removed = openml.utils._evict_cache(max_size=150)
+        self.assertEqual(removed, [oldest, old])
+        self.assertTrue(os.path.exists(newest))
+
+        openml.config.cache_size_limit = 0
+        try:
+            self.assertEqual(openml.utils._evict_cache(keep=newest), [])
+        finally:
+            openml.config.cache_size_limit = None
+
+    @mock.patch('openml.utils.lockutils.external_lock')
+    def test_evict_cache_skips_locked_entries(self, lock_mock):
+        def external_lock(name, lock_path):
+            # The dataset is locked by another process
+            lock = mock.Mock()
+            lock.acquire.return_value = \
+                name != 'datasets.functions.get_dataset:1'
+            return lock
+        lock_mock.side_effect = external_lock
+        locked = self._create_cache_entry('datasets', 1, 100, 1000)
+        unlocked = self._create_cache_entry('runs', 1, 100, 2000)
+
+        removed = openml.utils._evict_cache(max_size=0)
+        self.assertEqual(removed, [unlocked])
+        self.assertTrue(os.path.exists(locked))
+        lock_path = os.path.join(openml.config.get_cache_directory(), 'locks')
+        self.assertEqual(lock_mock.call_args_list, [
+            mock.call(name='datasets.functions.get_dataset:1',
+                      lock_path=lock_path),
+            mock.call(name='runs.functions.get_run:1', lock_path=lock_path),
+        ])
+
+    def test_evict_cache_skips_flow_being_written(self):
+        flow_dir = self._create_cache_entry('flows', 1, 100, 1000)
+        with openml.utils._cache_entity_lock('flows', 1):
+            self.assertEqual(openml.utils._evict_cache(max_size=0), [])
+        self.assertEqual(openml.utils._evict_cache(max_size=0), [flow_dir])
+
+    def test_cache_manifest(self):
+        # Files cached before the manifest existed are imported
+        self._create_cache_entry('datasets', 1, 100, 1000)
+        self.assertEqual(openml.utils._list_cached_ids('datasets', ['description.xml']),
+                         [1])
+        cache_dir = openml.utils._create_cache_directory_for_id('datasets', 2)
+        path = openml.utils._write_cache_file(cache_dir, 'description.xml',
+                                                 u'abc')
+        self.assertTrue(os.path.exists(os.path.join(
+            openml.config.get_cache_directory(),
+            openml.utils._CACHE_MANIFEST_FILENAME,
+        )))
+        self.assertEqual(openml.utils._list_cached_ids('datasets', ['description.xml']),
+                         [1, 2])
+        self.assertEqual(
+            openml.utils._list_cached_ids('datasets', ['description.xml', 'other']), [],
+        )
+        self.assertEqual(openml.utils.cache_stats()['datasets']['size'], 103)
+        self.assertEqual(openml.utils.validate_cache(), [])
+
+        with open(path, 'w') as fh:
+            fh.write('abd')
+        self.assertEqual(openml.utils.validate_cache(), [])
+        self.assertEqual(openml.utils.validate_cache(verify_checksums=True),
+                         [(path, 'checksum')])
+        os.remove(path)
+        self.assertEqual(openml.utils.validate_cache(), [(path, 'missing')])
+
+        openml.utils._remove_cache_dir_for_id('datasets', cache_dir)
+        self.assertEqual(openml.utils._list_cached_ids('datasets', ['description.xml']),
+                         [1])
+
+    def test_parse_cached_xml(self):
+        cache_dir = openml.utils._create_cache_directory_for_id('tasks', 1)
+        path = openml.utils._write_cache_file(
+            cache_dir, 'task.xml', u'<oml:task><oml:id>1</oml:id></oml:task>',
+        )
+        parsed = openml.utils._parse_cached_xml(path)
+        self.assertEqual(parsed['oml:task']['oml:id'], '1')
+        self.assertTrue(os.path.exists(os.path.join(
+            cache_dir, 'task.pkl.py2' if six.PY2 else 'task.pkl.py3',
+        )))
+
+        # The second call loads the parsed content from the sidecar file
+        with mock.patch('openml.utils.xmltodict.parse') as parse_mock:
+            self.assertEqual(openml.utils._parse_cached_xml(path), parsed)
+            self.assertEqual(parse_mock.call_count, 0)
+        forced = openml.utils._parse_cached_xml(path, force_list=['oml:id'])
+        self.assertEqual(forced['oml:task']['oml:id'], ['1'])
+
+        # Changing the XML file invalidates the sidecar file
+        openml.utils._write_cache_file(
+            cache_dir, 'task.xml', u'<oml:task><oml:id>12</oml:id></oml:task>',
+        )
+        parsed = openml.utils._parse_cached_xml(path)
+        self.assertEqual(parsed['oml:task']['oml:id'], '12')
+
+    def test_memory_cache(self):
+        # The in-memory cache is disabled by default
+        openml.utils._memory_cache_put('datasets', 1, 'dataset 1')
+        self.assertIsNone(openml.utils._memory_cache_get('datasets', 1))
+
+        openml.config.memory_cache_entries = 2
+        try:
+            openml.utils._memory_cache_put('datasets', 1, 'dataset 1')
+            openml.utils._memory_cache_put('tasks', 1, 'task 1')
+            self.assertEqual(openml.utils._memory_cache_get('datasets', 1),
+                             'dataset 1')
+            # The least recently used object is dropped
+            openml.utils._memory_cache_put('runs', 1, 'run 1')
+            self.assertIsNone(openml.utils._memory_cache_get('tasks', 1))
+            self.assertEqual(openml.utils._memory_cache_get('runs', 1),
+                             'run 1')
+
+            openml.utils._memory_cache_invalidate('runs', 1)
+            self.assertIsNone(openml.utils._memory_cache_get('runs', 1))
+
+            # Objects are cached per server
+            openml.config.server = self.production_server
+            self.assertIsNone(openml.utils._memory_cache_get('datasets', 1))
+            openml.config.server = self.test_server
+
+            openml.config.memory_cache_size_limit = 1
+            openml.utils._memory_cache_put('runs', 2, 'run 2')
+            self.assertIsNone(openml.utils._memory_cache_get('runs', 2))
+            self.assertEqual(openml.utils._memory_cache_get('datasets', 1),
+                             'dataset 1')
+
+            openml.utils.clear_memory_cache()
+            self.assertIsNone(openml.utils._memory_cache_get('datasets', 1))
+
+            # Modifying a stored or a returned object does not modify the
+            # cached one
+            openml.config.memory_cache_size_limit = None
+            task = {'parameters': {'a': 1}}
+            with mock.patch('openml.utils.pickle') as pickle_mock:
+                openml.utils._memory_cache_put('tasks', 2, task)
+            # The size is only estimated if it is limited
+            self.assertEqual(pickle_mock.dumps.call_count, 0)
+            task['parameters']['a'] = 2
+            cached_task = openml.utils._memory_cache_get('tasks', 2)
+            self.assertEqual(cached_task, {'parameters': {'a': 1}})
+            cached_task['parameters']['a'] = 3
+            self.assertEqual(openml.utils._memory_cache_get('tasks', 2),
+                             {'parameters': {'a': 1}})
+        finally:
+            openml.config.memory_cache_entries = 0
+            openml.config.memory_cache_size_limit = None
+
+    def test_atomic_write(self):
+        path = os.path.join(self.workdir, 'file')
+        with openml.utils._atomic_write(path) as fh:
+            fh.write(b'abc')
+        try:
+            with openml.utils._atomic_write(path) as fh:
+                fh.write(b'def')
+                raise KeyboardInterrupt()
+        except KeyboardInterrupt:
+            pass
+        # The failed write neither modified the file nor left a temporary file
+        with open(path, 'rb') as fh:
+            self.assertEqual(fh.read(), b'abc')
+        self.assertEqual(os.listdir(self.workdir), ['file'])
+
+    def test_evict_cache_skips_entries_locked_by_this_process(self):
+        locked = self._create_cache_entry('datasets', 1, 100, 1000)
+        unlocked = self._create_cache_entry('datasets', 2, 100, 2000)
+
+        with openml.utils._cache_entity_lock('datasets', 1, shared=True):
+            removed = openml.utils._evict_cache(max_size=0)
+        self.assertEqual(removed, [unlocked])
+        self.assertTrue(os.path.exists(locked))
+
+    def test_create_cache_directory_for_id_read_only(self):
+        cache_dir = openml.utils._create_cache_directory_for_id('datasets', 1)
+        with mock.patch('openml.utils.os.utime', side_effect=OSError):
+            self.assertEqual(
+                openml.utils._create_cache_directory_for_id('datasets', 1),
+                cache_dir,
+            )
+
+    def test_list_cached_ids_prunes_removed_files(self):
+        cache_dir = openml.utils._create_cache_directory_for_id('tasks', 7)
+        openml.utils._write_cache_file(cache_dir, 'task.xml', u'abc')
+        self.assertEqual(openml.utils._list_cached_ids('tasks', ['task.xml']),
+                         [7])
+
+        # The directory is removed without updating the manifest
+        shutil.rmtree(cache_dir)
+        self.assertEqual(openml.utils._list_cached_ids('tasks', ['task.xml']),
+                         [])
+        self.assertEqual(openml.utils.validate_cache(), [])
+        self.assertEqual(openml.tasks.functions._get_cached_tasks(), {})
+
+    def test_cache_manifest_read_only_transaction(self):
+        cache_dir = openml.utils._create_cache_directory_for_id('tasks', 1)
+        openml.utils._write_cache_file(cache_dir, 'task.xml', u'abc')
+        self.assertRaises(ValueError, openml.utils._cache_manifest_transaction(
+            create=True, read_only=True).__enter__)
+
+        # Reading does not wait for a writer
+        with openml.utils._cache_manifest_transaction() as manifest:
+            manifest.execute("DELETE FROM files WHERE key = 'datasets'")
+            self.assertEqual(
+                openml.utils._list_cached_ids('tasks', ['task.xml']), [1])
+            self.assertEqual(openml.utils.validate_cache(), [])
+
+    def test_cache_entity_lock_threads(self):
+        inside = []
+        max_inside = []
+
+        def hold_lock():
+            with openml.utils._cache_entity_lock('datasets', 1):
+                inside.append(1)
+                max_inside.append(len(inside))
+                time.sleep(0.05)
+                inside.pop()
+
+        threads = [threading.Thread(target=hold_lock) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max_inside, [1, 1, 1])
+        self.assertEqual(openml.utils._entity_locks, {})
+
+    @unittest.skipIf(sys.platform == 'win32', 'Requires fcntl')
+    def test_cache_entity_lock_shared_by_threads(self):
+        lock_file = os.path.join(openml.utils._create_lockfiles_dir(),
+                                 'datasets.functions.get_dataset:1')
+        try_lock = (
+            'import fcntl, sys\n'
+            'fh = open(sys.argv[1], "a+")\n'
+            'try:\n'
+            '    fcntl.lockf(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)\n'
+            'except (OSError, IOError):\n'
+            '    sys.exit(1)\n'
+        )
+
+        def locked_by_this_process():
+            return subprocess.call([sys.executable, '-c', try_lock,
+                                    lock_file]) == 1
+
+        first_acquired = threading.Event()
+        first_release = threading.Event()
+
+        def hold_shared_lock():
+            with openml.utils._cache_entity_lock('datasets', 1, shared=True):
+                first_acquired.set()
+                first_release.wait()
+
+        thread = threading.Thread(target=hold_shared_lock)
+        thread.start()
+        first_acquired.wait()
+        with openml.utils._cache_entity_lock('datasets', 1, shared=True):
+            first_release.set()
+            thread.join()
+            # The other thread released its shared lock, this one still holds
+            # the file lock
+            self.assertTrue(locked_by_this_process())
+            # Eviction from this process respects the lock
+            with openml.utils._get_entity_lock('datasets', 1) as lock:
+                self.assertFalse(lock.acquire(blocking=False))
+        self.assertFalse(locked_by_this_process())